@@ -0,0 +1,81 @@
+# benchmarks/bench_arrays.py
+# Element-wise array operators (NumPy, see src/arrays.py) against the same
+# arithmetic done one element at a time with the interpreter's scalar
+# operator functions, at several array sizes.
+#
+#   python bench_arrays.py [--quick] [--repeat=N]
+#
+# The scalar column is a lower bound for an Aron loop over the elements: it
+# only calls the operator functions, without evaluating any AST nodes.
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from lexer import tokenize_compact
+from parser import parse
+from interpreter import interpret, add_values, subtract_values, multiply_values, divide_values
+from output import OutputWriter, set_writer
+import vm
+
+SIZES = (1000, 100000, 1000000)
+QUICK_SIZES = (1000, 100000)
+
+def array_program(size):
+    return "\n".join([
+        f"קבע א = טווח({size})",
+        "קבע ב = א * 2 + 1",
+        "קבע ג = ב / 3 - א",
+        "הדפס סכום(ג > 0)",
+    ])
+
+def scalar_loop(size):
+    """The array program's arithmetic, one element at a time."""
+    count = 0
+    for a in range(size):
+        b = add_values(multiply_values(a, 2), 1)
+        c = subtract_values(divide_values(b, 3), a)
+        count += c > 0
+    return count
+
+def best_of(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main(quick=False, repeat=5):
+    print(f"--- Array operators vs per-element scalar operations (best of {repeat}) ---")
+    print(f"{'elements':>10} {'tree':>12} {'vm':>12} {'scalar':>12} {'speedup':>8}")
+    with open(os.devnull, 'w', encoding='utf-8') as devnull:
+        writer = OutputWriter(devnull)
+        previous = set_writer(writer)
+        try:
+            for size in (QUICK_SIZES if quick else SIZES):
+                program = parse(tokenize_compact(array_program(size)))
+                tree = best_of(lambda: interpret(program), repeat)
+                machine = best_of(lambda: vm.execute(program), repeat)
+                scalar = best_of(lambda: scalar_loop(size), max(1, repeat // 5))
+                print(f"{size:>10} {tree * 1000:>9.2f} ms {machine * 1000:>9.2f} ms "
+                      f"{scalar * 1000:>9.2f} ms {scalar / tree:>7.0f}x")
+        finally:
+            writer.flush()
+            set_writer(previous)
+
+if __name__ == '__main__':
+    options = {"quick": False, "repeat": 5}
+    for arg in sys.argv[1:]:
+        name, _, value = arg.partition("=")
+        if name == "--quick":
+            options["quick"] = True
+        elif name == "--repeat":
+            options["repeat"] = int(value)
+        else:
+            print(f"Unknown option '{arg}'. Options: --quick --repeat=N")
+            sys.exit(2)
+    main(**options)
@@ -0,0 +1,51 @@
+# benchmarks/bench_deep.py
+# Parse and run time of deeply nested programs with the recursive Parser and
+# tree-walker and with the explicit-stack StackParser and engine
+# (--engine=stack), at nesting depths past Python's recursion limit.
+#
+#   python bench_deep.py [--quick]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from lexer import tokenize_compact
+from parser import parse
+from interpreter import interpret, interpret_iterative
+from output import capture_output
+from generators import generate_arithmetic_chain, generate_nested_if, generate_nested_parens
+
+# name -> (generator, depths, quick depths)
+DEEP_WORKLOADS = {
+    "nested_parens": (generate_nested_parens, (100, 1000, 10000, 100000), (100, 10000)),
+    "nested_if": (generate_nested_if, (100, 1000, 10000, 50000), (100, 10000)),
+    "arithmetic_chain": (generate_arithmetic_chain, (1000, 10000, 100000), (1000, 10000)),
+}
+
+def timed(func, *args):
+    start = time.perf_counter()
+    try:
+        with capture_output():
+            result = func(*args)
+    except RecursionError:
+        return None, None
+    return result, time.perf_counter() - start
+
+def format_time(seconds):
+    return f"{seconds * 1000:>10.2f} ms" if seconds is not None else f"{'RecursionError':>13}"
+
+def run(quick=False):
+    print(f"{'workload':<18} {'depth':>8} {'mode':<10} {'parse':>13} {'run':>13}")
+    for name, (generate, depths, quick_depths) in DEEP_WORKLOADS.items():
+        for depth in (quick_depths if quick else depths):
+            tokens = tokenize_compact(generate(depth))
+            for mode, iterative, execute in (("recursive", False, interpret), ("stack", True, interpret_iterative)):
+                program, parse_time = timed(parse, tokens, iterative)
+                run_column = format_time(timed(execute, program)[1]) if program is not None else f"{'-':>13}"
+                print(f"{name:<18} {depth:>8} {mode:<10} {format_time(parse_time)} {run_column}")
+                del program
+
+if __name__ == '__main__':
+    run("--quick" in sys.argv[1:])
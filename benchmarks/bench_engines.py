@@ -0,0 +1,69 @@
+# benchmarks/bench_engines.py
+# Execution time of the tree-walker, closure engine, bytecode VM and Python transpiler
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from lexer import tokenize_compact
+from parser import parse
+from interpreter import interpret
+import closure_compiler
+import compiler
+import vm
+import transpiler
+
+def generate_program(count):
+    """Arithmetic, comparisons and conditionals; one print per block."""
+    lines = ['קבע מונה = 0', 'קבע סכום = 1']
+    for i in range(count):
+        lines.append(f'קבע מונה = מונה + {i % 7} * (סכום - 1) / 3')
+        lines.append(f'קבע סכום = (סכום + {i}) * 2 - סכום')
+        lines.append('אם מונה > סכום')
+        lines.append('    קבע מונה = מונה - 1')
+        lines.append('אחרת')
+        lines.append('    קבע סכום = סכום + 1')
+        lines.append('סוף')
+        if i % 50 == 0:
+            lines.append('הדפס "סכום: " + סכום')
+    return '\n'.join(lines)
+
+def measure(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+if __name__ == '__main__':
+    engines = [
+        # (name, compile function or None, run compiled, execute from AST)
+        ("tree", None, None, interpret),
+        ("closure", closure_compiler.compile_program, closure_compiler.run_program, closure_compiler.execute),
+        ("vm", compiler.compile_program, vm.run, vm.execute),
+        ("python", transpiler.compile_program, transpiler.run, transpiler.execute),
+    ]
+    print("--- Engine execution time (best of 5, ms; 'run' excludes compilation) ---")
+    header = f"{'blocks':>8}"
+    for name, compile_func, _, _ in engines:
+        header += f" {name:>10}"
+        if compile_func:
+            header += f" {name + ' run':>12}"
+    print(header)
+
+    for count in (100, 1000, 10000):
+        program = parse(tokenize_compact(generate_program(count)))
+        row = f"{count:>8}"
+        for name, compile_func, run_func, execute_func in engines:
+            row += f" {measure(lambda: execute_func(program)) * 1000:>10.2f}"
+            if compile_func:
+                compiled = compile_func(program)
+                row += f" {measure(lambda: run_func(compiled)) * 1000:>12.2f}"
+        print(row)
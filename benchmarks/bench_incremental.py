@@ -0,0 +1,72 @@
+# benchmarks/bench_incremental.py
+# Compares the latency of an edit through incremental.Document with a full
+# lex and parse of the edited text, at several document sizes.
+#
+#   python bench_incremental.py [--quick] [--repeat=N]
+#
+# Each size runs three edits in the middle of the document: changing one line
+# in place, inserting a line and deleting it again. Incremental times should
+# stay flat as the document grows; the full parse grows with it.
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from lexer import tokenize_compact
+from parser import parse
+from incremental import Document
+from generators import generate_assignments
+
+SIZES = (1000, 10000, 50000)
+QUICK_SIZES = (1000, 10000)
+
+def best_of(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def run_size(size, repeat):
+    """Return (full parse, change, insert, delete) seconds for a document of size statements."""
+    code = generate_assignments(size)
+    document = Document(code)
+    middle = len(document.lines) // 2
+    line = document.lines[middle - 1]
+
+    def change():
+        document.edit(middle, middle + 1, [line + " + 1"])
+        document.edit(middle, middle + 1, [line])
+
+    full = best_of(lambda: parse(tokenize_compact(code)), max(1, repeat // 5))
+    changed = best_of(change, repeat) / 2
+    inserted = best_of(lambda: document.edit(middle, middle, ["הדפס 1"]), 1)
+    deleted = best_of(lambda: document.edit(middle, middle + 1, []), 1)
+    if document.text != code:
+        raise RuntimeError("Document text differs from the original after the edits")
+    return full, changed, inserted, deleted
+
+def main(quick=False, repeat=20):
+    print(f"--- Incremental edits vs full parse (best of {repeat}) ---")
+    print(f"{'statements':>10} {'full parse':>12} {'change line':>12} {'insert line':>12} {'delete line':>12}")
+    for size in (QUICK_SIZES if quick else SIZES):
+        full, changed, inserted, deleted = run_size(size, repeat)
+        print(f"{size:>10} {full * 1000:>9.2f} ms {changed * 1000:>9.3f} ms "
+              f"{inserted * 1000:>9.3f} ms {deleted * 1000:>9.3f} ms")
+
+if __name__ == '__main__':
+    options = {"quick": False, "repeat": 20}
+    for arg in sys.argv[1:]:
+        name, _, value = arg.partition("=")
+        if name == "--quick":
+            options["quick"] = True
+        elif name == "--repeat":
+            options["repeat"] = int(value)
+        else:
+            print(f"Unknown option '{arg}'. Options: --quick --repeat=N")
+            sys.exit(2)
+    main(**options)
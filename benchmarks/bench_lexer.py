@@ -0,0 +1,49 @@
+# benchmarks/bench_lexer.py
+# Throughput benchmark: single-pass tokenize() vs. the line-by-line tokenize_reference()
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from lexer import tokenize, tokenize_reference
+
+def generate_many_lines(count):
+    """Many short statements, like a typical hand-written script."""
+    lines = []
+    for i in range(count):
+        lines.append(f'קבע משתנה_{i} = ({i} + 3) * 2 - {i} / 4 # הערה')
+        lines.append(f'הדפס "שורה מספר" + משתנה_{i}')
+    return '\n'.join(lines)
+
+def generate_long_line(terms):
+    """A single very long arithmetic line, the worst case for per-line slicing."""
+    return 'הדפס ' + ' + '.join(f'({i} * 2)' for i in range(terms))
+
+def measure(func, code, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(code)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def run_case(name, code):
+    assert [(t.type, t.value, t.line, t.column) for t in tokenize(code)] == \
+           [(t.type, t.value, t.line, t.column) for t in tokenize_reference(code)]
+    size_mb = len(code.encode('utf-8')) / (1024 * 1024)
+    new_time = measure(tokenize, code)
+    old_time = measure(tokenize_reference, code)
+    print(f"{name:<28} {size_mb:8.2f} MB  "
+          f"reference {size_mb / old_time:8.2f} MB/s  "
+          f"single-pass {size_mb / new_time:8.2f} MB/s  "
+          f"speedup x{old_time / new_time:.1f}")
+
+if __name__ == '__main__':
+    print("--- Lexer throughput ---")
+    for count in (1000, 5000, 20000):
+        run_case(f"many lines ({count * 2})", generate_many_lines(count))
+    for terms in (500, 2000, 4000):
+        run_case(f"long line ({terms} terms)", generate_long_line(terms))
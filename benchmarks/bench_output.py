@@ -0,0 +1,88 @@
+# benchmarks/bench_output.py
+# Print throughput: one print() per line (the old PrintNode path) vs the
+# buffered OutputWriter in each flush mode, writing to the null device
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from lexer import tokenize_compact
+from parser import parse
+from interpreter import interpret, format_value_for_output
+from output import OutputWriter, FLUSH_MODES, set_writer
+
+def generate_values(count):
+    """The mix of values a print-heavy script produces."""
+    values = []
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            values.append(f"שורה מספר {i}")
+        elif kind == 1:
+            values.append(i)
+        elif kind == 2:
+            values.append(i / 7)
+        else:
+            values.append(i % 2 == 0)
+    return values
+
+def generate_program(count):
+    lines = ['קבע מונה = 0']
+    for i in range(count):
+        lines.append('קבע מונה = מונה + 1')
+        lines.append('הדפס "שורה: " + מונה')
+    return '\n'.join(lines)
+
+def measure(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+if __name__ == '__main__':
+    with open(os.devnull, 'w', encoding='utf-8') as devnull:
+        print("--- Print throughput (best of 5, lines per second) ---")
+        print(f"{'lines':>8} {'print()':>12}" + "".join(f" {mode:>12}" for mode in FLUSH_MODES))
+        for count in (1000, 10000, 100000):
+            values = generate_values(count)
+
+            def with_print():
+                for value in values:
+                    print(format_value_for_output(value), file=devnull)
+                devnull.flush()
+
+            row = f"{count:>8} {count / measure(with_print):>12.0f}"
+            for mode in FLUSH_MODES:
+                writer = OutputWriter(devnull, mode)
+
+                def with_writer():
+                    write_value = writer.write_value
+                    for value in values:
+                        write_value(value)
+                    writer.flush()
+                    devnull.flush()
+
+                row += f" {count / measure(with_writer):>12.0f}"
+            print(row)
+
+        print("\n--- Print-heavy program on the tree engine (best of 5, ms) ---")
+        program = parse(tokenize_compact(generate_program(50000)))
+        previous_stdout = sys.stdout
+        sys.stdout = devnull
+        try:
+            results = []
+            for mode in FLUSH_MODES:
+                writer = OutputWriter(devnull, mode)
+                set_writer(writer)
+                results.append((mode, measure(lambda: interpret(program))))
+                writer.flush()
+            set_writer(None)
+        finally:
+            sys.stdout = previous_stdout
+        for mode, elapsed in results:
+            print(f"  {mode:<6} {elapsed * 1000:>10.2f}")
@@ -0,0 +1,110 @@
+# benchmarks/bench_startup.py
+# Measures the startup cost of `python src/main.py <file>`: process wall time
+# and the module imports reported by `python -X importtime`, compared with a
+# bare `python -c pass`.
+#
+#   python bench_startup.py [--runs=N] [--file=path.aron] [--budget=MS] [--top=N]
+#
+# --budget fails (exit status 1) if the median import time added by main.py
+# exceeds MS milliseconds. Modules in FORBIDDEN_MODULES must never be imported
+# when a cached program runs, whatever the machine; importing one also fails.
+#
+# Bytecode writing is enabled for the measured runs (PYTHONDONTWRITEBYTECODE is
+# removed from their environment), since that is how main.py is normally run;
+# the first run only warms the bytecode and program caches.
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, 'src', 'main.py')
+DEFAULT_FILE = os.path.join(ROOT, 'examples', 'hello.aron')
+
+# Default budget, in ms, for the imports main.py adds to a bare interpreter
+IMPORT_BUDGET_MS = 10.0
+
+# Not needed to run a cached program: lexing, RTL formatting and the engines
+# other than the tree-walker are imported only when they are used
+FORBIDDEN_MODULES = ("lexer", "re", "rtl_formatter", "set_console_rtl", "closure_compiler", "compiler", "vm", "transpiler", "optimizer")
+
+def parse_importtime(stderr):
+    """Return {module: (self us, cumulative us, depth)} from -X importtime output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return modules
+
+def total_import_us(modules):
+    """Sum of the cumulative times of the top-level imports."""
+    return sum(cumulative for _, cumulative, depth in modules.values() if depth == 0)
+
+def run_once(args, env):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime"] + args, env=env, cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, encoding="utf-8")
+    return time.perf_counter() - start, parse_importtime(result.stderr)
+
+def measure(args, runs, env):
+    """Warm up once, then return (wall seconds list, import us list, modules of the last run)."""
+    run_once(args, env)
+    walls, imports, modules = [], [], {}
+    for _ in range(runs):
+        wall, modules = run_once(args, env)
+        walls.append(wall)
+        imports.append(total_import_us(modules))
+    return walls, imports, modules
+
+def main(runs=10, path=DEFAULT_FILE, budget=IMPORT_BUDGET_MS, top=10):
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+
+    bare_walls, bare_imports, bare_modules = measure(["-c", "pass"], runs, env)
+    walls, imports, modules = measure([MAIN, path], runs, env)
+
+    added_ms = (statistics.median(imports) - statistics.median(bare_imports)) / 1000
+    print(f"--- Startup of main.py {os.path.relpath(path, ROOT)} ({runs} runs) ---")
+    print(f"{'':<14} {'wall min':>10} {'wall median':>12} {'imports median':>15}")
+    print(f"{'bare python':<14} {min(bare_walls) * 1000:>8.1f} ms {statistics.median(bare_walls) * 1000:>9.1f} ms "
+          f"{statistics.median(bare_imports) / 1000:>12.1f} ms")
+    print(f"{'main.py':<14} {min(walls) * 1000:>8.1f} ms {statistics.median(walls) * 1000:>9.1f} ms "
+          f"{statistics.median(imports) / 1000:>12.1f} ms")
+
+    print(f"\nSlowest modules imported by main.py (last run, self time):")
+    added = [(name, self_us) for name, (self_us, _, _) in modules.items() if name not in bare_modules]
+    for name, self_us in sorted(added, key=lambda item: item[1], reverse=True)[:top]:
+        print(f"  {self_us / 1000:>8.2f} ms  {name}")
+
+    failed = False
+    print(f"\nImports added by main.py: {added_ms:.1f} ms (budget {budget:g} ms)")
+    if added_ms > budget:
+        print("OVER BUDGET")
+        failed = True
+    forbidden = [name for name in FORBIDDEN_MODULES if name in modules]
+    if forbidden:
+        print(f"Imported on the fast path: {', '.join(forbidden)}")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    options = {"runs": 10, "path": DEFAULT_FILE, "budget": IMPORT_BUDGET_MS, "top": 10}
+    for arg in sys.argv[1:]:
+        name, _, value = arg.partition("=")
+        if name == "--runs":
+            options["runs"] = int(value)
+        elif name == "--file":
+            options["path"] = os.path.abspath(value)
+        elif name == "--budget":
+            options["budget"] = float(value)
+        elif name == "--top":
+            options["top"] = int(value)
+        else:
+            print(f"Unknown option '{arg}'. Options: --runs=N --file=path.aron --budget=MS --top=N")
+            sys.exit(2)
+    sys.exit(main(**options))
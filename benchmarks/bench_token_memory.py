@@ -0,0 +1,45 @@
+# benchmarks/bench_token_memory.py
+# Memory comparison of lexer output representations on a large generated script
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from lexer import tokenize, tokenize_compact, tokenize_reference
+
+def generate_script(count):
+    lines = []
+    for i in range(count):
+        lines.append(f'קבע משתנה_{i % 100} = ({i} + 3) * 2 - מונה / 4')
+        lines.append(f'הדפס "תוצאה: " + משתנה_{i % 100}')
+        lines.append('אם מונה > 10')
+        lines.append('    הדפס "גדול"')
+        lines.append('סוף')
+    return '\n'.join(lines)
+
+def measure(func, code):
+    """Return (retained bytes, token count) for the structure func(code) builds."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = func(code)
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return retained, len(result)
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    code = generate_script(count)
+    source_bytes = len(code.encode('utf-8'))
+
+    print(f"--- Token memory ({count * 5} lines, source {source_bytes / 1024 / 1024:.2f} MB) ---")
+    for name, func in [
+        ("tokenize_reference (no interning)", tokenize_reference),
+        ("tokenize (slotted, interned)", tokenize),
+        ("tokenize_compact (TokenTable)", tokenize_compact),
+    ]:
+        retained, token_count = measure(func, code)
+        print(f"{name:<36} {retained / 1024 / 1024:8.2f} MB  "
+              f"{retained / token_count:6.1f} B/token  "
+              f"x{retained / source_bytes:.2f} source")
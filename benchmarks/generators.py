@@ -0,0 +1,78 @@
+# benchmarks/generators.py
+# Synthetic Aron programs whose size scales with a single parameter
+
+def generate_assignments(count):
+    """count assignments, each reading the variable assigned just before it."""
+    lines = ['קבע משתנה_0 = 0']
+    for i in range(1, count):
+        lines.append(f'קבע משתנה_{i} = משתנה_{i - 1} + {i % 10}')
+    lines.append(f'הדפס משתנה_{count - 1}')
+    return '\n'.join(lines)
+
+def generate_arithmetic_chain(terms):
+    """One print of a single expression with terms operands (a left-deep tree)."""
+    operators = ('+', '*', '-', '+')
+    expression = '1'
+    for i in range(1, terms):
+        expression += f' {operators[i % 4]} {i % 9 + 1}'
+    return f'קבע מונה = 3\nהדפס {expression} + מונה'
+
+def generate_nested_if(depth):
+    """depth levels of אם/אחרת, each nested in the if-branch of the one above."""
+    lines = ['קבע מונה = 0']
+    for i in range(depth):
+        indent = '    ' * i
+        lines.append(f'{indent}אם מונה < {depth - i}')
+        lines.append(f'{indent}    קבע מונה = מונה + 1')
+    lines.append('    ' * depth + 'הדפס מונה')
+    for i in range(depth - 1, -1, -1):
+        indent = '    ' * i
+        lines.append(f'{indent}אחרת')
+        lines.append(f'{indent}    הדפס "עומק {i}"')
+        lines.append(f'{indent}סוף')
+    return '\n'.join(lines)
+
+def generate_string_concat(count):
+    """count concatenations onto a growing string, printed every 1000 steps."""
+    lines = ['קבע טקסט = ""']
+    for i in range(count):
+        lines.append(f'קבע טקסט = טקסט + "חלק {i % 10} "')
+        if i % 1000 == 999:
+            lines.append('הדפס "אורך: " + טקסט')
+    return '\n'.join(lines)
+
+def generate_report(pieces):
+    """One print of a single '+' chain of pieces strings and variables, as in a report line."""
+    parts = ['"שורה: "']
+    for i in range(1, pieces):
+        parts.append(f'"פריט {i % 10} "' if i % 2 else 'מונה')
+    return 'קבע מונה = 7\nהדפס ' + ' + '.join(parts)
+
+def generate_nested_parens(depth):
+    """One print of an expression nested in depth pairs of parentheses."""
+    return 'קבע מונה = 2\nהדפס ' + '(' * depth + 'מונה' + ' + 1)' * depth
+
+def generate_while_loop(iterations):
+    """One כל_עוד loop running iterations times, with arithmetic and an אם in its body."""
+    return '\n'.join([
+        'קבע מונה = 0',
+        'קבע סכום = 0',
+        f'כל_עוד מונה < {iterations}',
+        '    קבע סכום = סכום + מונה * 2',
+        '    אם סכום > 1000',
+        '        קבע סכום = סכום - 1000',
+        '    סוף',
+        '    קבע מונה = מונה + 1',
+        'סוף',
+        'הדפס סכום',
+    ])
+
+# name -> (generator, sizes, quick sizes)
+WORKLOADS = {
+    "assignments": (generate_assignments, (1000, 10000, 50000), (1000, 5000)),
+    "arithmetic_chain": (generate_arithmetic_chain, (100, 400, 800), (100, 400)),
+    "nested_if": (generate_nested_if, (10, 100, 300), (10, 100)),
+    "string_concat": (generate_string_concat, (1000, 5000, 20000), (1000, 5000)),
+    "report": (generate_report, (100, 500, 900), (100, 500)),
+    "while_loop": (generate_while_loop, (10000, 100000, 1000000), (10000, 100000)),
+}
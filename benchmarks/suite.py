@@ -0,0 +1,151 @@
+# benchmarks/suite.py
+# Times tokenize, parse and interpret separately on the synthetic workloads
+# of generators.py, at several sizes.
+#
+#   python suite.py [--quick] [--repeat=N] [--workload=name] [--output=results.json]
+#   python suite.py --compare=baseline.json [--threshold=10]
+#
+# --output writes the results as JSON; --compare runs the suite and reports
+# every measurement that got slower or faster than the baseline by more than
+# --threshold percent (the exit status is 1 if anything got slower).
+
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from lexer import tokenize
+from parser import parse
+from interpreter import interpret
+from output import OutputWriter, set_writer
+from generators import WORKLOADS
+
+PHASES = ("tokenize", "parse", "interpret")
+FORMAT_VERSION = 1
+
+def measure(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def run_workload(name, size, repeat):
+    """Return the result records of one workload at one size."""
+    code = WORKLOADS[name][0](size)
+    records = []
+    base = {"workload": name, "size": size, "bytes": len(code.encode('utf-8'))}
+    try:
+        tokens = tokenize(code)
+        records.append(dict(base, phase="tokenize", seconds=measure(lambda: tokenize(code), repeat)))
+        program = parse(tokens)
+        records.append(dict(base, phase="parse", seconds=measure(lambda: parse(tokens), repeat)))
+        records.append(dict(base, phase="interpret", seconds=measure(lambda: interpret(program), repeat)))
+    except (RecursionError, RuntimeError, SyntaxError) as e:
+        # Record the phase that failed (e.g. too deep for the recursive parser)
+        phase = PHASES[len(records)]
+        records.append(dict(base, phase=phase, seconds=None, error=f"{type(e).__name__}: {e}"))
+    return records
+
+def run_suite(quick=False, repeat=5, workloads=None):
+    results = []
+    with open(os.devnull, 'w', encoding='utf-8') as devnull:
+        writer = OutputWriter(devnull)
+        previous = set_writer(writer)
+        try:
+            for name, (_, sizes, quick_sizes) in WORKLOADS.items():
+                if workloads and name not in workloads:
+                    continue
+                for size in (quick_sizes if quick else sizes):
+                    for record in run_workload(name, size, repeat):
+                        results.append(record)
+                        print_record(record)
+        finally:
+            writer.flush()
+            set_writer(previous)
+    return {
+        "format": FORMAT_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "repeat": repeat,
+        "results": results,
+    }
+
+def print_record(record):
+    label = f"{record['workload']:<18} {record['size']:>8} {record['phase']:<10}"
+    if record["seconds"] is None:
+        print(f"{label} {'failed':>12}  {record['error']}")
+    else:
+        print(f"{label} {record['seconds'] * 1000:>10.2f} ms")
+
+def compare(results, baseline, threshold):
+    """Print changes beyond threshold percent. Returns the number of slowdowns."""
+    def key(record):
+        return (record["workload"], record["size"], record["phase"])
+    old = {key(record): record for record in baseline["results"]}
+    slower = 0
+    print(f"\n--- Comparison with baseline ({baseline.get('timestamp', 'unknown date')}, threshold {threshold:g}%) ---")
+    for record in results["results"]:
+        previous = old.get(key(record))
+        if previous is None:
+            continue
+        label = f"{record['workload']:<18} {record['size']:>8} {record['phase']:<10}"
+        if record["seconds"] is None or previous["seconds"] is None:
+            if (record["seconds"] is None) != (previous["seconds"] is None):
+                status = "now fails" if record["seconds"] is None else "now passes"
+                slower += record["seconds"] is None
+                print(f"{label} {status}")
+            continue
+        change = (record["seconds"] / previous["seconds"] - 1) * 100
+        if change > threshold:
+            slower += 1
+            print(f"{label} {previous['seconds'] * 1000:>10.2f} -> {record['seconds'] * 1000:>10.2f} ms  SLOWER {change:+.1f}%")
+        elif change < -threshold:
+            print(f"{label} {previous['seconds'] * 1000:>10.2f} -> {record['seconds'] * 1000:>10.2f} ms  faster {change:+.1f}%")
+    if not slower:
+        print("No slowdowns.")
+    return slower
+
+if __name__ == '__main__':
+    options = {"quick": False, "repeat": 5, "workloads": None, "output": None, "compare": None, "threshold": 10.0}
+    for arg in sys.argv[1:]:
+        name, _, value = arg.partition("=")
+        if name == "--quick":
+            options["quick"] = True
+        elif name == "--repeat":
+            options["repeat"] = int(value)
+        elif name == "--workload":
+            options["workloads"] = value.split(",")
+        elif name == "--output":
+            options["output"] = value
+        elif name == "--compare":
+            options["compare"] = value
+        elif name == "--threshold":
+            options["threshold"] = float(value)
+        else:
+            print(f"Unknown option '{arg}'. Options: --quick --repeat=N --workload=a,b --output=FILE --compare=FILE --threshold=PERCENT")
+            sys.exit(2)
+    if options["workloads"]:
+        unknown = [name for name in options["workloads"] if name not in WORKLOADS]
+        if unknown:
+            print(f"Unknown workload(s): {', '.join(unknown)}. Available: {', '.join(WORKLOADS)}")
+            sys.exit(2)
+
+    print(f"--- Benchmark suite (best of {options['repeat']}) ---")
+    results = run_suite(options["quick"], options["repeat"], options["workloads"])
+
+    if options["output"]:
+        with open(options["output"], 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\nResults written to {options['output']}")
+
+    if options["compare"]:
+        with open(options["compare"], encoding='utf-8') as f:
+            baseline = json.load(f)
+        sys.exit(1 if compare(results, baseline, options["threshold"]) else 0)
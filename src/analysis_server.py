@@ -0,0 +1,313 @@
+# src/analysis_server.py
+# Long-lived analysis server for editors. It keeps the open documents lexed
+# and parsed in memory (incremental.Document, built on the lexer's scanner
+# and parser.Parser) and answers diagnostics, completion and go-to-definition
+# requests about them.
+#
+# Same transport as server.py: JSON-RPC 2.0, one JSON message per line over
+# stdio. Lines and characters are 0-based, as in VS Code (characters count
+# code points; for Hebrew text that is the same as VS Code's UTF-16 units).
+# Methods:
+#
+#   ping                                  -> {"version": ...}
+#   open {path, text, version?}           a document was opened in the editor
+#   change {path, changes, version?}      edits [{range: {start: {line, character}, end: ...}, text}],
+#                                         applied in order (or {path, text}: the whole new text)
+#   close {path}                          the document was closed
+#   diagnostics {path}                    -> {path, version, diagnostics}, without waiting
+#   completion {path, line, character}    -> {"items": [{"label": name}]}: the variables assigned
+#                                         with קבע whose name starts with the word at the cursor
+#   definition {path, line, character}    -> {"locations": [{line, character}]}: where the
+#                                         variable at the cursor is assigned
+#   cancel {id}                           cancel a request that was not answered yet
+#   shutdown                              -> stop the server
+#
+# Diagnostics are pushed as {"method": "diagnostics", "params": {path,
+# version, diagnostics: [{line, character, severity, message}]}}
+# notifications. path is only a name for the document; files are never read.
+#
+# Messages are read on a separate thread and handled in batches: everything
+# that arrived while the previous batch was handled is taken at once, and
+# handled in arrival order, so a request is answered against the text it was
+# sent for. Edits are applied without parsing, and a request cancelled in the
+# same batch (or sent for an older version of its document) is answered with
+# an error without doing its work. A document is parsed, and its diagnostics
+# published, once no edit has arrived for DEBOUNCE_SECONDS, or earlier when a
+# request needs its symbols. Fast typing therefore costs one parse per pause.
+
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+
+from jsonrpc import RequestError, PARSE_ERROR, INVALID_REQUEST, METHOD_NOT_FOUND, INVALID_PARAMS, INTERNAL_ERROR, take_stdout
+from lexer import LexerError
+from incremental import Document
+
+ANALYSIS_VERSION = 1
+
+# Quiet time after the last edit of a document before it is parsed and its diagnostics published
+DEBOUNCE_SECONDS = 0.2
+
+# JSON-RPC error code of a cancelled request (as in the Language Server Protocol)
+REQUEST_CANCELLED = -32800
+
+# Methods that change the server's documents (or cancel a request); answered without parsing
+EDIT_METHODS = ("open", "change", "close", "cancel")
+
+# The identifier characters just before the cursor
+WORD_BEFORE_CURSOR = re.compile(r'[א-ת0-9_]*$')
+
+class OpenDocument:
+    __slots__ = ("document", "version")
+
+    def __init__(self, document, version):
+        self.document = document
+        self.version = version
+
+def read_messages(reader, messages):
+    """Queue every line of reader, then None at end of input."""
+    for line in reader:
+        messages.put(line)
+    messages.put(None)
+
+def parse_request(line):
+    try:
+        request = json.loads(line)
+    except ValueError as e:
+        raise RequestError(PARSE_ERROR, f"Invalid JSON: {e}")
+    if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+        raise RequestError(INVALID_REQUEST, "Expected a JSON-RPC request object")
+    if not isinstance(request.get("params") or {}, dict):
+        raise RequestError(INVALID_PARAMS, "params must be an object")
+    return request
+
+def apply_change(document, change):
+    """Apply one editor edit (a character range and its new text) to a Document, without parsing."""
+    try:
+        start, end, text = change["range"]["start"], change["range"]["end"], change["text"]
+        first, first_character = start["line"], start["character"]
+        last, last_character = end["line"], end["character"]
+    except (KeyError, TypeError):
+        raise RequestError(INVALID_PARAMS, "A change needs a range {start, end} of {line, character} and a text")
+    if not all(is_integer(value) for value in (first, first_character, last, last_character)) or not isinstance(text, str):
+        raise RequestError(INVALID_PARAMS, "A change needs a range {start, end} of {line, character} and a text")
+    lines = document.lines
+    if not 0 <= first <= last < len(lines) or first_character < 0 or last_character < 0:
+        raise RequestError(INVALID_PARAMS, f"Change range {first}..{last} is outside the document ({len(lines)} lines)")
+    new_text = lines[first][:first_character] + text + lines[last][last_character:]
+    document.edit(first + 1, last + 2, new_text.split("\n"), parse=False)
+
+def is_integer(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def parse_quietly(document):
+    """Parse the document's pending edits; errors are kept in document.error."""
+    try:
+        document.refresh()
+    except (LexerError, SyntaxError, RecursionError):
+        pass
+    return document
+
+def identifier_at(document, line, column):
+    """Name of the identifier token at a 1-based position, or None."""
+    if not 1 <= line <= len(document.lines):
+        return None
+    for token_type, value, token_column in document.line_tokens[line - 1] or ():
+        if token_type == "IDENTIFIER" and token_column <= column <= token_column + len(value):
+            return value
+    return None
+
+class AnalysisServer:
+    def __init__(self, writer, delay=DEBOUNCE_SECONDS):
+        self.writer = writer
+        self.delay = delay
+        self.documents = {} # path -> OpenDocument
+        self.due = {} # path -> time.monotonic() at which to publish its diagnostics
+        self.stopping = False
+
+    def send(self, message):
+        self.writer.write(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.writer.flush()
+
+    def reply(self, request_id, result=None, error=None):
+        if error is not None:
+            self.send({"jsonrpc": "2.0", "id": request_id, "error": {"code": error.code, "message": str(error)}})
+        elif request_id is not None:
+            self.send({"jsonrpc": "2.0", "id": request_id, "result": result})
+
+    def serve(self, reader):
+        """Handle messages from reader (a binary file) until it ends or a shutdown request."""
+        messages = queue.Queue()
+        threading.Thread(target=read_messages, args=(reader, messages), daemon=True).start()
+        while not self.stopping:
+            timeout = max(0, min(self.due.values()) - time.monotonic()) if self.due else None
+            try:
+                batch = [messages.get(timeout=timeout)]
+            except queue.Empty:
+                batch = []
+            while True:
+                try:
+                    batch.append(messages.get_nowait())
+                except queue.Empty:
+                    break
+            self.handle_batch(batch)
+            self.publish_due()
+
+    def handle_batch(self, lines):
+        messages = [] # Requests, or the RequestError of a message that is not one
+        for line in lines:
+            if line is None:
+                self.stopping = True
+                break
+            if not line.strip():
+                continue
+            try:
+                messages.append(parse_request(line))
+            except RequestError as e:
+                messages.append(e)
+        # A cancel also applies to a request before it in the same batch
+        cancelled = set()
+        for message in messages:
+            if isinstance(message, dict) and message["method"] == "cancel":
+                cancel_id = (message.get("params") or {}).get("id")
+                if isinstance(cancel_id, (int, str)):
+                    cancelled.add(cancel_id)
+
+        # In arrival order: a request sees the edits sent before it, and none after it
+        for message in messages:
+            request_id = None
+            try:
+                if isinstance(message, RequestError):
+                    raise message
+                request_id = message.get("id")
+                method, params = message["method"], message.get("params") or {}
+                if method in EDIT_METHODS:
+                    if method == "cancel":
+                        if not isinstance(params.get("id"), (int, str)):
+                            raise RequestError(INVALID_PARAMS, "cancel expects the 'id' of a request")
+                    else:
+                        self.edit(method, params)
+                    self.reply(request_id, {"ok": True})
+                elif request_id is not None and request_id in cancelled:
+                    raise RequestError(REQUEST_CANCELLED, "Request cancelled")
+                else:
+                    self.reply(request_id, self.handle(method, params))
+            except RequestError as e:
+                self.reply(request_id, error=e)
+            except Exception as e:
+                # One failing message must not end the server, and with it diagnostics for every document
+                self.reply(request_id, error=RequestError(INTERNAL_ERROR, f"An unexpected error occurred: {e}"))
+
+    def edit(self, method, params):
+        path = params.get("path")
+        if not isinstance(path, str):
+            raise RequestError(INVALID_PARAMS, f"{method} expects a 'path'")
+        if params.get("version") is not None and not is_integer(params["version"]):
+            raise RequestError(INVALID_PARAMS, "version must be an integer")
+        if method == "open":
+            text = params.get("text")
+            if not isinstance(text, str):
+                raise RequestError(INVALID_PARAMS, "open expects the document's 'text'")
+            self.documents[path] = OpenDocument(Document(text), params.get("version") or 0)
+            self.due[path] = time.monotonic()
+        elif method == "change":
+            entry = self.open_document(path)
+            document = entry.document
+            if isinstance(params.get("text"), str):
+                document.edit(1, len(document.lines) + 1, params["text"].split("\n"), parse=False)
+            else:
+                for change in params.get("changes") or ():
+                    apply_change(document, change)
+            version = params.get("version")
+            entry.version = version if version is not None else entry.version + 1
+            self.due[path] = time.monotonic() + self.delay
+        else:
+            self.documents.pop(path, None)
+            self.due.pop(path, None)
+
+    def handle(self, method, params):
+        if method == "ping":
+            return {"version": ANALYSIS_VERSION}
+        elif method == "diagnostics":
+            path = params.get("path")
+            self.due.pop(path, None)
+            return self.diagnostics(path)
+        elif method == "completion":
+            document, line, character = self.position(params)
+            prefix = WORD_BEFORE_CURSOR.search(document.lines[line][:character]).group()
+            return {"items": [{"label": name} for name in sorted(document.definitions) if name.startswith(prefix)]}
+        elif method == "definition":
+            document, line, character = self.position(params)
+            return {"locations": self.definitions(document, identifier_at(document, line + 1, character + 1))}
+        elif method == "shutdown":
+            self.stopping = True
+            return {"ok": True}
+        raise RequestError(METHOD_NOT_FOUND, f"Unknown method '{method}'")
+
+    def open_document(self, path):
+        entry = self.documents.get(path)
+        if entry is None:
+            raise RequestError(INVALID_PARAMS, f"Document '{path}' is not open")
+        return entry
+
+    def position(self, params):
+        """(parsed Document, line, character) of a request about a position in a document."""
+        entry = self.open_document(params.get("path"))
+        version = params.get("version")
+        if version is not None and not is_integer(version):
+            raise RequestError(INVALID_PARAMS, "version must be an integer")
+        if version is not None and version < entry.version:
+            raise RequestError(REQUEST_CANCELLED, "The document changed since the request was sent")
+        line, character = params.get("line"), params.get("character")
+        document = entry.document
+        if not isinstance(line, int) or not isinstance(character, int) or not 0 <= line < len(document.lines) or character < 0:
+            raise RequestError(INVALID_PARAMS, "Expected a 'line' and 'character' inside the document")
+        return parse_quietly(document), line, character
+
+    def definitions(self, document, name):
+        """0-based positions of the variable names in the קבע statements assigning name."""
+        locations = []
+        for node in document.definitions.get(name, ()):
+            rows = document.rows_from(*document.program.positions[node])
+            next(rows) # קבע
+            _, _, line, column = next(rows)
+            locations.append({"line": line - 1, "character": column - 1})
+        locations.sort(key=lambda location: (location["line"], location["character"]))
+        return locations
+
+    def diagnostics(self, path):
+        entry = self.open_document(path)
+        document = parse_quietly(entry.document)
+        diagnostics = []
+        if document.error is not None:
+            line, column = document.error_position
+            if isinstance(document.error, RecursionError):
+                message = "Syntax Error: Expression nested too deeply to parse"
+            else:
+                kind = "Lexical" if isinstance(document.error, LexerError) else "Syntax"
+                message = f"{kind} Error: {document.error}"
+            diagnostics.append({"line": line - 1, "character": column - 1, "severity": "error", "message": message})
+        return {"path": path, "version": entry.version, "diagnostics": diagnostics}
+
+    def publish_due(self):
+        now = time.monotonic()
+        for path in [path for path, due in self.due.items() if due <= now]:
+            del self.due[path]
+            self.send({"jsonrpc": "2.0", "method": "diagnostics", "params": self.diagnostics(path)})
+
+if __name__ == '__main__':
+    delay = DEBOUNCE_SECONDS
+    for arg in sys.argv[1:]:
+        if arg.startswith("--debounce="):
+            delay = float(arg.split("=", 1)[1]) / 1000
+        else:
+            print("Usage: python analysis_server.py [--debounce=<ms>]")
+            sys.exit(1)
+    # The protocol owns stdout; anything else printed goes to stderr
+    AnalysisServer(take_stdout().buffer, delay).serve(sys.stdin.buffer)
+    # The reader thread may still be blocked reading stdin, which aborts a normal interpreter shutdown
+    os._exit(0)
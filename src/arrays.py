@@ -0,0 +1,159 @@
+# src/arrays.py
+# Aron's array values, backed by NumPy. An array literal ([1, 2, 3]) becomes
+# an ArrayValue, a one-dimensional ndarray of int64, float64 or bool. The
+# arithmetic and comparison operators apply element by element in NumPy's
+# compiled loops, between two arrays of the same length or between an array
+# and a number. Indexing with a number returns one element; indexing with an
+# array of booleans (e.g. א[א > 1]) or of positions selects several.
+#
+# NumPy is optional: this module is imported by interpreter.load_arrays() the
+# first time a program builds an array, so programs without arrays run (and
+# start) without it. Unlike Python integers, int64 elements wrap around on
+# overflow.
+
+import numpy
+
+from interpreter import AronRuntimeError
+
+TRUE_TEXT = "אמת"
+FALSE_TEXT = "שקר"
+
+# Elements shown by print before the middle of the array is elided with "..."
+PRINT_THRESHOLD = 1000
+
+def format_element(value):
+    if isinstance(value, numpy.bool_):
+        return TRUE_TEXT if value else FALSE_TEXT
+    if isinstance(value, numpy.floating):
+        return repr(float(value)) # 1.0 and 0.5, like a printed number
+    return str(value)
+
+def numeric(value):
+    """value, with a boolean array converted to integers (אמת + אמת is 2, as for single values)."""
+    if isinstance(value, numpy.ndarray) and value.dtype == numpy.bool_:
+        return value.astype(numpy.int64)
+    return value
+
+def check_operand(value, symbol):
+    if not isinstance(value, (ArrayValue, int, float)):
+        raise AronRuntimeError(f"The '{symbol}' operator requires numbers or arrays, got {type(value)}")
+
+def elementwise(function, left_val, right_val, symbol):
+    """Apply a NumPy ufunc to two arrays, or an array and a number, as an ArrayValue."""
+    check_operand(left_val, symbol)
+    check_operand(right_val, symbol)
+    # Checked here because NumPy would broadcast an array of length 1 to any length
+    if isinstance(left_val, ArrayValue) and isinstance(right_val, ArrayValue) and len(left_val) != len(right_val):
+        raise AronRuntimeError(f"The '{symbol}' operator requires arrays of the same length, "
+                               f"got {len(left_val)} and {len(right_val)}")
+    try:
+        return function(numeric(left_val), numeric(right_val)).view(ArrayValue)
+    except OverflowError:
+        raise AronRuntimeError(f"The '{symbol}' operator got a number too large for an array element")
+
+def compare(function, symbol):
+    def method(self, other):
+        if not isinstance(other, (ArrayValue, int, float)):
+            if function is numpy.equal or function is numpy.not_equal:
+                return numpy.full(len(self), function is numpy.not_equal).view(ArrayValue)
+            raise AronRuntimeError(f"Cannot compare an array with {type(other)} using '{symbol}'")
+        return elementwise(function, self, other, symbol)
+    return method
+
+class ArrayValue(numpy.ndarray):
+    """A one-dimensional Aron array. Operators return new arrays; elements are never changed in place."""
+
+    def __str__(self):
+        return numpy.array2string(self, separator=", ", threshold=PRINT_THRESHOLD, max_line_width=2 ** 31,
+                                  formatter={"all": format_element})
+
+    def __repr__(self):
+        return f"ArrayValue({self})"
+
+    def __bool__(self):
+        raise AronRuntimeError("An array cannot be used as a condition")
+
+    def __add__(self, other):
+        return elementwise(numpy.add, self, other, "+")
+
+    def __radd__(self, other):
+        return elementwise(numpy.add, other, self, "+")
+
+    __eq__ = compare(numpy.equal, "==")
+    __ne__ = compare(numpy.not_equal, "!=")
+    __lt__ = compare(numpy.less, "<")
+    __gt__ = compare(numpy.greater, ">")
+    __le__ = compare(numpy.less_equal, "<=")
+    __ge__ = compare(numpy.greater_equal, ">=")
+    __hash__ = None
+
+def make_array(elements):
+    """The ArrayValue of a list of evaluated array literal elements."""
+    for element in elements:
+        if not isinstance(element, (int, float)): # bool is an int
+            raise AronRuntimeError(f"Array elements must be numbers or booleans, got {type(element)}")
+    array = numpy.array(elements, dtype=None if elements else numpy.int64)
+    if array.dtype == object:
+        raise AronRuntimeError("Array element is too large")
+    return array.view(ArrayValue)
+
+def subtract(left_val, right_val):
+    return elementwise(numpy.subtract, left_val, right_val, "-")
+
+def multiply(left_val, right_val):
+    return elementwise(numpy.multiply, left_val, right_val, "*")
+
+def divide(left_val, right_val):
+    check_operand(left_val, "/")
+    check_operand(right_val, "/")
+    if not numpy.asarray(right_val).all():
+        raise AronRuntimeError("Division by zero")
+    return elementwise(numpy.true_divide, left_val, right_val, "/")
+
+def index(array, position):
+    """array[position]: one element for a number, a new array for an array of booleans or positions."""
+    if isinstance(position, ArrayValue):
+        try:
+            return array[numeric(position) if position.dtype != numpy.bool_ else position].view(ArrayValue)
+        except IndexError as error:
+            raise AronRuntimeError(f"Invalid array index: {error}")
+    if not isinstance(position, int) or isinstance(position, bool):
+        raise AronRuntimeError(f"Array index must be an integer or an array, got {type(position)}")
+    if not -len(array) <= position < len(array):
+        raise AronRuntimeError(f"Array index {position} out of range for an array of length {len(array)}")
+    return array[position].item()
+
+def array_range(count):
+    if not isinstance(count, int) or isinstance(count, bool):
+        raise AronRuntimeError(f"טווח requires an integer, got {type(count)}")
+    return numpy.arange(max(count, 0), dtype=numpy.int64).view(ArrayValue)
+
+def length(array):
+    if not isinstance(array, ArrayValue):
+        raise AronRuntimeError(f"אורך requires an array or a string, got {type(array)}")
+    return len(array)
+
+def reduction(function, name):
+    def reduce(array):
+        if not isinstance(array, ArrayValue):
+            raise AronRuntimeError(f"{name} requires an array, got {type(array)}")
+        if not len(array) and function is not numpy.sum:
+            raise AronRuntimeError(f"{name} of an empty array")
+        return function(numeric(array)).item()
+    return reduce
+
+# Built-in functions (parser.FUNCTION_NAMES) on arrays
+FUNCTIONS = {
+    "סכום": reduction(numpy.sum, "סכום"),
+    "מינימום": reduction(numpy.min, "מינימום"),
+    "מקסימום": reduction(numpy.max, "מקסימום"),
+    "אורך": length,
+    "טווח": array_range,
+}
+
+if __name__ == '__main__':
+    numbers = make_array([1, 2, 3])
+    print(numbers + numbers * 2)
+    print(divide(numbers, 2))
+    print(index(numbers, numbers > 1))
+    print(FUNCTIONS["סכום"](array_range(1000000)))
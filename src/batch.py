@@ -0,0 +1,119 @@
+# src/batch.py
+# Batch runner: `python main.py run-all <dir|glob> [-j N]` runs many Aron
+# files on a process pool.
+#
+# Every file runs with its own frame and its output is captured in memory,
+# so programs in the same worker process cannot see each other's variables
+# or interleave their output. Results are printed in file order, followed by
+# a summary with timings and failures.
+
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from lexer import LexerError
+from interpreter import set_loop_limit
+from output import capture_output
+from pipeline import ITERATIVE_ENGINES, load_engine, prepare_program
+
+# Number of slowest files listed in the summary
+SLOWEST_COUNT = 5
+
+class FileResult:
+    """Outcome of running one file."""
+    __slots__ = ("path", "output", "error", "elapsed")
+
+    def __init__(self, path, output, error, elapsed):
+        self.path = path
+        self.output = output
+        self.error = error # Error message, or None if the program ran to the end
+        self.elapsed = elapsed
+
+def find_files(target):
+    """Return the sorted .aron files of a directory (recursively), a glob pattern or a single file."""
+    if os.path.isdir(target):
+        return sorted(glob.glob(os.path.join(glob.escape(target), "**", "*.aron"), recursive=True))
+    if os.path.isfile(target):
+        return [target]
+    return sorted(path for path in glob.glob(target, recursive=True) if os.path.isfile(path))
+
+def run_file(path, engine="tree", opt_level=0, use_cache=True, max_iterations=None):
+    """Run one Aron file with its output captured. Returns a FileResult.
+
+    max_iterations limits every כל_עוד loop (see interpreter.set_loop_limit),
+    so a runaway file fails instead of occupying its worker forever.
+    """
+    start = time.perf_counter()
+    error = None
+    previous_limit = set_loop_limit(max_iterations)
+    with capture_output() as captured:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                code = f.read()
+            program, _ = prepare_program(path, code, opt_level=opt_level, use_cache=use_cache,
+                                         iterative=engine in ITERATIVE_ENGINES)
+            load_engine(engine)(program)
+        except OSError as e:
+            error = f"Error: Cannot read '{path}': {e.strerror}"
+        except LexerError as e:
+            error = f"Lexical Error: {e}"
+        except SyntaxError as e:
+            error = f"Syntax Error: {e}"
+        except RuntimeError as e:
+            error = f"Runtime Error: {e}"
+        except Exception as e:
+            error = f"An unexpected error occurred: {e}"
+    set_loop_limit(previous_limit)
+    return FileResult(path, captured.getvalue(), error, time.perf_counter() - start)
+
+def _run_file(args):
+    return run_file(*args)
+
+def run_all(paths, jobs=None, engine="tree", opt_level=0, use_cache=True, max_iterations=None):
+    """Run paths on jobs worker processes (one per CPU by default); yield FileResults in order."""
+    jobs = jobs or os.cpu_count() or 1
+    tasks = [(path, engine, opt_level, use_cache, max_iterations) for path in paths]
+    if jobs == 1 or len(tasks) <= 1:
+        yield from map(_run_file, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # Small chunks keep results flowing in order without starving workers
+        chunksize = max(1, min(16, len(tasks) // (jobs * 4)))
+        yield from executor.map(_run_file, tasks, chunksize=chunksize)
+
+def format_summary(results, elapsed, jobs):
+    failures = [result for result in results if result.error is not None]
+    lines = [f"--- Ran {len(results)} files in {elapsed:.2f} s ({jobs} workers): "
+             f"{len(results) - len(failures)} passed, {len(failures)} failed ---"]
+    if results:
+        total = sum(result.elapsed for result in results)
+        lines.append(f"Total run time {total:.2f} s, average {total / len(results) * 1000:.2f} ms per file")
+        lines.append("Slowest files:")
+        for result in sorted(results, key=lambda result: result.elapsed, reverse=True)[:SLOWEST_COUNT]:
+            lines.append(f"  {result.elapsed * 1000:>10.2f} ms  {result.path}")
+    if failures:
+        lines.append("Failures:")
+        for result in failures:
+            lines.append(f"  {result.path}: {result.error}")
+    return "\n".join(lines)
+
+def main(target, jobs=None, engine="tree", opt_level=0, use_cache=True, max_iterations=None):
+    """Run every file matched by target, print outputs and a summary. Returns the exit code."""
+    paths = find_files(target)
+    if not paths:
+        print(f"Error: No .aron files found for '{target}'")
+        return 1
+    jobs = jobs or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    results = []
+    for result in run_all(paths, jobs, engine, opt_level, use_cache, max_iterations):
+        results.append(result)
+        print(f"\u200F--- {result.path} ---")
+        sys.stdout.write(result.output)
+        if result.error is not None:
+            print(result.error)
+    print(format_summary(results, time.perf_counter() - start, jobs))
+    return 1 if any(result.error is not None for result in results) else 0
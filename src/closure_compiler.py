@@ -0,0 +1,219 @@
+# src/closure_compiler.py
+# Closure-compilation execution engine.
+#
+# Instead of walking the AST on every evaluation (interpreter.evaluate_node),
+# each node is translated once into a nested Python closure. Node types and
+# operators are dispatched at compile time, so running a program only calls
+# closures. Semantics come from interpreter.py, so both engines behave the same.
+#
+# Every closure takes the running frame's list of variable values, so a
+# compiled program can be run any number of times, each with a fresh frame.
+
+from parser import PrintNode, StringNode, NumberNode, VariableNode, AssignNode, BinaryOpNode, BooleanNode, IfNode
+from parser import ConcatNode, ArrayNode, IndexNode, CallNode, WhileNode, OP_EQUALS
+from interpreter import prepare_frame, Frame, AronRuntimeError, BINARY_OPERATIONS, UNDEFINED, InlineCache, specialize
+from interpreter import make_array, index_value, call_function, run_loop
+from resolver import program_symbols
+from output import get_writer, write_value
+
+def compile_expression(node):
+    """Return a closure that evaluates the expression node given the frame values."""
+    if isinstance(node, (NumberNode, StringNode, BooleanNode)):
+        value = node.value
+        return lambda values: value
+
+    elif isinstance(node, VariableNode):
+        slot = node.slot
+
+        def load_variable(values):
+            value = values[slot]
+            if value is UNDEFINED:
+                raise AronRuntimeError(f"Undefined variable: {node.name}", node)
+            return value
+        return load_variable
+
+    elif isinstance(node, BinaryOpNode):
+        left = compile_expression(node.left)
+        right = compile_expression(node.right)
+        if node.op >= OP_EQUALS:
+            operation = BINARY_OPERATIONS[node.op]
+
+            def comparison(values):
+                left_val = left(values)
+                right_val = right(values)
+                try:
+                    return operation(left_val, right_val)
+                except AronRuntimeError as error:
+                    error.node = node
+                    raise
+            return comparison
+
+        if node.cache is None:
+            node.cache = InlineCache()
+        cache = node.cache
+
+        def binary_operation(values):
+            left_val = left(values)
+            right_val = right(values)
+            try:
+                if left_val.__class__ is cache.left_type and right_val.__class__ is cache.right_type:
+                    cache.hits += 1
+                    return cache.operation(left_val, right_val)
+                return specialize(node, left_val, right_val)
+            except AronRuntimeError as error:
+                error.node = node
+                raise
+        return binary_operation
+
+    elif isinstance(node, ConcatNode):
+        # A string literal and one other part, the most common form, is a single '+'
+        if len(node.parts) == 2:
+            first, second = node.parts
+            if isinstance(first, StringNode):
+                prefix = first.value
+                rest = compile_expression(second)
+                return lambda values: prefix + str(rest(values))
+            if isinstance(second, StringNode):
+                suffix = second.value
+                rest = compile_expression(first)
+                return lambda values: str(rest(values)) + suffix
+        parts = tuple(compile_expression(part) for part in node.parts)
+        return lambda values: "".join([str(part(values)) for part in parts])
+
+    elif isinstance(node, ArrayNode):
+        elements = tuple(compile_expression(element) for element in node.elements)
+
+        def array(values):
+            evaluated = [element(values) for element in elements]
+            try:
+                return make_array(evaluated)
+            except AronRuntimeError as error:
+                error.node = node
+                raise
+        return array
+
+    elif isinstance(node, IndexNode):
+        target = compile_expression(node.target)
+        index = compile_expression(node.index)
+
+        def index_operation(values):
+            target_val = target(values)
+            position = index(values)
+            try:
+                return index_value(target_val, position)
+            except AronRuntimeError as error:
+                error.node = node
+                raise
+        return index_operation
+
+    elif isinstance(node, CallNode):
+        name = node.name
+        argument = compile_expression(node.argument)
+
+        def call(values):
+            argument_val = argument(values)
+            try:
+                return call_function(name, argument_val)
+            except AronRuntimeError as error:
+                error.node = node
+                raise
+        return call
+
+    else:
+        raise AronRuntimeError(f"Cannot evaluate node type: {type(node)}", node)
+
+def compile_block(nodes):
+    """Return a closure that runs a list of statement nodes in order."""
+    statements = tuple(compile_statement(node) for node in nodes)
+
+    if len(statements) == 1:
+        return statements[0]
+
+    def run_block(values):
+        for statement in statements:
+            statement(values)
+    return run_block
+
+def compile_statement(node):
+    """Return a closure that executes the statement node given the frame values."""
+    if isinstance(node, PrintNode):
+        value = compile_expression(node.value_node)
+        return lambda values: write_value(value(values))
+
+    elif isinstance(node, AssignNode):
+        slot = node.variable_node.slot
+        value = compile_expression(node.value_node)
+
+        def assign(values):
+            values[slot] = value(values)
+        return assign
+
+    elif isinstance(node, IfNode):
+        condition = compile_expression(node.condition)
+        body = compile_block(node.body) if node.body else None
+        else_body = compile_block(node.else_body) if node.else_body else None
+
+        def if_statement(values):
+            condition_result = condition(values)
+            try:
+                truth = bool(condition_result) # An array as a condition raises
+            except AronRuntimeError as error:
+                error.node = node
+                raise
+            if truth:
+                if body is not None:
+                    body(values)
+            elif else_body is not None:
+                else_body(values)
+        return if_statement
+
+    elif isinstance(node, WhileNode):
+        condition = compile_expression(node.condition)
+        body = compile_block(node.body) if node.body else None
+        return lambda values: run_loop(node, condition, body, values)
+
+    else:
+        raise AronRuntimeError(f"Unknown AST node type at top level: {type(node)}", node)
+
+class CompiledProgram(list):
+    """(node, closure) pairs for the top-level statements, plus the program's symbols."""
+    __slots__ = ("symbols",)
+
+def compile_program(ast_nodes):
+    """Compile top-level statements into a CompiledProgram."""
+    symbols = program_symbols(ast_nodes)
+    compiled = CompiledProgram((node, compile_statement(node)) for node in ast_nodes)
+    compiled.symbols = symbols
+    return compiled
+
+def run_program(compiled, positions=None, frame=None):
+    """Run (node, closure) pairs; positions is used only to locate runtime errors.
+
+    Without a frame, a fresh one is created for the compiled program's variables.
+    """
+    top_level = frame is None
+    if top_level:
+        frame = Frame(compiled.symbols)
+    values = frame.values
+    node = None
+    try:
+        for node, statement in compiled:
+            statement(values)
+    except AronRuntimeError as error:
+        if positions is not None:
+            error.locate(positions, node)
+        raise
+    finally:
+        if top_level:
+            get_writer().end_run()
+
+def execute(ast_nodes, positions=None):
+    """Compile and run ast_nodes (a list or a lazy iterator of statements)."""
+    if positions is None:
+        positions = getattr(ast_nodes, "positions", None)
+    frame, statements = prepare_frame(ast_nodes)
+    # Compile statement by statement so streamed programs start running at once
+    try:
+        run_program(((node, compile_statement(node)) for node in statements), positions, frame)
+    finally:
+        get_writer().end_run()
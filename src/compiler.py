@@ -0,0 +1,209 @@
+# src/compiler.py
+# Bytecode compiler: lowers the parser AST to a flat instruction array for vm.py.
+#
+# Every instruction is two ints in CodeObject.instructions: an opcode and an
+# argument (0 when unused). Jump arguments are offsets into that array.
+
+from parser import PrintNode, StringNode, NumberNode, VariableNode, AssignNode, BinaryOpNode, BooleanNode, IfNode
+from parser import ConcatNode, ArrayNode, IndexNode, CallNode, WhileNode
+from interpreter import AronRuntimeError
+from resolver import program_symbols
+
+# Opcodes. The binary ones are numbered so that BINARY_ADD + operator code
+# gives the opcode for that operator (see parser.OP_*). BUILD_ARRAY's argument
+# is the number of elements and BUILD_STRING's the number of concatenated
+# parts; CALL's is the constant index of the function name.
+# A כל_עוד loop keeps its remaining iteration budget on the stack: LOOP_START
+# pushes it, LOOP_ITERATION counts one iteration down and LOOP_END pops it.
+(LOAD_CONST, LOAD_VAR, STORE_VAR, PRINT, JUMP, JUMP_IF_FALSE,
+ BINARY_ADD, BINARY_SUBTRACT, BINARY_MULTIPLY, BINARY_DIVIDE,
+ COMPARE_EQ, COMPARE_NE, COMPARE_LT, COMPARE_GT, COMPARE_LE, COMPARE_GE,
+ BUILD_ARRAY, INDEX, CALL, LOOP_START, LOOP_ITERATION, LOOP_END, BUILD_STRING) = range(23)
+
+OPCODE_NAMES = (
+    "LOAD_CONST", "LOAD_VAR", "STORE_VAR", "PRINT", "JUMP", "JUMP_IF_FALSE",
+    "BINARY_ADD", "BINARY_SUBTRACT", "BINARY_MULTIPLY", "BINARY_DIVIDE",
+    "COMPARE_EQ", "COMPARE_NE", "COMPARE_LT", "COMPARE_GT", "COMPARE_LE", "COMPARE_GE",
+    "BUILD_ARRAY", "INDEX", "CALL", "LOOP_START", "LOOP_ITERATION", "LOOP_END", "BUILD_STRING",
+)
+
+class CodeObject:
+    """Compiled program: instructions, a constant pool and the variable symbols.
+
+    LOAD_VAR/STORE_VAR arguments are the variable slots from resolver.py, and
+    `names` lists the variable name of each slot. `nodes` holds, for every
+    instruction, the AST node it came from. It is only read when an
+    instruction fails, to find the source position of the error.
+    """
+    __slots__ = ("instructions", "constants", "symbols", "names", "nodes")
+
+    def __init__(self, symbols):
+        self.instructions = []
+        self.constants = []
+        self.symbols = symbols
+        self.names = symbols.names
+        self.nodes = []
+
+    def __repr__(self):
+        return f"CodeObject({len(self.nodes)} instructions, {len(self.constants)} constants, {len(self.names)} names)"
+
+class Compiler:
+    def __init__(self, symbols):
+        self.code = CodeObject(symbols)
+        self.constant_indexes = {}
+
+    def emit(self, opcode, arg, node):
+        """Append an instruction and return its offset."""
+        offset = len(self.code.instructions)
+        self.code.instructions += (opcode, arg)
+        self.code.nodes.append(node)
+        return offset
+
+    def patch_jump(self, offset):
+        """Point the jump at offset to the next instruction to be emitted."""
+        self.code.instructions[offset + 1] = len(self.code.instructions)
+
+    def constant(self, value):
+        # Key by class too, so that 1, 1.0 and True get separate pool entries
+        key = (value.__class__, value)
+        index = self.constant_indexes.get(key)
+        if index is None:
+            index = self.constant_indexes[key] = len(self.code.constants)
+            self.code.constants.append(value)
+        return index
+
+    def compile_expression(self, node):
+        if isinstance(node, (NumberNode, StringNode, BooleanNode)):
+            self.emit(LOAD_CONST, self.constant(node.value), node)
+        elif isinstance(node, VariableNode):
+            self.emit(LOAD_VAR, node.slot, node)
+        elif isinstance(node, BinaryOpNode):
+            self.compile_expression(node.left)
+            self.compile_expression(node.right)
+            self.emit(BINARY_ADD + node.op, 0, node)
+        elif isinstance(node, ConcatNode):
+            for part in node.parts:
+                self.compile_expression(part)
+            self.emit(BUILD_STRING, len(node.parts), node)
+        elif isinstance(node, ArrayNode):
+            for element in node.elements:
+                self.compile_expression(element)
+            self.emit(BUILD_ARRAY, len(node.elements), node)
+        elif isinstance(node, IndexNode):
+            self.compile_expression(node.target)
+            self.compile_expression(node.index)
+            self.emit(INDEX, 0, node)
+        elif isinstance(node, CallNode):
+            self.compile_expression(node.argument)
+            self.emit(CALL, self.constant(node.name), node)
+        else:
+            raise AronRuntimeError(f"Cannot evaluate node type: {type(node)}", node)
+
+    def compile_statement(self, node):
+        if isinstance(node, PrintNode):
+            self.compile_expression(node.value_node)
+            self.emit(PRINT, 0, node)
+        elif isinstance(node, AssignNode):
+            self.compile_expression(node.value_node)
+            self.emit(STORE_VAR, node.variable_node.slot, node)
+        elif isinstance(node, IfNode):
+            self.compile_expression(node.condition)
+            jump_to_else = self.emit(JUMP_IF_FALSE, 0, node)
+            self.compile_block(node.body)
+            if node.else_body:
+                jump_to_end = self.emit(JUMP, 0, node)
+                self.patch_jump(jump_to_else)
+                self.compile_block(node.else_body)
+                self.patch_jump(jump_to_end)
+            else:
+                self.patch_jump(jump_to_else)
+        elif isinstance(node, WhileNode):
+            self.emit(LOOP_START, 0, node)
+            loop_top = len(self.code.instructions)
+            self.compile_expression(node.condition)
+            jump_to_end = self.emit(JUMP_IF_FALSE, 0, node)
+            self.emit(LOOP_ITERATION, 0, node)
+            self.compile_block(node.body)
+            self.emit(JUMP, loop_top, node)
+            self.patch_jump(jump_to_end)
+            self.emit(LOOP_END, 0, node)
+        else:
+            raise AronRuntimeError(f"Unknown AST node type at top level: {type(node)}", node)
+
+    def compile_block(self, nodes):
+        for node in nodes:
+            self.compile_statement(node)
+
+def compile_program(ast_nodes, symbols=None):
+    """Compile a list of top-level statements into a CodeObject.
+
+    Without symbols the program's own table is used (resolving the statements
+    first if they have none); with symbols (e.g. a frame's table shared across
+    streamed statements) they must be resolved already.
+    """
+    if symbols is None:
+        symbols = program_symbols(ast_nodes)
+    compiler = Compiler(symbols)
+    compiler.compile_block(ast_nodes)
+    return compiler.code
+
+def disassemble(code, positions=None):
+    """Return a human-readable listing of code, one instruction per line.
+
+    With the parser's positions table, the source line is shown at the first
+    instruction of each line, as in Python's dis module.
+    """
+    instructions = code.instructions
+    count = len(code.nodes)
+
+    # Instructions for literals have no position of their own; they take the
+    # line of the next instruction that does (the operator or statement using them)
+    source_lines = [None] * count
+    if positions:
+        line = None
+        for index in range(count - 1, -1, -1):
+            position = positions.get(code.nodes[index])
+            if position:
+                line = position[0]
+            source_lines[index] = line
+
+    lines = []
+    previous_line = None
+    for index in range(count):
+        offset = index * 2
+        opcode, arg = instructions[offset], instructions[offset + 1]
+        name = OPCODE_NAMES[opcode]
+        if opcode in (LOAD_CONST, CALL):
+            operand = f"{arg} ({code.constants[arg]!r})"
+        elif opcode in (LOAD_VAR, STORE_VAR):
+            operand = f"{arg} ({code.names[arg]})"
+        elif opcode in (JUMP, JUMP_IF_FALSE, BUILD_ARRAY, BUILD_STRING):
+            operand = f"{arg}"
+        else:
+            operand = ""
+        source_line = source_lines[index]
+        if source_line is not None and source_line != previous_line:
+            if lines:
+                lines.append("")
+            line_label = f"{source_line:>5}"
+            previous_line = source_line
+        else:
+            line_label = "     "
+        lines.append(f"{line_label} {offset:>6} {name:<16} {operand}".rstrip())
+    return "\n".join(lines)
+
+if __name__ == '__main__':
+    from lexer import tokenize
+    from parser import parse
+
+    sample_code = """
+קבע מספר = 10
+אם מספר > 5
+    הדפס "המספר גדול מ-5"
+אחרת
+    הדפס "המספר קטן או שווה ל-5"
+סוף
+הדפס (מספר + 2) * 3
+"""
+    program = parse(tokenize(sample_code))
+    print(disassemble(compile_program(program), program.positions))
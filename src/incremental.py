@@ -0,0 +1,419 @@
+# src/incremental.py
+# Incremental lexing and parsing of an edited document, for tools that
+# re-parse on every keystroke (such as the VS Code extension).
+#
+# A Document keeps the token rows of every line and one record per top-level
+# statement. An edit replaces a range of whole lines: only the new lines are
+# lexed, and parsing restarts at the top-level statement enclosing the edit
+# and stops as soon as the parser reaches the start of a statement that
+# follows the edit and is unchanged. Edits inside an אם ... סוף block
+# re-parse that block only. Editors can also apply edits without parsing
+# them (edit(..., parse=False)) and parse all of them at once later with
+# refresh(), e.g. once the user pauses typing.
+#
+# Positions inside a statement are stored relative to its first line, and
+# the first lines of the statements after the last edit are stored relative
+# to the end of the document (like the text after the gap of a gap buffer).
+# An edit that adds or removes lines therefore moves everything after it
+# without touching it; only the statements between two successive edits are
+# converted, so the cost of an edit follows its size and distance from the
+# previous one, not the size of the document.
+
+from bisect import bisect_left
+
+from lexer import LexerError, iter_tokens, tokenize_line
+from parser import Parser, Program, SymbolTable, AssignNode
+
+class StatementRecord:
+    """A parsed top-level statement of a Document.
+
+    `line` and `column` are the position of its first token (with `from_end`
+    set, `line` counts from the end of the document; see Document.line_of)
+    and `line_count` the number of lines from there to the token that follows
+    the statement (the next statement's first token), or to the line after
+    the end of the document. `positions` maps the statement's nodes to
+    (line - first line, column).
+    """
+    __slots__ = ("node", "line", "from_end", "column", "line_count", "positions")
+
+    def __init__(self, node, line, column, line_count, positions):
+        self.node = node
+        self.line = line
+        self.from_end = False
+        self.column = column
+        self.line_count = line_count
+        self.positions = positions
+
+class DocumentPositions:
+    """Position table of a Document's program: node -> (line, column), computed from the statement records."""
+
+    def __init__(self, document):
+        self.owners = document.owners
+        self.line_of = document.line_of
+
+    def get(self, node, default=None):
+        record = self.owners.get(node)
+        if record is None:
+            return default
+        line, column = record.positions[node]
+        return (self.line_of(record) + line, column)
+
+    def __getitem__(self, node):
+        position = self.get(node)
+        if position is None:
+            raise KeyError(node)
+        return position
+
+    def __contains__(self, node):
+        return node in self.owners
+
+    def __len__(self):
+        return len(self.owners)
+
+    def __iter__(self):
+        return iter(self.owners)
+
+    def items(self):
+        return ((node, self.get(node)) for node in self.owners)
+
+class Document:
+    """Source text kept lexed and parsed across edits.
+
+    `program` is the parsed Program, updated in place by every edit; its
+    positions are a DocumentPositions view and its symbols a SymbolTable
+    shared by all edits (so slots stay valid for names that disappear).
+    Engines may run it directly, but it must not be optimized in place.
+
+    `definitions` indexes the parsed קבע statements by variable name, for
+    editor features such as completion and go-to-definition.
+    """
+
+    def __init__(self, text=""):
+        self.lines = []
+        self.line_tokens = [] # Per line: list of (type, value, column) rows, or None if the line does not lex
+        self.bad_lines = 0 # Number of lines that do not lex
+        self.names = {} # Interning table for identifiers and strings, as in lexer._scan
+        self.records = [] # StatementRecords in source order
+        self.gap = 0 # Records from this index on have from_end set
+        self.owners = {} # Node -> StatementRecord, for every node with a position
+        self.definitions = {} # Variable name -> {AssignNode: None}, in no particular order
+        self.symbols = SymbolTable()
+        self.program = Program((), DocumentPositions(self), self.symbols)
+        self.dirty = None # (first, end) lines not covered by records after a failed edit
+        self.error = None # Error of the last edit, or None
+        self.error_position = None # (line, column) of self.error; column len(line) + 1 at the end of the document
+        self.last_edit = (0, 0) # (lines lexed, statements parsed) by the last edit
+        try:
+            self.edit(1, 1, text.split("\n"))
+        except (LexerError, SyntaxError, RecursionError):
+            pass # Kept in self.error
+
+    @property
+    def text(self):
+        return "\n".join(self.lines)
+
+    def edit(self, start_line, end_line, new_lines, parse=True):
+        """Replace lines start_line .. end_line - 1 (1-based) with new_lines. Returns the program.
+
+        new_lines is a list of lines without their '\n' (or a string, split
+        into lines). start_line == end_line inserts them before start_line. Raises
+        LexerError or SyntaxError, with the same message a full parse of the
+        new text would give, if the document no longer parses (RecursionError,
+        as from a full parse, for a statement nested too deeply); the text is
+        updated anyway, the statements before the failure are kept (with
+        their definitions), and the failed part is parsed again by the next edit.
+        With parse=False the new lines are only lexed: the statements they
+        touch leave the program until the next edit or refresh().
+        """
+        if not 1 <= start_line <= end_line <= len(self.lines) + 1:
+            raise ValueError(f"Invalid line range {start_line}..{end_line} for a document of {len(self.lines)} lines")
+        if isinstance(new_lines, str):
+            new_lines = new_lines.split("\n")
+        delta = len(new_lines) - (end_line - start_line)
+
+        # Statements overlapping the edit are replaced. A statement's span reaches
+        # the first token after it, so this includes a statement that the edited
+        # lines may continue (an expression can go on over several lines).
+        records = self.records
+        line_of = self.line_of
+        replace_from = bisect_left(records, start_line, key=self.end_line_of)
+        replace_to = bisect_left(records, end_line, key=line_of)
+        if self.dirty is not None:
+            replace_from = min(replace_from, bisect_left(records, self.dirty[0], key=self.end_line_of))
+        # Statements after the edit count from the end, so they move with it
+        self.move_gap(replace_to)
+
+        # Lex the new lines only
+        new_tokens = [self.lex_line(text) for text in new_lines]
+        old_tokens = self.line_tokens[start_line - 1:end_line - 1]
+        self.bad_lines += new_tokens.count(None) - old_tokens.count(None)
+        self.lines[start_line - 1:end_line - 1] = new_lines
+        self.line_tokens[start_line - 1:end_line - 1] = new_tokens
+
+        # Lines to parse again, in new line numbers
+        first, end = start_line, start_line + len(new_lines)
+        if self.dirty is not None:
+            first = min(first, self.moved_line(self.dirty[0], start_line, end_line, delta))
+            end = max(end, self.moved_line(self.dirty[1], start_line, end_line, delta))
+
+        # A replaced statement that starts before the edit is parsed from its start
+        start = (first, 0)
+        if replace_from < replace_to:
+            start = min(start, (records[replace_from].line, records[replace_from].column))
+
+        if not parse:
+            self.mark_dirty(replace_from, replace_to, start[0], end)
+            self.last_edit = (len(new_lines), 0)
+            return self.program
+        if self.bad_lines:
+            # Parse up to the first line that does not lex, then fail with its error
+            bad_line = self.line_tokens.index(None) + 1
+            if bad_line > start[0]:
+                new_records, resync, failed_at = self.parse_from(start, end, replace_to, bad_line)
+            else:
+                new_records, resync, failed_at = [], replace_to, start
+            self.error = self.first_lexer_error()
+            self.error_position = (self.error.line, self.error.column)
+        else:
+            new_records, resync, failed_at = self.parse_from(start, end, replace_to)
+
+        if failed_at is not None:
+            # The statements before the failure are the ones a full parse builds before
+            # failing: keep them (editors still need their definitions); the lines from
+            # the failed statement on are parsed again by the next edit
+            while resync < len(records) and (line_of(records[resync]), records[resync].column) < failed_at:
+                resync += 1 # Records the failed parse went past no longer start a statement
+            self.drop_records(replace_from, resync)
+            self.insert_records(replace_from, new_records)
+            after = replace_from + len(new_records)
+            next_line = line_of(records[after]) if after < len(records) else len(self.lines) + 1
+            self.dirty = (failed_at[0], max(end, next_line))
+            self.extend_last_record()
+            self.last_edit = (len(new_lines), len(new_records))
+            raise self.error
+
+        self.drop_records(replace_from, resync)
+        self.insert_records(replace_from, new_records)
+        self.extend_last_record()
+        self.dirty = None
+        self.error = None
+        self.error_position = None
+        self.last_edit = (len(new_lines), len(new_records))
+        return self.program
+
+    def refresh(self):
+        """Parse the lines that edits left unparsed. Returns the program; raises like edit()."""
+        if self.dirty is not None:
+            self.edit(self.dirty[0], self.dirty[0], [])
+        return self.program
+
+    def mark_dirty(self, replace_from, replace_to, first, end):
+        # Keep the statements after the edit; the lines up to them are dirty
+        records = self.records
+        self.drop_records(replace_from, replace_to)
+        next_line = self.line_of(records[replace_from]) if replace_from < len(records) else len(self.lines) + 1
+        self.dirty = (first, max(end, next_line))
+        self.extend_last_record()
+
+    def end_position(self):
+        """Position just after the last character of the document."""
+        if not self.lines:
+            return (1, 1)
+        return (len(self.lines), len(self.lines[-1]) + 1)
+
+    def line_of(self, record):
+        """First line of a record's statement."""
+        return record.line + len(self.lines) if record.from_end else record.line
+
+    def end_line_of(self, record):
+        return self.line_of(record) + record.line_count
+
+    def move_gap(self, index):
+        """Make records before index count lines from the start of the document, and the others from its end."""
+        records = self.records
+        count = len(self.lines)
+        while self.gap < index:
+            record = records[self.gap]
+            record.line += count
+            record.from_end = False
+            self.gap += 1
+        while self.gap > index:
+            self.gap -= 1
+            record = records[self.gap]
+            record.line -= count
+            record.from_end = True
+
+    @staticmethod
+    def moved_line(line, start_line, end_line, delta):
+        """Number of line after replacing lines start_line .. end_line - 1 (delta lines more)."""
+        if line <= start_line:
+            return line
+        if line >= end_line:
+            return line + delta
+        return end_line + delta
+
+    def lex_line(self, text):
+        try:
+            return tokenize_line(text, self.names)
+        except LexerError:
+            return None
+
+    def first_lexer_error(self):
+        # Lex the first bad line again, with its line number, for the error message
+        index = self.line_tokens.index(None)
+        try:
+            list(iter_tokens(self.lines[index], index + 1))
+        except LexerError as error:
+            return error
+        return LexerError(f"Cannot lex line {index + 1}", index + 1, 1)
+
+    def insert_records(self, index, new_records):
+        """Insert new records (and their statements) at index, the start of the gap."""
+        self.records[index:index] = new_records
+        self.gap += len(new_records)
+        self.program[index:index] = [record.node for record in new_records]
+        definitions = self.definitions
+        for record in new_records:
+            for node in record.positions:
+                self.owners[node] = record
+                if type(node) is AssignNode:
+                    definitions.setdefault(node.variable_node.name, {})[node] = None
+
+    def extend_last_record(self):
+        # The last statement extends past the end of the document, so lines appended
+        # after it (at len(self.lines) + 1) may continue it
+        if self.records:
+            last = self.records[-1]
+            last.line_count = len(self.lines) + 1 - self.line_of(last)
+
+    def rows_from(self, line, column, stop_line=None):
+        """Yield (type, value, line, column) rows from the given position to the end of the document (or to stop_line)."""
+        line_tokens = self.line_tokens
+        for number in range(line, stop_line or len(line_tokens) + 1):
+            for token_type, value, token_column in line_tokens[number - 1]:
+                if number == line and token_column < column:
+                    continue
+                yield (token_type, value, number, token_column)
+
+    def tokens_before(self, line, column):
+        """Number of tokens before a position, i.e. the parser's pos at that point."""
+        count = sum(map(len, self.line_tokens[:line - 1]))
+        if line <= len(self.line_tokens):
+            count += sum(1 for _, _, token_column in self.line_tokens[line - 1] if token_column < column)
+        return count
+
+    def parse_from(self, start, end, resync_from, stop_line=None):
+        """Parse top-level statements from position start.
+
+        Parsing stops at the end of the document, or at the first statement
+        boundary on line end or later where an existing record (from index
+        resync_from on) starts. Returns (new records, index of that record,
+        None). If a statement fails to parse, returns (the records before it,
+        resync_from, its position) and sets self.error and error_position.
+        With stop_line (a line that does not lex) only the lines before it
+        are parsed, and the statements known to end before it are returned
+        the same way.
+        """
+        records = self.records
+        line_of = self.line_of
+        parser = Parser.from_rows(self.rows_from(*start, stop_line), self.symbols)
+        resync = resync_from
+        new_records = []
+        line, column = start
+        try:
+            while parser.current_type is not None:
+                line, column = parser.current_line, parser.current_column
+                if line >= end:
+                    while resync < len(records) and (line_of(records[resync]), records[resync].column) < (line, column):
+                        resync += 1
+                    if resync < len(records) and line_of(records[resync]) == line and records[resync].column == column:
+                        return new_records, resync, None
+                node = parser.parse_statement()
+                if parser.current_type is None and stop_line is not None:
+                    return new_records, resync_from, (line, column) # It may go on at stop_line
+                end_line = parser.current_line if parser.current_type is not None else len(self.lines)
+                positions = {node: (position_line - line, position_column)
+                             for node, (position_line, position_column) in parser.positions.items()}
+                parser.positions.clear()
+                new_records.append(StatementRecord(node, line, column, end_line - line, positions))
+            if stop_line is not None:
+                return new_records, resync_from, (line, column)
+            return new_records, len(records), None
+        except SyntaxError as error:
+            if stop_line is not None:
+                return new_records, resync_from, (line, column) # The lexer error is reported instead
+            failed_at = (line, column)
+            self.error = error
+            # Parse again with the pos of a full parse, for the same error message
+            parser = Parser.from_rows(self.rows_from(*start), SymbolTable(), self.tokens_before(*start))
+            try:
+                while parser.current_type is not None:
+                    parser.parse_statement()
+            except SyntaxError as full_error:
+                self.error = full_error
+                # The error is at the token the parser stopped on
+                if parser.current_type is not None:
+                    self.error_position = (parser.current_line, parser.current_column)
+                else:
+                    self.error_position = self.end_position()
+            return new_records, resync_from, failed_at
+        except RecursionError as error:
+            # Nested too deeply for the recursive parser; reported where it gave up
+            self.error = error
+            self.error_position = (parser.current_line, parser.current_column)
+            return new_records, resync_from, (line, column)
+
+    def drop_records(self, first, end):
+        """Remove records first .. end - 1 and their statements."""
+        definitions = self.definitions
+        for record in self.records[first:end]:
+            for node in record.positions:
+                self.owners.pop(node, None)
+                if type(node) is AssignNode:
+                    nodes = definitions[node.variable_node.name]
+                    del nodes[node]
+                    if not nodes:
+                        del definitions[node.variable_node.name]
+        del self.records[first:end]
+        del self.program[first:end]
+        if self.gap > first:
+            self.gap = max(first, self.gap - (end - first))
+
+if __name__ == '__main__':
+    document = Document("קבע א = 1\nאם א == 1\n    הדפס \"אחד\"\nסוף\nהדפס א + 2")
+    print(f"Program: {list(document.program)}")
+
+    # Change the print inside the אם block: only that block is parsed again
+    document.edit(3, 4, ['    הדפס "שתיים"'])
+    print(f"After edit: {list(document.program)} (lines lexed, statements parsed: {document.last_edit})")
+
+    # An unfinished line fails, and is parsed again by the next edit
+    try:
+        document.edit(5, 6, ["הדפס א +"])
+    except SyntaxError as e:
+        print(f"Syntax Error: {e} (statements kept before it: {len(document.program)}, defined: {sorted(document.definitions)})")
+    document.edit(5, 6, ["הדפס א + 3"])
+    print(f"Fixed: {list(document.program)}, positions: {document.program.positions.get(document.program[-1])}")
+
+    # Lines appended after the last statement (at len(lines) + 1) may continue it:
+    # the result must be the one of a full parse of the new text
+    from lexer import tokenize_compact
+    from parser import parse
+
+    def full_parse(text):
+        try:
+            return repr(list(parse(tokenize_compact(text))))
+        except (LexerError, SyntaxError) as error:
+            return f"{type(error).__name__}: {error}"
+
+    for text, appended in [("קבע א = 1\n", ["+ 3"]), ("קבע א = 1", ["* 2", "+ 1"]), ("הדפס 1\n\n", ["הדפס 2"]),
+                           ("קבע א = 1\n", ["+"]), ("", ["הדפס 1"]), ("אם אמת\nהדפס 1\n", ["סוף"])]:
+        document = Document(text)
+        try:
+            result = repr(list(document.edit(len(document.lines) + 1, len(document.lines) + 1, appended)))
+        except (LexerError, SyntaxError) as error:
+            result = f"{type(error).__name__}: {error}"
+        expected = full_parse("\n".join(text.split("\n") + appended))
+        if result != expected:
+            raise AssertionError(f"Appending {appended} to {text!r}: {result}, a full parse gives {expected}")
+    print("Appending lines matches a full parse")
@@ -1,8 +1,108 @@
 # src/interpreter.py
+import operator
 from parser import PrintNode, StringNode, NumberNode, VariableNode, AssignNode, BinaryOpNode, BooleanNode, IfNode
+from parser import ConcatNode, ArrayNode, IndexNode, CallNode, WhileNode
+from parser import SymbolTable, OP_PLUS, OP_MINUS, OP_MULTIPLY, OP_DIVIDE, OP_EQUALS
+from resolver import program_symbols, resolve_statements
+from output import get_writer
 
-# Environment to store variables
-environment = {}
+# Value of a variable slot that has not been assigned yet
+UNDEFINED = object()
+
+class Frame:
+    """Variables of one program run, in a list indexed by resolved slot."""
+    __slots__ = ("symbols", "values")
+
+    def __init__(self, symbols):
+        self.symbols = symbols
+        self.values = [UNDEFINED] * len(symbols)
+
+    def grow(self):
+        """Add slots for names resolved since the frame was created (streamed programs)."""
+        missing = len(self.symbols) - len(self.values)
+        if missing > 0:
+            self.values.extend([UNDEFINED] * missing)
+
+    def variables(self):
+        """Return the assigned variables as a {name: value} dict."""
+        return {name: value for name, value in zip(self.symbols.names, self.values) if value is not UNDEFINED}
+
+def prepare_frame(ast_nodes):
+    """Resolve variable slots and create a fresh frame for one run.
+
+    Returns (frame, statements). A parsed Program already carries its
+    symbols; another list is resolved up front; a lazy iterator is resolved
+    statement by statement, growing the frame as it goes.
+    """
+    if isinstance(ast_nodes, list):
+        return Frame(program_symbols(ast_nodes)), ast_nodes
+
+    frame = Frame(SymbolTable())
+
+    def resolved_statements():
+        for node in resolve_statements(ast_nodes, frame.symbols):
+            frame.grow()
+            yield node
+    return frame, resolved_statements()
+
+class AronRuntimeError(RuntimeError):
+    """A runtime error raised while evaluating `node`.
+
+    Subclasses RuntimeError so existing handlers keep working. The source
+    position is looked up only when the error reaches interpret().
+    """
+    def __init__(self, message, node=None):
+        super().__init__(message)
+        self.node = node
+        self.line = None
+        self.column = None
+
+    def locate(self, positions, fallback_node=None):
+        """Append the source position of the failing node (or of fallback_node) to the message."""
+        if self.line is not None:
+            return
+        position = positions.get(self.node) or positions.get(fallback_node)
+        if position:
+            self.line, self.column = position
+            self.args = (f"{self.args[0]} at line {self.line}, column {self.column}",)
+
+# Most iterations a single run of a כל_עוד loop may make (None: no limit),
+# so that a runaway script fails instead of running forever
+loop_limit = None
+
+def set_loop_limit(limit):
+    """Set the iteration limit of כל_עוד loops (None for no limit). Returns the previous limit."""
+    global loop_limit
+    previous = loop_limit
+    loop_limit = limit
+    return previous
+
+def loop_budget():
+    """Iterations left at the start of a loop; counting down from -1 never reaches 0."""
+    return -1 if loop_limit is None else loop_limit
+
+def loop_limit_error(node=None):
+    return AronRuntimeError(f"Loop exceeded the limit of {loop_limit} iterations", node)
+
+def run_loop(node, condition, body, values):
+    """Run a כל_עוד loop whose condition and body were prepared once as closures over the frame values.
+
+    Used by the tree and closure engines; body is None for an empty loop.
+    """
+    budget = loop_budget()
+    while True:
+        condition_result = condition(values)
+        try:
+            if not condition_result: # An array as a condition raises
+                return
+        except AronRuntimeError as error:
+            error.node = node
+            raise
+        if budget == 0:
+            raise loop_limit_error(node)
+        budget -= 1
+        if body is not None:
+            body(values)
 
 def format_value_for_output(value):
     """Format value for output, converting booleans to Hebrew."""
@@ -17,7 +117,153 @@ def format_value_for_output(value):
     else:
         return f"{rtl_mark}{value}"
 
-def evaluate_node(node):
+# The arrays module, imported by load_arrays() once a program builds an
+# array, so that NumPy is only needed (and loaded) by programs that use them
+arrays = None
+ARRAY_TYPES = () # (arrays.ArrayValue,) once loaded
+
+def load_arrays():
+    global arrays, ARRAY_TYPES
+    if arrays is None:
+        try:
+            import arrays as module
+        except ImportError:
+            raise AronRuntimeError("Arrays require NumPy (pip install numpy)")
+        arrays = module
+        ARRAY_TYPES = (module.ArrayValue,)
+    return arrays
+
+def array_operands(left_val, right_val):
+    return isinstance(left_val, ARRAY_TYPES) or isinstance(right_val, ARRAY_TYPES)
+
+# Operator semantics shared by every execution engine. The arithmetic
+# functions raise AronRuntimeError without a node; callers attach theirs.
+# Arrays are handled on the slow paths, after the checks for numbers fail.
+
+def add_values(left_val, right_val):
+    # Handle string concatenation
+    if isinstance(left_val, str) or isinstance(right_val, str):
+        return str(left_val) + str(right_val)
+    return left_val + right_val
+
+def subtract_values(left_val, right_val):
+    if not (isinstance(left_val, (int, float)) and isinstance(right_val, (int, float))):
+        if array_operands(left_val, right_val):
+            return arrays.subtract(left_val, right_val)
+        raise AronRuntimeError(f"The '-' operator requires numeric operands, got {type(left_val)} and {type(right_val)}")
+    return left_val - right_val
+
+def multiply_values(left_val, right_val):
+    # Allow string * number for repetition
+    if isinstance(left_val, str) and isinstance(right_val, (int, float)):
+        return left_val * int(right_val)
+    elif isinstance(right_val, str) and isinstance(left_val, (int, float)):
+        return right_val * int(left_val)
+    elif not (isinstance(left_val, (int, float)) and isinstance(right_val, (int, float))):
+        if array_operands(left_val, right_val):
+            return arrays.multiply(left_val, right_val)
+        raise AronRuntimeError(f"The '*' operator requires numeric operands or string*number, got {type(left_val)} and {type(right_val)}")
+    return left_val * right_val
+
+def divide_values(left_val, right_val):
+    if not (isinstance(left_val, (int, float)) and isinstance(right_val, (int, float))):
+        if array_operands(left_val, right_val):
+            return arrays.divide(left_val, right_val)
+        raise AronRuntimeError(f"The '/' operator requires numeric operands, got {type(left_val)} and {type(right_val)}")
+    if right_val == 0:
+        raise AronRuntimeError("Division by zero")
+    return left_val / right_val # Using true division
+
+# Indexed by operator code (parser.OP_*)
+BINARY_OPERATIONS = (
+    add_values,        # OP_PLUS
+    subtract_values,   # OP_MINUS
+    multiply_values,   # OP_MULTIPLY
+    divide_values,     # OP_DIVIDE
+    operator.eq,       # OP_EQUALS
+    operator.ne,       # OP_NOT_EQUALS
+    operator.lt,       # OP_LT
+    operator.gt,       # OP_GT
+    operator.le,       # OP_LE
+    operator.ge,       # OP_GE
+)
+
+# Inline caches. Each arithmetic BinaryOpNode gets an InlineCache the first
+# time it runs, holding the classes of the operands it saw and an operation
+# specialized for them (e.g. operator.add for two ints) that skips the type
+# checks of the general functions above. The engines call the cached operation
+# while the operands keep their classes; otherwise specialize() runs the
+# general function and re-targets the cache, at most RESPECIALIZE_LIMIT times
+# per site. Comparisons are already single operator.* calls and run directly.
+
+class InlineCache:
+    """Operand classes last seen at an operator site, the operation specialized for them and hit/miss counts."""
+    __slots__ = ("left_type", "right_type", "operation", "hits", "misses")
+
+    def __init__(self):
+        self.left_type = None # No operand has class None, so a new cache always misses
+        self.right_type = None
+        self.operation = None
+        self.hits = 0
+        self.misses = 0
+
+def divide_numbers(left_val, right_val):
+    if right_val:
+        return left_val / right_val
+    return divide_values(left_val, right_val) # Raises the division by zero error
+
+def specialized_operations():
+    """{(operator code, left class, right class): operation} for the operand classes with a fast path."""
+    table = {}
+    numbers = (int, float, bool)
+    for left_type in numbers:
+        for right_type in numbers:
+            table[OP_PLUS, left_type, right_type] = operator.add
+            table[OP_MINUS, left_type, right_type] = operator.sub
+            table[OP_MULTIPLY, left_type, right_type] = operator.mul
+            table[OP_DIVIDE, left_type, right_type] = divide_numbers
+    table[OP_PLUS, str, str] = operator.add
+    table[OP_MULTIPLY, str, int] = operator.mul # Repetition; int(right) is right itself
+    table[OP_MULTIPLY, int, str] = operator.mul
+    return table
+
+SPECIALIZED_OPERATIONS = specialized_operations()
+
+# Misses after which a site whose operand classes keep changing stays as it is
+RESPECIALIZE_LIMIT = 8
+
+def specialize(node, left_val, right_val):
+    """Run BinaryOpNode node's operation on the general path, specializing its inline cache for these operands."""
+    cache = node.cache
+    if cache is None:
+        cache = node.cache = InlineCache()
+    cache.misses += 1
+    if cache.misses <= RESPECIALIZE_LIMIT:
+        left_type = left_val.__class__
+        right_type = right_val.__class__
+        operation = SPECIALIZED_OPERATIONS.get((node.op, left_type, right_type))
+        if operation is not None:
+            cache.left_type = left_type
+            cache.right_type = right_type
+            cache.operation = operation
+    return BINARY_OPERATIONS[node.op](left_val, right_val)
+
+def make_array(elements):
+    return load_arrays().make_array(elements)
+
+def index_value(target, position):
+    if not isinstance(target, ARRAY_TYPES):
+        raise AronRuntimeError(f"Only arrays can be indexed, got {type(target)}")
+    return arrays.index(target, position)
+
+def call_function(name, value):
+    """Call the built-in function name (one of parser.FUNCTION_NAMES) with its evaluated argument."""
+    if name == "אורך" and isinstance(value, str):
+        return len(value)
+    return load_arrays().FUNCTIONS[name](value)
+
+def evaluate_node(node, values):
+    # values is the list of variable values of the running Frame
     if isinstance(node, NumberNode):
         return node.value
     elif isinstance(node, StringNode):
@@ -25,105 +271,234 @@ def evaluate_node(node):
     elif isinstance(node, BooleanNode):
         return node.value # Boolean values (True or False)
     elif isinstance(node, VariableNode):
-        var_name = node.name
-        if var_name in environment:
-            return environment[var_name]
-        else:
-            raise RuntimeError(f"Undefined variable: {var_name}")
+        value = values[node.slot]
+        if value is UNDEFINED:
+            raise AronRuntimeError(f"Undefined variable: {node.name}", node)
+        return value
     elif isinstance(node, BinaryOpNode):
-        left_val = evaluate_node(node.left)
-        right_val = evaluate_node(node.right)
-
-        # Handle comparison operators
-        if node.op.type == "EQUALS":
-            return left_val == right_val
-        elif node.op.type == "NOT_EQUALS":
-            return left_val != right_val
-        elif node.op.type == "LT":
-            return left_val < right_val
-        elif node.op.type == "GT":
-            return left_val > right_val
-        elif node.op.type == "LE":
-            return left_val <= right_val
-        elif node.op.type == "GE":
-            return left_val >= right_val
-            
-        # For arithmetic operators, check that operands are numeric
-        if node.op.type == "PLUS":
-            # Handle string concatenation
-            if isinstance(left_val, str) or isinstance(right_val, str):
-                return str(left_val) + str(right_val)
-            return left_val + right_val
-        elif node.op.type == "MINUS":
-            if not (isinstance(left_val, (int, float)) and isinstance(right_val, (int, float))):
-                raise RuntimeError(f"The '-' operator requires numeric operands, got {type(left_val)} and {type(right_val)}")
-            return left_val - right_val
-        elif node.op.type == "MULTIPLY":
-            # Allow string * number for repetition
-            if isinstance(left_val, str) and isinstance(right_val, (int, float)):
-                return left_val * int(right_val)
-            elif isinstance(right_val, str) and isinstance(left_val, (int, float)):
-                return right_val * int(left_val)
-            elif not (isinstance(left_val, (int, float)) and isinstance(right_val, (int, float))):
-                raise RuntimeError(f"The '*' operator requires numeric operands or string*number, got {type(left_val)} and {type(right_val)}")
-            return left_val * right_val
-        elif node.op.type == "DIVIDE":
-            if not (isinstance(left_val, (int, float)) and isinstance(right_val, (int, float))):
-                raise RuntimeError(f"The '/' operator requires numeric operands, got {type(left_val)} and {type(right_val)}")
-            if right_val == 0:
-                raise RuntimeError("Division by zero")
-            return left_val / right_val # Using true division
-        else:
-            raise RuntimeError(f"Unknown binary operator: {node.op.type}")
+        left_val = evaluate_node(node.left, values)
+        right_val = evaluate_node(node.right, values)
+        cache = node.cache
+        try:
+            if node.op >= OP_EQUALS:
+                return BINARY_OPERATIONS[node.op](left_val, right_val)
+            if cache is not None and left_val.__class__ is cache.left_type and right_val.__class__ is cache.right_type:
+                cache.hits += 1
+                return cache.operation(left_val, right_val)
+            return specialize(node, left_val, right_val)
+        except AronRuntimeError as error:
+            error.node = node
+            raise
+    elif isinstance(node, ConcatNode):
+        # One join, instead of copying the growing string at every '+' (add_values converts with str() too)
+        return "".join([str(evaluate_node(part, values)) for part in node.parts])
+    elif isinstance(node, ArrayNode):
+        elements = [evaluate_node(element, values) for element in node.elements]
+        try:
+            return make_array(elements)
+        except AronRuntimeError as error:
+            error.node = node
+            raise
+    elif isinstance(node, IndexNode):
+        target = evaluate_node(node.target, values)
+        position = evaluate_node(node.index, values)
+        try:
+            return index_value(target, position)
+        except AronRuntimeError as error:
+            error.node = node
+            raise
+    elif isinstance(node, CallNode):
+        argument = evaluate_node(node.argument, values)
+        try:
+            return call_function(node.name, argument)
+        except AronRuntimeError as error:
+            error.node = node
+            raise
     else:
-        raise RuntimeError(f"Cannot evaluate node type: {type(node)}")
+        raise AronRuntimeError(f"Cannot evaluate node type: {type(node)}", node)
 
-def interpret(ast_nodes):
+def interpret(ast_nodes, positions=None, frame=None):
+    # ast_nodes may be a list or a lazy iterator (e.g. Parser.iter_statements),
+    # in which case each statement runs as soon as it has been parsed.
+    # positions is the parser's side table, used only to locate runtime errors.
+    # frame holds the variables; a fresh one is created for each top-level run.
+    if positions is None:
+        positions = getattr(ast_nodes, "positions", None)
+    top_level = frame is None
+    if top_level:
+        frame, ast_nodes = prepare_frame(ast_nodes)
+    values = frame.values
+    writer = get_writer()
+    write_value = writer.write_value
     result = None
-    i = 0
-    while i < len(ast_nodes):
-        node = ast_nodes[i]
-        
-        if isinstance(node, PrintNode):
-            value_to_print = evaluate_node(node.value_node)
-            formatted_value = format_value_for_output(value_to_print)
-            
-            # Handle Hebrew strings by printing as raw values
-            if isinstance(formatted_value, str):
-                print(formatted_value)
-            else:
-                print(formatted_value)
-                
-            result = value_to_print
-
-        elif isinstance(node, AssignNode):
-            var_name = node.variable_node.name
-            value_to_assign = evaluate_node(node.value_node)
-            environment[var_name] = value_to_assign
-            result = value_to_assign
+    try:
+        for node in ast_nodes:
+            if isinstance(node, PrintNode):
+                value_to_print = evaluate_node(node.value_node, values)
+                write_value(value_to_print)
+                result = value_to_print
+
+            elif isinstance(node, AssignNode):
+                value_to_assign = evaluate_node(node.value_node, values)
+                values[node.variable_node.slot] = value_to_assign
+                result = value_to_assign
             
-        elif isinstance(node, IfNode):
-            condition_result = evaluate_node(node.condition)
+            elif isinstance(node, IfNode):
+                condition_result = evaluate_node(node.condition, values)
             
-            if condition_result:
-                # Execute the if block
-                if node.body:
-                    # Interpret all statements in the if block
-                    interpret(node.body)
-            elif node.else_body:
-                # Execute the else block if condition is false and there is an else block
-                interpret(node.else_body)
+                try:
+                    truth = bool(condition_result) # An array as a condition raises
+                except AronRuntimeError as error:
+                    error.node = node
+                    raise
+                if truth:
+                    # Execute the if block
+                    if node.body:
+                        # Interpret all statements in the if block
+                        interpret(node.body, None, frame)
+                elif node.else_body:
+                    # Execute the else block if condition is false and there is an else block
+                    interpret(node.else_body, None, frame)
+
+            elif isinstance(node, WhileNode):
+                # Compiled to closures once, so iterations skip the dispatch above
+                from closure_compiler import compile_expression, compile_block
+                run_loop(node, compile_expression(node.condition),
+                         compile_block(node.body) if node.body else None, values)
         
-        # BinaryOpNodes are handled by evaluate_node, direct interpretation isn't needed at top level
-        # unless the language allows expressions as standalone statements (which Aron doesn't yet).
+            # BinaryOpNodes are handled by evaluate_node, direct interpretation isn't needed at top level
+            # unless the language allows expressions as standalone statements (which Aron doesn't yet).
 
-        else:
-            raise RuntimeError(f"Unknown AST node type at top level: {type(node)}")
-            
-        i += 1
+            else:
+                raise AronRuntimeError(f"Unknown AST node type at top level: {type(node)}", node)
+    except AronRuntimeError as error:
+        if positions is not None:
+            error.locate(positions, node)
+        raise
+    finally:
+        if top_level:
+            writer.end_run()
     
     return result
 
+# Explicit-stack engine (--engine=stack). It runs the same AST with the same
+# semantics as evaluate_node/interpret, but keeps pending work on lists, so
+# nesting depth is limited by memory rather than by Python's recursion limit.
+
+# Nodes with operands, which evaluate_iterative evaluates on its own stack
+OPERAND_NODES = (BinaryOpNode, ConcatNode, ArrayNode, IndexNode, CallNode)
+
+def evaluate_iterative(node, values):
+    """evaluate_node without recursion: operands are evaluated left to right, in post-order."""
+    if not isinstance(node, OPERAND_NODES):
+        return evaluate_node(node, values)
+    operands = []
+    pending = [node] # Nodes to evaluate; (node,) applies node to its operands on top of the stack
+    while pending:
+        item = pending.pop()
+        if item.__class__ is tuple:
+            node = item[0]
+            try:
+                if isinstance(node, BinaryOpNode):
+                    right_val = operands.pop()
+                    left_val = operands[-1]
+                    cache = node.cache
+                    if node.op >= OP_EQUALS:
+                        operands[-1] = BINARY_OPERATIONS[node.op](left_val, right_val)
+                    elif cache is not None and left_val.__class__ is cache.left_type and right_val.__class__ is cache.right_type:
+                        cache.hits += 1
+                        operands[-1] = cache.operation(left_val, right_val)
+                    else:
+                        operands[-1] = specialize(node, left_val, right_val)
+                elif isinstance(node, ConcatNode):
+                    start = len(operands) - len(node.parts)
+                    text = "".join(map(str, operands[start:]))
+                    del operands[start:]
+                    operands.append(text)
+                elif isinstance(node, ArrayNode):
+                    start = len(operands) - len(node.elements)
+                    elements = operands[start:]
+                    del operands[start:]
+                    operands.append(make_array(elements))
+                elif isinstance(node, IndexNode):
+                    position = operands.pop()
+                    operands[-1] = index_value(operands[-1], position)
+                else:
+                    operands[-1] = call_function(node.name, operands[-1])
+            except AronRuntimeError as error:
+                error.node = node
+                raise
+        elif isinstance(item, BinaryOpNode):
+            pending += ((item,), item.right, item.left)
+        elif isinstance(item, ConcatNode):
+            pending.append((item,))
+            pending += reversed(item.parts)
+        elif isinstance(item, ArrayNode):
+            pending.append((item,))
+            pending += reversed(item.elements)
+        elif isinstance(item, IndexNode):
+            pending += ((item,), item.index, item.target)
+        elif isinstance(item, CallNode):
+            pending += ((item,), item.argument)
+        else:
+            operands.append(evaluate_node(item, values))
+    return operands[0]
+
+def loop_iterations(node, values):
+    """The statements a כל_עוד loop runs, body after body, for interpret_iterative's block stack."""
+    budget = loop_budget()
+    while True:
+        condition_result = evaluate_iterative(node.condition, values)
+        try:
+            if not condition_result:
+                return
+        except AronRuntimeError as error:
+            error.node = node
+            raise
+        if budget == 0:
+            raise loop_limit_error(node)
+        budget -= 1
+        yield from node.body
+
+def interpret_iterative(ast_nodes, positions=None):
+    """interpret without recursion: the statement lists of the אם blocks and כל_עוד loops being run are kept on a stack."""
+    if positions is None:
+        positions = getattr(ast_nodes, "positions", None)
+    frame, ast_nodes = prepare_frame(ast_nodes)
+    values = frame.values
+    writer = get_writer()
+    write_value = writer.write_value
+    blocks = [iter(ast_nodes)]
+    node = None
+    try:
+        while blocks:
+            for node in blocks[-1]:
+                if isinstance(node, PrintNode):
+                    write_value(evaluate_iterative(node.value_node, values))
+                elif isinstance(node, AssignNode):
+                    values[node.variable_node.slot] = evaluate_iterative(node.value_node, values)
+                elif isinstance(node, IfNode):
+                    if evaluate_iterative(node.condition, values):
+                        if node.body:
+                            blocks.append(iter(node.body))
+                            break
+                    elif node.else_body:
+                        blocks.append(iter(node.else_body))
+                        break
+                elif isinstance(node, WhileNode):
+                    blocks.append(loop_iterations(node, values))
+                    break
+                else:
+                    raise AronRuntimeError(f"Unknown AST node type at top level: {type(node)}", node)
+            else:
+                blocks.pop()
+    except AronRuntimeError as error:
+        if positions is not None:
+            error.locate(positions, node)
+        raise
+    finally:
+        writer.end_run()
+
 if __name__ == '__main__':
     from lexer import tokenize 
     from parser import parse   
@@ -211,7 +586,6 @@ if __name__ == '__main__':
         print(f"--- Interpreting: {name} ---")
         print(f"Code:\n{sample_code}")
         
-        environment.clear() # Clear environment for each test case
         tokens = tokenize(sample_code)
         
         try:
@@ -0,0 +1,26 @@
+# src/jsonrpc.py
+# JSON-RPC 2.0 pieces shared by server.py and analysis_server.py: the error
+# codes and the exception that carries them. Importing this module has no
+# side effects; a server takes over stdout only when it serves over stdio
+# (see take_stdout).
+
+import sys
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+class RequestError(Exception):
+    """A request answered with a JSON-RPC error instead of a result."""
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+def take_stdout():
+    """Give stdout to the protocol: return it, and send anything else printed to stderr."""
+    protocol_stdout = sys.stdout
+    sys.stdout = sys.stderr
+    return protocol_stdout
@@ -1,7 +1,11 @@
 # src/lexer.py
 import re
+from array import array
+from itertools import starmap
 
 class Token:
+    __slots__ = ("type", "value", "line", "column")
+
     def __init__(self, type, value, line=0, column=0):
         self.type = type
         self.value = value
@@ -20,9 +24,198 @@ KEYWORDS = {
     "אמת": "TRUE", # Keyword for "true"
     "שקר": "FALSE", # Keyword for "false"
     "סוף": "END", # Keyword for "end" (to mark the end of blocks)
+    "כל_עוד": "WHILE", # Keyword for "while"
 }
 
+class LexerError(RuntimeError):
+    """Raised for lexical errors. Subclasses RuntimeError so existing handlers keep working.
+
+    `line` and `column` locate the error (1-based), or are None if unknown.
+    """
+    def __init__(self, message, line=None, column=None):
+        super().__init__(message)
+        self.line = line
+        self.column = column
+
+# Single combined pattern for the whole source. Alternatives are tried in the
+# same order the line-by-line scanner used, so the token stream is identical.
+TOKEN_PATTERN = re.compile(r'''
+    (?P<NEWLINE>\n)
+  | (?P<WHITESPACE>[^\S\n]+)
+  | (?P<COMMENT>\#[^\n]*)
+  | "(?P<STRING>(?:[^"\\\n]|\\[^\n])*)"
+  | (?P<UNCLOSED_STRING>")
+  | (?P<EQUALS>==)
+  | (?P<NOT_EQUALS>!=)
+  | (?P<LE><=)
+  | (?P<GE>>=)
+  | (?P<ASSIGN_OP>=)
+  | (?P<LT><)
+  | (?P<GT>>)
+  | (?P<LPAREN>\()
+  | (?P<RPAREN>\))
+  | (?P<LBRACKET>\[)
+  | (?P<RBRACKET>\])
+  | (?P<COMMA>,)
+  | (?P<PLUS>\+)
+  | (?P<MINUS>-)
+  | (?P<MULTIPLY>\*)
+  | (?P<DIVIDE>/)
+  | (?P<IDENTIFIER>[א-ת][א-ת0-9_]*)
+  | (?P<NUMBER>\d+(?:\.\d+)?)
+  | (?P<MISMATCH>.)
+''', re.VERBOSE)
+
+ESCAPE_PATTERN = re.compile(r'\\(.)')
+
+def _unescape(match):
+    char = match.group(1)
+    if char == '"':
+        return '"'
+    elif char == '\\':
+        return '\\'
+    elif char == 'n':
+        return '\n'
+    else:
+        return '\\' + char
+
+def _scan(code, line=1, names=None):
+    """Yield (type, value, line, column) rows for code.
+
+    `line` is the number of the first line in code. Identifier and string
+    values are interned through `names`, so each distinct spelling is stored
+    once per source.
+    """
+    if names is None:
+        names = {}
+    line_start = 0
+
+    for match in TOKEN_PATTERN.finditer(code):
+        kind = match.lastgroup
+        start = match.start()
+
+        if kind == "NEWLINE":
+            line += 1
+            line_start = match.end()
+        elif kind == "WHITESPACE" or kind == "COMMENT":
+            continue
+        elif kind == "IDENTIFIER":
+            identifier = match.group()
+            identifier = names.setdefault(identifier, identifier)
+            yield (KEYWORDS.get(identifier, "IDENTIFIER"), identifier, line, start - line_start + 1)
+        elif kind == "NUMBER":
+            number_str = match.group()
+            value = float(number_str) if '.' in number_str else int(number_str)
+            yield ("NUMBER", value, line, start - line_start + 1)
+        elif kind == "STRING":
+            string_content = match.group("STRING")
+            if '\\' in string_content:
+                string_content = ESCAPE_PATTERN.sub(_unescape, string_content)
+            string_content = names.setdefault(string_content, string_content)
+            yield ("STRING", string_content, line, start - line_start + 1)
+        elif kind == "UNCLOSED_STRING":
+            column = start - line_start + 1
+            raise LexerError(f"Unclosed string starting at line {line}, column {column}", line, column)
+        elif kind == "MISMATCH":
+            column = start - line_start + 1
+            raise LexerError(f"Unexpected character '{match.group()}' at line {line}, column {column}", line, column)
+        else:
+            yield (kind, match.group(), line, start - line_start + 1)
+
+def iter_tokens(code, line=1):
+    """Yield tokens from code lazily. `line` is the number of the first line in code."""
+    return starmap(Token, _scan(code, line))
+
 def tokenize(code):
+    return list(iter_tokens(code))
+
+def tokenize_line(text, names=None):
+    """Return the (type, value, column) rows of a single line of code.
+
+    Tokens never span lines, so lexing a document line by line gives the
+    same tokens as lexing it whole (see incremental.py).
+    """
+    return [(token_type, value, column) for token_type, value, _, column in _scan(text, 1, names)]
+
+# Upper bound on the interning table kept while streaming, so that scripts with
+# millions of distinct string literals do not grow it without limit.
+STREAM_INTERN_LIMIT = 4096
+
+def tokenize_stream(source):
+    """Yield tokens line by line from a file object (or any iterable of lines)."""
+    names = {}
+    for line_number, line in enumerate(source, 1):
+        if len(names) > STREAM_INTERN_LIMIT:
+            names.clear()
+        yield from starmap(Token, _scan(line, line_number, names))
+
+# Token type codes used by TokenTable
+TOKEN_TYPES = (
+    "PRINT", "ASSIGN_KW", "IF", "ELSE", "TRUE", "FALSE", "END",
+    "IDENTIFIER", "NUMBER", "STRING",
+    "EQUALS", "NOT_EQUALS", "LE", "GE", "ASSIGN_OP", "LT", "GT",
+    "LPAREN", "RPAREN", "PLUS", "MINUS", "MULTIPLY", "DIVIDE",
+    "LBRACKET", "RBRACKET", "COMMA",
+    "WHILE",
+)
+TOKEN_TYPE_CODES = {name: code for code, name in enumerate(TOKEN_TYPES)}
+
+class TokenTable:
+    """Compact struct-of-arrays token store.
+
+    Each token is a type code, an index into the `literals` pool and its line
+    and column, held in `array` columns. Every distinct value appears in the
+    pool once. Parser reads the columns directly, without creating Token objects.
+    """
+    __slots__ = ("types", "values", "lines", "columns", "literals")
+
+    def __init__(self):
+        self.types = array('B')
+        self.values = array('I')
+        self.lines = array('I')
+        self.columns = array('I')
+        self.literals = []
+
+    def __len__(self):
+        return len(self.types)
+
+    def rows(self):
+        """Iterate (type, value, line, column) rows in source order."""
+        return zip(map(TOKEN_TYPES.__getitem__, self.types),
+                   map(self.literals.__getitem__, self.values),
+                   self.lines, self.columns)
+
+    def token(self, index):
+        """Materialize a single Token, e.g. for debug output."""
+        return Token(TOKEN_TYPES[self.types[index]], self.literals[self.values[index]],
+                     self.lines[index], self.columns[index])
+
+    def __iter__(self):
+        return starmap(Token, self.rows())
+
+def tokenize_compact(code):
+    """Tokenize code into a TokenTable instead of a list of Token objects."""
+    table = TokenTable()
+    types, values, lines, columns, literals = table.types, table.values, table.lines, table.columns, table.literals
+    type_codes = TOKEN_TYPE_CODES
+    pool = {}
+
+    for token_type, value, line, column in _scan(code):
+        # Key by class too, so that 1 and 1.0 (equal and same hash) stay distinct
+        key = (value.__class__, value)
+        index = pool.get(key)
+        if index is None:
+            index = pool[key] = len(literals)
+            literals.append(value)
+        types.append(type_codes[token_type])
+        values.append(index)
+        lines.append(line)
+        columns.append(column)
+
+    return table
+
+def tokenize_reference(code):
+    """Original line-by-line scanner, kept for benchmarks and equivalence checks."""
     tokens = []
     lines = code.split('\n')
     current_line = 0
@@ -87,6 +280,9 @@ def tokenize(code):
                 (r'>', "GT"),
                 (r'\(', "LPAREN"),
                 (r'\)', "RPAREN"),
+                (r'\[', "LBRACKET"),
+                (r'\]', "RBRACKET"),
+                (r',', "COMMA"),
                 (r'\+', "PLUS"),
                 (r'-', "MINUS"),
                 (r'\*', "MULTIPLY"),
@@ -1,66 +1,108 @@
 # src/main.py
+#
+# Startup matters here: short scripts are dominated by it. Only what every
+# run needs is imported up front; the lexer, the RTL formatter, optional
+# engines and features are imported where they are used (a cached program
+# runs without loading the lexer or the re module at all).
 import sys
 import os
-from lexer import tokenize
-from parser import parse
-from interpreter import interpret
-
-# Try to import the RTL console setup if on Windows
-try:
-    from set_console_rtl import set_console_rtl_mode
-    set_console_rtl_mode()
-except ImportError:
-    pass  # Not critical if it fails
-
-# Import the RTL formatter
-try:
-    from rtl_formatter import format_aron_code, add_rtl_marks
-except ImportError:
-    # Fallback if the formatter is not available
-    def format_aron_code(code): return code
-    def add_rtl_marks(code): return code
-
-def run_aron_file(filepath, debug=False):
+from pipeline import ENGINES, ITERATIVE_ENGINES, load_engine, prepare_program
+from output import OutputWriter, FLUSH_BLOCK, FLUSH_LINE, FLUSH_MODES, get_writer, set_writer
+
+# Set up the console for RTL text (Windows only)
+if sys.platform == 'win32':
+    try:
+        from set_console_rtl import set_console_rtl_mode
+        set_console_rtl_mode()
+    except ImportError:
+        pass  # Not critical if it fails
+
+def load_rtl_formatter():
+    """Return (format_aron_code, add_rtl_marks), used only to show the source under --debug."""
+    try:
+        from rtl_formatter import format_aron_code, add_rtl_marks
+    except ImportError:
+        # Fallback if the formatter is not available
+        def format_aron_code(code): return code
+        def add_rtl_marks(code): return code
+    return format_aron_code, add_rtl_marks
+
+def run_aron_file(filepath, debug=False, engine="tree", dis=False, opt_level=0, use_cache=True, profile=None, memoize=None):
+    # profile: None when off, "" for the text report only, or a path for the folded stacks too
+    # memoize: None when off, or the number of operator results to keep (see memo.py)
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
             code = f.read()
         
-        # Format code for better RTL display
-        formatted_code = format_aron_code(code)
-        
         # Add RTL mark to ensure proper direction
         print("\u200F--- Executing Aron file: {filepath} ---")
         
-        # Optional: Display the formatted code
+        # Optional: Display the code, formatted for better RTL display
         if debug:
+            format_aron_code, add_rtl_marks = load_rtl_formatter()
+            formatted_code = format_aron_code(code)
             print("\u200F--- Formatted Source Code ---")
             print(add_rtl_marks(formatted_code))
             print("\u200F---------------------------")
         
         try:
-            tokens = tokenize(code)  # Still tokenize the original code
-            
-            if debug:
-                print("\u200FDEBUG: Tokens generated:")
-                for token in tokens:
-                    print(f"\u200F  {token}")
-            
             try:
-                ast_nodes = parse(tokens)
+                profiler = None
+                if profile is not None:
+                    # Profiled runs always lex and parse, so those phases can be timed
+                    from profiler import Profiler
+                    profiler = Profiler(code)
+                    ast_nodes, report = profiler.compile(code, opt_level)
+                else:
+                    # Still tokenize the original code (or reuse its cached program)
+                    ast_nodes, report = prepare_program(filepath, code, debug, opt_level, use_cache,
+                                                         engine in ITERATIVE_ENGINES)
                 
+                memoizer = None
+                if memoize is not None:
+                    from memo import Memoizer
+                    memoizer = Memoizer(memoize)
+
                 if debug:
                     print("DEBUG: AST nodes:")
                     for node in ast_nodes:
                         print(f"  {node}")
                 
-                try:
-                    interpret(ast_nodes)
-                except RuntimeError as e:
-                    print(f"Runtime Error: {e}")
+                if dis:
+                    # Show the bytecode instead of running the program
+                    from compiler import compile_program, disassemble
+                    print(disassemble(compile_program(ast_nodes), ast_nodes.positions))
+                else:
+                    try:
+                        try:
+                            if profiler:
+                                profiler.run(ast_nodes)
+                            elif memoizer:
+                                memoizer.run(ast_nodes)
+                            else:
+                                load_engine(engine)(ast_nodes)
+                        finally:
+                            get_writer().flush()
+                    except RuntimeError as e:
+                        print(f"Runtime Error: {e}")
+                    
+                    if memoizer:
+                        print(memoizer.report(), file=sys.stderr)
+                    if profiler:
+                        print(profiler.report(), file=sys.stderr)
+                        if profile:
+                            profiler.write_folded(profile)
+                            print(f"Folded stacks written to {profile}", file=sys.stderr)
+                
+                if report:
+                    print(report, file=sys.stderr)
                     
             except SyntaxError as e:
                 print(f"Syntax Error: {e}")
                 
+        except RecursionError as e:
+            # From the recursive parser, not the lexer (a RecursionError is a RuntimeError too)
+            print(f"Error: Program nested too deeply to compile ({e}); --engine=stack handles any depth")
         except RuntimeError as e:
             print(f"Lexical Error: {e}")
             
@@ -71,16 +113,92 @@ def run_aron_file(filepath, debug=False):
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
 
+def run_aron_stream(filepath, debug=False, engine="tree", opt_level=0, memoize=None):
+    """Run an Aron file as a pipeline: each top-level statement executes as soon
+    as it has been lexed and parsed, so memory stays bounded on huge scripts."""
+    from lexer import tokenize_stream, LexerError
+    from parser import Parser, StackParser
+    try:
+        print("\u200F--- Executing Aron file: {filepath} ---")
+
+        with open(filepath, 'r', encoding='utf-8') as f:
+            parser_class = StackParser if engine in ITERATIVE_ENGINES else Parser
+            optimizer = None
+            memoizer = None
+            try:
+                try:
+                    # Creating the parser reads the first token, so it can raise a LexerError too
+                    parser = parser_class(tokenize_stream(f))
+                    statements = parser.iter_statements(keep_positions=False)
+
+                    if opt_level > 0:
+                        from optimizer import Optimizer
+                        optimizer = Optimizer(opt_level)
+                        statements = optimizer.optimize_statements(statements)
+
+                    if debug:
+                        statements = _debug_statements(statements)
+
+                    if memoize is not None:
+                        from memo import Memoizer
+                        memoizer = Memoizer(memoize)
+                        memoizer.run(statements, parser.positions)
+                    else:
+                        load_engine(engine)(statements, parser.positions)
+                finally:
+                    get_writer().flush()
+            except LexerError as e:
+                print(f"Lexical Error: {e}")
+            except SyntaxError as e:
+                print(f"Syntax Error: {e}")
+            except RuntimeError as e:
+                print(f"Runtime Error: {e}")
+
+            if memoizer:
+                print(memoizer.report(), file=sys.stderr)
+            if optimizer:
+                print(optimizer.report(), file=sys.stderr)
+
+        print(f"--- Finished execution ---")
+
+    except FileNotFoundError:
+        print(f"Error: File not found '{filepath}'")
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+
+def _debug_statements(statements):
+    for node in statements:
+        print(f"DEBUG: AST node: {node}")
+        yield node
+
 def print_usage():
     print("שפת אהרן - Aron Programming Language")
     print("\nUsage:")
     print("  python main.py <filepath.aron> [options]")
+    print("  python main.py run-all <dir|glob> [-j N] [options]")
     print("\nOptions:")
     print("  --debug    Show debugging information (tokens and AST)")
+    print("  --stream   Execute each statement as soon as it is parsed (for very large files)")
+    print("  --engine=<name>  Execution engine: tree (default), closure, vm, python or stack")
+    print("                   (stack parses and runs without recursion, for deeply nested code)")
+    print("  --dis      Show the compiled bytecode instead of running the program")
+    print("  --opt-level=<n>  AST optimization: 0 none (default), 1 constant folding and")
+    print("                   dead-branch elimination, 2 also algebraic simplification")
+    print("  --flush=<mode>   When program output is written: line, block (default) or exit")
+    print("  --profile[=<file>]  Report hit counts and time per line and statement (tree engine only)")
+    print("                   on stderr; with a file, also write folded stacks for flame graphs.")
+    print("                   Profiled runs always lex and parse, so the cache is not used")
+    print("  --memoize[=<n>]  Reuse the results of operators whose variables have not been")
+    print("                   assigned since (tree engine only); keeps up to n results (default 4096)")
+    print("  --max-iterations=<n>  Stop with a runtime error when a כל_עוד loop runs more than")
+    print("                   n iterations (default: no limit)")
+    print("  --no-cache Always lex and parse the source (skip the __aroncache__ directory)")
+    print("  -j N       With run-all: number of worker processes (default: one per CPU)")
     print("  --help     Show this help message")
     print("\nExamples:")
     print("  python main.py examples/hello.aron")
     print("  python main.py examples/final.aron --debug")
+    print("  python main.py run-all examples -j 4")
     print("\nFeatures Implemented:")
     print("  * Comments with #")
     print("  * Variables with קבע")
@@ -90,11 +208,14 @@ def print_usage():
     print("  * Boolean values (אמת/שקר)")
     print("  * Comparison operators (==, !=, <, >, <=, >=)")
     print("  * If-else statements (אם, אחרת, סוף)")
+    print("  * While loops (כל_עוד, סוף)")
     print("  * String operations (concatenation)")
+    print("  * Arrays ([1, 2, 3]) with element-wise operators, indexing and")
+    print("    סכום, מינימום, מקסימום, אורך, טווח (requires NumPy)")
     print("\nFuture Development:")
     print("  * Functions")
-    print("  * Data structures (arrays, lists)")
-    print("  * Loops (while, for)")
+    print("  * Lists and dictionaries")
+    print("  * For loops")
     print("  * Importing files and libraries")
     print("  * Dedicated IDE")
 
@@ -113,7 +234,85 @@ if __name__ == "__main__":
         list_examples()
         sys.exit(0 if "--help" in sys.argv else 1)
     
-    filepath = sys.argv[1]
+    run_all = sys.argv[1] == "run-all"
+    if run_all and len(sys.argv) < 3:
+        print("Error: run-all expects a directory or glob pattern")
+        sys.exit(1)
+    filepath = sys.argv[2] if run_all else sys.argv[1]
     debug_mode = "--debug" in sys.argv
+    engine = "tree"
+    opt_level = 0
+    flush_mode = FLUSH_BLOCK
+    jobs = None
+    profile = None
+    memoize = None
+    max_iterations = None
+    args = sys.argv[3:] if run_all else sys.argv[2:]
+    for index, arg in enumerate(args):
+        if arg.startswith("-j"):
+            value = arg[2:] or (args[index + 1] if index + 1 < len(args) else "")
+            if not value.isdigit() or int(value) < 1:
+                print(f"Error: -j expects a positive number, got '{value}'")
+                sys.exit(1)
+            jobs = int(value)
+        elif arg.startswith("--engine="):
+            engine = arg.split("=", 1)[1]
+        elif arg.startswith("--opt-level="):
+            value = arg.split("=", 1)[1]
+            if not value.isdigit():
+                print(f"Error: --opt-level expects a number, got '{value}'")
+                sys.exit(1)
+            opt_level = int(value)
+        elif arg.startswith("--flush="):
+            flush_mode = arg.split("=", 1)[1]
+        elif arg == "--profile" or arg.startswith("--profile="):
+            profile = arg.partition("=")[2]
+        elif arg == "--memoize" or arg.startswith("--memoize="):
+            value = arg.partition("=")[2]
+            if value and (not value.isdigit() or int(value) < 1):
+                print(f"Error: --memoize expects a positive number, got '{value}'")
+                sys.exit(1)
+            if not value:
+                from memo import DEFAULT_MAX_ENTRIES
+            memoize = int(value) if value else DEFAULT_MAX_ENTRIES
+        elif arg.startswith("--max-iterations="):
+            value = arg.split("=", 1)[1]
+            if not value.isdigit():
+                print(f"Error: --max-iterations expects a number, got '{value}'")
+                sys.exit(1)
+            max_iterations = int(value)
+    if engine not in ENGINES:
+        print(f"Error: Unknown engine '{engine}'. Available engines: {', '.join(ENGINES)}")
+        sys.exit(1)
+    
+    if flush_mode not in FLUSH_MODES:
+        print(f"Error: Unknown flush mode '{flush_mode}'. Available modes: {', '.join(FLUSH_MODES)}")
+        sys.exit(1)
+    if profile is not None:
+        # The profiler runs the program itself, walking the tree like the tree engine
+        conflicts = [option for option, given in ((f"--engine={engine}", engine != "tree"), ("--stream", "--stream" in sys.argv),
+                                                  ("--dis", "--dis" in sys.argv), ("run-all", run_all)) if given]
+        if conflicts:
+            print(f"Error: --profile cannot be combined with {', '.join(conflicts)}")
+            sys.exit(1)
+    if memoize is not None:
+        # The memoizer runs programs itself, walking the tree like the tree engine
+        conflicts = [option for option, given in ((f"--engine={engine}", engine != "tree"), ("--profile", profile is not None),
+                                                  ("--dis", "--dis" in sys.argv), ("run-all", run_all)) if given]
+        if conflicts:
+            print(f"Error: --memoize cannot be combined with {', '.join(conflicts)}")
+            sys.exit(1)
+    if debug_mode and "--stream" in sys.argv:
+        flush_mode = FLUSH_LINE # Keep program output in step with the debug lines
+    set_writer(OutputWriter(sys.stdout, flush_mode))
+    if max_iterations is not None:
+        from interpreter import set_loop_limit
+        set_loop_limit(max_iterations)
     
-    run_aron_file(filepath, debug_mode)
+    if run_all:
+        import batch
+        sys.exit(batch.main(filepath, jobs, engine, opt_level, "--no-cache" not in sys.argv, max_iterations))
+    elif "--stream" in sys.argv:
+        run_aron_stream(filepath, debug_mode, engine, opt_level, memoize)
+    else:
+        run_aron_file(filepath, debug_mode, engine, "--dis" in sys.argv, opt_level, "--no-cache" not in sys.argv, profile, memoize)
@@ -0,0 +1,201 @@
+# src/memo.py
+# Memoization of operator results for the tree engine (--memoize).
+#
+# Aron expressions have no side effects, and arrays are never changed in
+# place, so a BinaryOpNode evaluated again over variables that have not been
+# assigned since gives the same result. Every variable slot has a version
+# stamp that each assignment to it increments. A memo entry holds the stamps
+# of the variables its node reads, and is used only while they still match:
+# an assignment invalidates exactly the entries that read the assigned
+# variable, without visiting any of them. The table keeps at most
+# max_entries results and evicts the least recently used.
+
+from collections import OrderedDict
+from operator import itemgetter
+
+from parser import PrintNode, VariableNode, AssignNode, BinaryOpNode, IfNode, WhileNode
+from parser import ConcatNode, ArrayNode, IndexNode, CallNode
+from interpreter import evaluate_node, prepare_frame, AronRuntimeError, BINARY_OPERATIONS
+from interpreter import loop_budget, loop_limit_error, make_array, index_value, call_function
+from output import get_writer
+
+# Results kept by default
+DEFAULT_MAX_ENTRIES = 4096
+
+def variable_slots(node, slots):
+    """Add the slots of the variables read in node's expression to the set slots."""
+    if isinstance(node, VariableNode):
+        slots.add(node.slot)
+    elif isinstance(node, BinaryOpNode):
+        variable_slots(node.left, slots)
+        variable_slots(node.right, slots)
+    elif isinstance(node, ConcatNode):
+        for part in node.parts:
+            variable_slots(part, slots)
+    elif isinstance(node, ArrayNode):
+        for element in node.elements:
+            variable_slots(element, slots)
+    elif isinstance(node, IndexNode):
+        variable_slots(node.target, slots)
+        variable_slots(node.index, slots)
+    elif isinstance(node, CallNode):
+        variable_slots(node.argument, slots)
+    return slots
+
+def constant_stamps(versions):
+    return ()
+
+class Memoizer:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict() # BinaryOpNode -> (stamps, result)
+        self.stamp_getters = {} # BinaryOpNode -> function(versions) returning the stamps it depends on
+        self.versions = [] # Version stamp per variable slot
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0 # Misses on an entry invalidated by an assignment
+        self.evictions = 0
+
+    def stamps_of(self, node):
+        """The function returning the version stamps of the variables node reads."""
+        slots = sorted(variable_slots(node, set()))
+        getter = itemgetter(*slots) if slots else constant_stamps
+        self.stamp_getters[node] = getter
+        return getter
+
+    def evaluate(self, node, values):
+        """evaluate_node, taking BinaryOpNode results from the memo table when their variables are unchanged."""
+        if isinstance(node, BinaryOpNode):
+            getter = self.stamp_getters.get(node) or self.stamps_of(node)
+            stamps = getter(self.versions)
+            entries = self.entries
+            entry = entries.get(node)
+            if entry is not None:
+                if entry[0] == stamps:
+                    self.hits += 1
+                    entries.move_to_end(node)
+                    return entry[1]
+                self.stale += 1
+            self.misses += 1
+            left_val = self.evaluate(node.left, values)
+            right_val = self.evaluate(node.right, values)
+            try:
+                result = BINARY_OPERATIONS[node.op](left_val, right_val)
+            except AronRuntimeError as error:
+                error.node = node
+                raise
+            entries[node] = (stamps, result)
+            entries.move_to_end(node)
+            if len(entries) > self.max_entries:
+                entries.popitem(last=False)
+                self.evictions += 1
+            return result
+        elif isinstance(node, ConcatNode):
+            return "".join([str(self.evaluate(part, values)) for part in node.parts])
+        elif isinstance(node, ArrayNode):
+            elements = [self.evaluate(element, values) for element in node.elements]
+            try:
+                return make_array(elements)
+            except AronRuntimeError as error:
+                error.node = node
+                raise
+        elif isinstance(node, IndexNode):
+            target = self.evaluate(node.target, values)
+            position = self.evaluate(node.index, values)
+            try:
+                return index_value(target, position)
+            except AronRuntimeError as error:
+                error.node = node
+                raise
+        elif isinstance(node, CallNode):
+            argument = self.evaluate(node.argument, values)
+            try:
+                return call_function(node.name, argument)
+            except AronRuntimeError as error:
+                error.node = node
+                raise
+        return evaluate_node(node, values)
+
+    def run(self, ast_nodes, positions=None):
+        """Execute a program (or a lazy statement iterator) like interpreter.interpret, memoizing its operators."""
+        if positions is None:
+            positions = getattr(ast_nodes, "positions", None)
+        frame, statements = prepare_frame(ast_nodes)
+        self.entries.clear() # The stamps start over with the fresh frame
+        self.versions = [0] * len(frame.values)
+        writer = get_writer()
+        node = None
+        try:
+            for node in statements:
+                if len(self.versions) < len(frame.values): # A streamed program resolved new names
+                    self.versions.extend([0] * (len(frame.values) - len(self.versions)))
+                self.run_block((node,), frame.values, writer.write_value)
+        except AronRuntimeError as error:
+            if positions is not None:
+                error.locate(positions, node)
+            raise
+        finally:
+            writer.end_run()
+
+    def run_block(self, nodes, values, write_value):
+        versions = self.versions
+        for node in nodes:
+            if isinstance(node, PrintNode):
+                write_value(self.evaluate(node.value_node, values))
+            elif isinstance(node, AssignNode):
+                slot = node.variable_node.slot
+                values[slot] = self.evaluate(node.value_node, values)
+                versions[slot] += 1 # Invalidates the entries that read this variable
+            elif isinstance(node, IfNode):
+                condition_result = self.evaluate(node.condition, values)
+                try:
+                    truth = bool(condition_result) # An array as a condition raises
+                except AronRuntimeError as error:
+                    error.node = node
+                    raise
+                if truth:
+                    self.run_block(node.body, values, write_value)
+                elif node.else_body:
+                    self.run_block(node.else_body, values, write_value)
+            elif isinstance(node, WhileNode):
+                budget = loop_budget()
+                while True:
+                    condition_result = self.evaluate(node.condition, values)
+                    try:
+                        if not condition_result:
+                            break
+                    except AronRuntimeError as error:
+                        error.node = node
+                        raise
+                    if budget == 0:
+                        raise loop_limit_error(node)
+                    budget -= 1
+                    self.run_block(node.body, values, write_value)
+            else:
+                raise AronRuntimeError(f"Unknown AST node type at top level: {type(node)}", node)
+
+    def report(self):
+        """One line of memo table statistics."""
+        lookups = self.hits + self.misses
+        rate = f"{self.hits / lookups:.1%}" if lookups else "-"
+        return (f"--- Memo: {self.hits} hits, {self.misses} misses ({self.stale} invalidated), "
+                f"hit rate {rate}, {len(self.entries)}/{self.max_entries} entries, {self.evictions} evicted ---")
+
+if __name__ == '__main__':
+    from lexer import tokenize
+    from parser import parse
+
+    code = """
+קבע רוחב = 12
+קבע גובה = 5
+קבע מונה = 0
+כל_עוד מונה < 1000
+    קבע שטח = רוחב * גובה + רוחב * 2
+    קבע מונה = מונה + 1
+סוף
+הדפס שטח
+"""
+    memoizer = Memoizer()
+    memoizer.run(parse(tokenize(code)))
+    get_writer().flush()
+    print(memoizer.report())
@@ -0,0 +1,364 @@
+# src/optimizer.py
+# AST optimization pass, run between parser.parse and execution.
+#
+# Level 1: constant folding of BinaryOpNodes over literals and of adjacent
+#          literal parts of ConcatNodes, elimination of IfNode branches whose
+#          condition is a constant and of WhileNode loops whose condition is
+#          a false constant.
+# Level 2: also algebraic simplification (e.g. x * 1 -> x) where the operand
+#          type is known well enough for the result to be identical.
+#
+# Folding evaluates operators with the same functions the engines use. If an
+# operation would fail (division by zero, bad operand types) the node is left
+# alone, so the error is still raised at run time, exactly as before.
+
+from parser import PrintNode, StringNode, NumberNode, AssignNode, BinaryOpNode, BooleanNode, IfNode, Program
+from parser import ConcatNode, ArrayNode, IndexNode, CallNode, WhileNode, CONCAT_OPERANDS
+from parser import OP_PLUS, OP_MINUS, OP_MULTIPLY, OP_DIVIDE, OP_EQUALS, OP_GE
+from interpreter import AronRuntimeError, BINARY_OPERATIONS
+
+# Folded strings longer than this stay as expressions, so that e.g.
+# "x" * 100000000 does not bloat the program (or a cached copy of it).
+MAX_FOLDED_STRING_LENGTH = 4096
+
+# Static operand types used by algebraic simplification
+INT, FLOAT, NUMBER, STRING, BOOLEAN, UNKNOWN = "int", "float", "number", "string", "boolean", "unknown"
+
+def constant_node(value):
+    """Return a literal node holding value."""
+    if isinstance(value, bool):
+        return BooleanNode(value)
+    elif isinstance(value, str):
+        return StringNode(value)
+    # NumberNode() truncates to int (as the parser expects), so set floats directly
+    node = NumberNode.__new__(NumberNode)
+    node.value = value
+    return node
+
+def repeated_length(left_val, right_val):
+    """Length of the string that string * number (in either order) would build, or 0 for other operands."""
+    if isinstance(left_val, str) and isinstance(right_val, (int, float)):
+        return len(left_val) * max(int(right_val), 0)
+    elif isinstance(right_val, str) and isinstance(left_val, (int, float)):
+        return len(right_val) * max(int(left_val), 0)
+    return 0
+
+def literal_text(*values):
+    """The joined str() of literal values, or None if one cannot be converted (an int too long for str())."""
+    try:
+        return "".join([str(value) for value in values])
+    except ValueError:
+        return None
+
+def count_nodes(node):
+    """Count node and all nodes below it (statements and expressions)."""
+    count = 0
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        count += 1
+        if isinstance(node, BinaryOpNode):
+            pending += (node.left, node.right)
+        elif isinstance(node, ConcatNode):
+            pending += node.parts
+        elif isinstance(node, ArrayNode):
+            pending += node.elements
+        elif isinstance(node, IndexNode):
+            pending += (node.target, node.index)
+        elif isinstance(node, CallNode):
+            pending.append(node.argument)
+        elif isinstance(node, PrintNode):
+            pending.append(node.value_node)
+        elif isinstance(node, AssignNode):
+            pending += (node.variable_node, node.value_node)
+        elif isinstance(node, IfNode):
+            pending.append(node.condition)
+            pending += node.body
+            pending += node.else_body or ()
+        elif isinstance(node, WhileNode):
+            pending.append(node.condition)
+            pending += node.body
+    return count
+
+class Optimizer:
+    # Nested expressions and blocks are walked with explicit stacks (as in
+    # resolver.Resolver), so programs from parser.StackParser optimize at any
+    # nesting depth.
+    def __init__(self, level=1):
+        self.level = level
+        self.types = {} # BinaryOpNode -> static_type, for the statement being optimized
+        self.nodes_before = 0
+        self.nodes_after = 0
+        self.folded = 0
+        self.branches_eliminated = 0
+        self.simplified = 0
+
+    def report(self):
+        eliminated = self.nodes_before - self.nodes_after
+        return (f"Optimizer (level {self.level}): eliminated {eliminated} of {self.nodes_before} nodes "
+                f"(folded {self.folded} expressions, eliminated {self.branches_eliminated} branches, "
+                f"simplified {self.simplified} expressions)")
+
+    def optimize_statements(self, ast_nodes):
+        """Yield the optimized form of each statement in ast_nodes (list or lazy iterator)."""
+        for node in ast_nodes:
+            self.nodes_before += count_nodes(node)
+            for statement in self.optimize_statement(node):
+                self.nodes_after += count_nodes(statement)
+                yield statement
+            self.types.clear()
+
+    def optimize_statement(self, node):
+        """Return the list of statements that replaces node."""
+        if self.level <= 0:
+            return [node]
+        return self.optimize_block((node,))
+
+    def optimize_block(self, nodes):
+        """Return the optimized list of statements that replaces the list nodes."""
+        block = []
+        # (statements left, list their replacements go to, (IfNode or WhileNode, its list, body, else body) to finish or None)
+        blocks = [(iter(nodes), block, None)]
+        while blocks:
+            statements, output, owner = blocks[-1]
+            for node in statements:
+                if isinstance(node, (PrintNode, AssignNode)):
+                    node.value_node = self.optimize_expression(node.value_node)
+                    output.append(node)
+                elif isinstance(node, IfNode):
+                    node.condition = self.optimize_expression(node.condition)
+                    body, else_body = [], []
+                    blocks.append((iter(()), None, (node, output, body, else_body)))
+                    if node.else_body:
+                        blocks.append((iter(node.else_body), else_body, None))
+                    blocks.append((iter(node.body), body, None))
+                    break
+                elif isinstance(node, WhileNode):
+                    node.condition = self.optimize_expression(node.condition)
+                    body = []
+                    blocks.append((iter(()), None, (node, output, body, None)))
+                    blocks.append((iter(node.body), body, None))
+                    break
+                else:
+                    output.append(node)
+            else:
+                blocks.pop()
+                if owner is not None:
+                    node, output, body, else_body = owner
+                    node.body = body
+                    if else_body is not None and node.else_body:
+                        node.else_body = else_body
+                    output.extend(self.finish_statement(node))
+        return block
+
+    def finish_statement(self, node):
+        """Return the list of statements that replaces an IfNode or WhileNode whose parts are optimized."""
+        if isinstance(node, IfNode):
+            if isinstance(node.condition, (NumberNode, StringNode, BooleanNode)):
+                # Only one branch can ever run; splice it into the enclosing block
+                self.branches_eliminated += 1
+                if node.condition.value:
+                    return node.body
+                return node.else_body or []
+        elif isinstance(node, WhileNode):
+            if isinstance(node.condition, (NumberNode, StringNode, BooleanNode)) and not node.condition.value:
+                # The body can never run (a true constant is kept: the loop runs until its iteration limit)
+                self.branches_eliminated += 1
+                return []
+        return [node]
+
+    def optimize_expression(self, node):
+        """Return the optimized form of an expression, optimizing its operands first (in post-order)."""
+        results = [] # Optimized operands
+        pending = [node] # Nodes to optimize; (node,) finishes node once its operands are on results
+        while pending:
+            item = pending.pop()
+            if item.__class__ is tuple:
+                node = item[0]
+                if isinstance(node, BinaryOpNode):
+                    node.right = results.pop()
+                    node.left = results.pop()
+                    results.append(self.optimize_operation(node))
+                elif isinstance(node, ConcatNode):
+                    start = len(results) - len(node.parts)
+                    parts = results[start:]
+                    del results[start:]
+                    results.append(self.concat(node, parts))
+                elif isinstance(node, ArrayNode):
+                    start = len(results) - len(node.elements)
+                    node.elements = results[start:]
+                    del results[start:]
+                    results.append(node)
+                elif isinstance(node, IndexNode):
+                    node.index = results.pop()
+                    node.target = results.pop()
+                    results.append(node)
+                else:
+                    node.argument = results.pop()
+                    results.append(node)
+            elif isinstance(item, BinaryOpNode):
+                pending += ((item,), item.right, item.left)
+            elif isinstance(item, ConcatNode):
+                pending.append((item,))
+                pending += reversed(item.parts)
+            elif isinstance(item, ArrayNode):
+                pending.append((item,))
+                pending += reversed(item.elements)
+            elif isinstance(item, IndexNode):
+                pending += ((item,), item.index, item.target)
+            elif isinstance(item, CallNode):
+                pending += ((item,), item.argument)
+            else:
+                results.append(item)
+        return results[0]
+
+    def optimize_operation(self, node):
+        """Fold or simplify a BinaryOpNode whose operands are optimized."""
+        left, right = node.left, node.right
+
+        if isinstance(left, (NumberNode, StringNode, BooleanNode)) and isinstance(right, (NumberNode, StringNode, BooleanNode)):
+            if node.op == OP_MULTIPLY and repeated_length(left.value, right.value) > MAX_FOLDED_STRING_LENGTH:
+                return node # Checked first: building the string could exhaust memory
+            try:
+                value = BINARY_OPERATIONS[node.op](left.value, right.value)
+            except Exception:
+                # Any failure (bad operands, division by zero, OverflowError from a
+                # huge int / ...) keeps the node, so it is raised at run time as before
+                return node
+            if isinstance(value, str) and len(value) > MAX_FOLDED_STRING_LENGTH:
+                return node
+            self.folded += 1
+            return constant_node(value)
+
+        if node.op == OP_PLUS and (isinstance(left, CONCAT_OPERANDS) or isinstance(right, CONCAT_OPERANDS)):
+            # Folding made an operand a string (e.g. "אב" * 2 + א): a concatenation, as the parser builds it
+            return self.concat(ConcatNode([]), [left, right])
+
+        if self.level >= 2:
+            return self.simplify(node)
+        return node
+
+    def concat(self, node, parts):
+        """Give node the optimized parts, splicing in nested concatenations and joining adjacent literals.
+
+        Returns node, or a StringNode if only a literal is left. A
+        concatenation is the join of str() of its parts, so any run of
+        literal parts can be replaced by the join of their str().
+        """
+        literals = (NumberNode, StringNode, BooleanNode)
+        spliced = []
+        for part in parts:
+            if isinstance(part, ConcatNode):
+                spliced += part.parts # Already optimized
+            else:
+                spliced.append(part)
+        node.parts = []
+        for part in spliced:
+            if isinstance(part, literals) and node.parts and isinstance(node.parts[-1], literals):
+                text = literal_text(node.parts[-1].value, part.value)
+                if text is not None and len(text) <= MAX_FOLDED_STRING_LENGTH:
+                    self.folded += 1
+                    node.parts[-1] = StringNode(text)
+                    continue
+            node.parts.append(part)
+        if len(node.parts) == 1 and isinstance(node.parts[0], literals):
+            text = literal_text(node.parts[0].value)
+            if text is not None:
+                return StringNode(text)
+        return node
+
+    def simplify(self, node):
+        """Apply algebraic identities that cannot change the result or its type."""
+        op, left, right = node.op, node.left, node.right
+
+        if op == OP_MULTIPLY:
+            # x * 1 is x for ints, floats and strings (but not booleans: אמת * 1 is 1)
+            if is_literal(right, 1) and static_type(left, self.types) in (INT, FLOAT, NUMBER, STRING):
+                self.simplified += 1
+                return left
+            if is_literal(left, 1) and static_type(right, self.types) in (INT, FLOAT, NUMBER, STRING):
+                self.simplified += 1
+                return right
+        elif op == OP_MINUS:
+            # x - 0 is x for any number, including -0.0
+            if is_literal(right, 0) and static_type(left, self.types) in (INT, FLOAT, NUMBER):
+                self.simplified += 1
+                return left
+        elif op == OP_PLUS:
+            # x + 0 is x only for ints (-0.0 + 0 is 0.0)
+            if is_literal(right, 0) and static_type(left, self.types) == INT:
+                self.simplified += 1
+                return left
+            if is_literal(left, 0) and static_type(right, self.types) == INT:
+                self.simplified += 1
+                return right
+        return node
+
+def is_literal(node, value):
+    """True if node is the int literal value (not a float or boolean equal to it)."""
+    return isinstance(node, NumberNode) and type(node.value) is int and node.value == value
+
+def operand_type(node):
+    """static_type of an expression that is not an arithmetic BinaryOpNode."""
+    if isinstance(node, BooleanNode):
+        return BOOLEAN
+    elif isinstance(node, StringNode):
+        return STRING
+    elif isinstance(node, NumberNode):
+        return INT if type(node.value) is int else FLOAT
+    elif isinstance(node, ConcatNode):
+        return STRING
+    elif isinstance(node, BinaryOpNode): # A comparison
+        return BOOLEAN
+    return UNKNOWN
+
+def operation_type(op, left, right):
+    """static_type of an arithmetic operation with operands of static types left and right."""
+    if op == OP_DIVIDE:
+        return FLOAT # True division always produces a float
+    if op == OP_MINUS:
+        # Succeeds only on numbers (booleans included) and never returns a boolean
+        if left in (INT, BOOLEAN) and right in (INT, BOOLEAN):
+            return INT
+        return NUMBER
+    if op == OP_PLUS and (left == STRING or right == STRING):
+        return STRING
+    if left in (INT, BOOLEAN) and right in (INT, BOOLEAN):
+        return INT
+    if left in (INT, FLOAT, NUMBER, BOOLEAN) and right in (INT, FLOAT, NUMBER, BOOLEAN):
+        return NUMBER
+    return UNKNOWN
+
+def static_type(node, types=None):
+    """Best-effort type of an expression's value, without knowing variable values.
+
+    Arrays are not tracked: an operator on an array may be typed as a number
+    or a boolean, for which the identities in simplify hold element by element.
+    types, if given, is a {BinaryOpNode: type} dict of results to reuse and add to.
+    """
+    if types is None:
+        types = {}
+    results = []
+    pending = [node]
+    while pending:
+        item = pending.pop()
+        if item.__class__ is tuple:
+            node = item[0]
+            right = results.pop()
+            results[-1] = types[node] = operation_type(node.op, results[-1], right)
+        elif isinstance(item, BinaryOpNode) and item.op < OP_EQUALS:
+            known = types.get(item)
+            if known is not None:
+                results.append(known)
+            else:
+                pending += ((item,), item.right, item.left)
+        else:
+            results.append(operand_type(item))
+    return results[0]
+
+def optimize(ast_nodes, level=1):
+    """Optimize a parsed program. Returns (program, optimizer); optimizer.report() describes the changes."""
+    optimizer = Optimizer(level)
+    program = Program(optimizer.optimize_statements(ast_nodes), getattr(ast_nodes, "positions", None),
+                      getattr(ast_nodes, "symbols", None))
+    return program, optimizer
@@ -0,0 +1,161 @@
+# src/output.py
+# Output for Aron's print statement (הדפס).
+#
+# Instead of a print() call per statement, engines hand values to an
+# OutputWriter, which formats them like interpreter.format_value_for_output
+# and encodes them straight into a byte buffer with a pre-encoded RTL prefix.
+# The buffer is written to the underlying binary stream (sys.stdout.buffer)
+# according to the flush mode:
+#
+#   line  - after every printed line (for interactive use)
+#   block - whenever BLOCK_SIZE bytes have accumulated (the default)
+#   exit  - only when flush() is called, or when Python exits
+#
+# Engines flush at the end of every top-level run (except in exit mode), so
+# their output never lands after text printed later with print().
+
+import atexit
+import os
+import sys
+
+RTL_MARK = "\u200F"
+TRUE_TEXT = "אמת"
+FALSE_TEXT = "שקר"
+
+FLUSH_LINE = "line"
+FLUSH_BLOCK = "block"
+FLUSH_EXIT = "exit"
+FLUSH_MODES = (FLUSH_LINE, FLUSH_BLOCK, FLUSH_EXIT)
+
+BLOCK_SIZE = 64 * 1024
+
+class OutputWriter:
+    """Buffered writer of printed Aron values to a text stream.
+
+    If the stream has a binary `buffer` (like sys.stdout), encoded bytes are
+    written to it directly; otherwise (e.g. io.StringIO) the buffered text is
+    decoded and written to the stream itself.
+    """
+
+    def __init__(self, stream=None, flush_mode=FLUSH_BLOCK, block_size=BLOCK_SIZE):
+        if flush_mode not in FLUSH_MODES:
+            raise ValueError(f"Unknown flush mode '{flush_mode}'. Available modes: {', '.join(FLUSH_MODES)}")
+        self.stream = stream if stream is not None else sys.stdout
+        self.flush_mode = flush_mode
+        self.block_size = block_size if flush_mode == FLUSH_BLOCK else 1 if flush_mode == FLUSH_LINE else sys.maxsize
+        self.binary = getattr(self.stream, "buffer", None)
+        self.encoding = getattr(self.stream, "encoding", None) or "utf-8"
+        self.errors = getattr(self.stream, "errors", None) or "strict"
+        # Text streams translate "\n" on their own; the binary buffer does not
+        newline = os.linesep if self.binary is not None else "\n"
+        self.newline = newline.encode(self.encoding, self.errors)
+        self.prefix = RTL_MARK.encode(self.encoding, self.errors)
+        self.true_line = (RTL_MARK + TRUE_TEXT + newline).encode(self.encoding, self.errors)
+        self.false_line = (RTL_MARK + FALSE_TEXT + newline).encode(self.encoding, self.errors)
+        self.buffer = bytearray()
+        if flush_mode == FLUSH_EXIT:
+            atexit.register(self.flush)
+
+    def write_value(self, value):
+        """Buffer one printed line holding value (formatted like format_value_for_output)."""
+        buffer = self.buffer
+        if value is True:
+            buffer += self.true_line
+        elif value is False:
+            buffer += self.false_line
+        else:
+            buffer += self.prefix
+            text = value if value.__class__ is str else str(value)
+            buffer += text.encode(self.encoding, self.errors)
+            buffer += self.newline
+        if len(buffer) >= self.block_size:
+            self.flush()
+
+    def end_run(self):
+        """Called by engines when a top-level run finishes."""
+        if self.flush_mode != FLUSH_EXIT:
+            self.flush()
+
+    def flush(self):
+        """Write out everything buffered so far."""
+        if not self.buffer:
+            return
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        if self.binary is not None:
+            # Push out text already printed to the stream, so the order is kept
+            self.stream.flush()
+            self.binary.write(data)
+            if self.flush_mode == FLUSH_LINE:
+                self.binary.flush()
+        else:
+            self.stream.write(data.decode(self.encoding, self.errors))
+
+class CaptureSink:
+    """In-memory output target for embedding: collects everything printed."""
+
+    def __init__(self):
+        self.parts = []
+        self.encoding = "utf-8"
+
+    def write(self, text):
+        self.parts.append(text)
+
+    def flush(self):
+        pass
+
+    def getvalue(self):
+        return "".join(self.parts)
+
+_installed_writer = None
+_default_writer = None
+
+def get_writer():
+    """Return the writer engines should print to.
+
+    This is the writer installed with set_writer(), or else a block-buffered
+    writer for the current sys.stdout (replaced when sys.stdout changes, e.g.
+    under contextlib.redirect_stdout).
+    """
+    global _default_writer
+    if _installed_writer is not None:
+        return _installed_writer
+    if _default_writer is None or _default_writer.stream is not sys.stdout:
+        if _default_writer is not None:
+            _default_writer.flush()
+        _default_writer = OutputWriter(sys.stdout)
+    return _default_writer
+
+def set_writer(writer):
+    """Install writer for all engines (None restores the default). Returns the previous one."""
+    global _installed_writer
+    previous = _installed_writer
+    if previous is not None and previous is not writer:
+        previous.flush()
+    _installed_writer = writer
+    return previous
+
+def write_value(value):
+    """Print value through the current writer."""
+    get_writer().write_value(value)
+
+class capture_output:
+    """Context manager that captures everything Aron programs print.
+
+        with capture_output() as captured:
+            interpret(program)
+        text = captured.getvalue()
+    """
+
+    def __init__(self):
+        self.sink = CaptureSink()
+        self.previous = None
+
+    def __enter__(self):
+        self.previous = set_writer(OutputWriter(self.sink))
+        return self.sink
+
+    def __exit__(self, *exc_info):
+        get_writer().flush()
+        set_writer(self.previous)
+        return False
@@ -2,10 +2,49 @@
 # Placeholder for the Parser
 # A real parser would build an Abstract Syntax Tree (AST)
 
+# Operator codes stored in BinaryOpNode.op
+OP_PLUS, OP_MINUS, OP_MULTIPLY, OP_DIVIDE, OP_EQUALS, OP_NOT_EQUALS, OP_LT, OP_GT, OP_LE, OP_GE = range(10)
+OPERATOR_NAMES = ("PLUS", "MINUS", "MULTIPLY", "DIVIDE", "EQUALS", "NOT_EQUALS", "LT", "GT", "LE", "GE")
+OPERATOR_CODES = {name: code for code, name in enumerate(OPERATOR_NAMES)}
+
+# Binding power of the operators between two operands (higher binds tighter).
+# Comparisons are lowest and may appear at most once, outside parentheses;
+# all other operators are left-associative.
+COMPARISON_PRECEDENCE = 0
+ARITHMETIC_PRECEDENCE = 1 # Lowest precedence allowed inside parentheses
+
+# Operator table of the expression parsers: token type -> (precedence, operator
+# code). A new binary operator needs an entry here, a token in lexer.py and its
+# function in interpreter.BINARY_OPERATIONS.
+BINARY_OPERATORS = {
+    "EQUALS": (COMPARISON_PRECEDENCE, OP_EQUALS),
+    "NOT_EQUALS": (COMPARISON_PRECEDENCE, OP_NOT_EQUALS),
+    "LT": (COMPARISON_PRECEDENCE, OP_LT),
+    "GT": (COMPARISON_PRECEDENCE, OP_GT),
+    "LE": (COMPARISON_PRECEDENCE, OP_LE),
+    "GE": (COMPARISON_PRECEDENCE, OP_GE),
+    "PLUS": (ARITHMETIC_PRECEDENCE, OP_PLUS),
+    "MINUS": (ARITHMETIC_PRECEDENCE, OP_MINUS),
+    "MULTIPLY": (ARITHMETIC_PRECEDENCE + 1, OP_MULTIPLY),
+    "DIVIDE": (ARITHMETIC_PRECEDENCE + 1, OP_DIVIDE),
+}
+
+# Built-in functions, called as name(argument) and implemented in
+# interpreter.call_function: the sum, minimum, maximum and length of an array,
+# and the array 0, 1, ..., n - 1. Other names followed by '(' are not calls.
+FUNCTION_NAMES = ("סכום", "מינימום", "מקסימום", "אורך", "טווח")
+
+# Tokens that can follow an identifier to make a call or an indexing
+POSTFIX_TOKENS = frozenset(("LPAREN", "LBRACKET"))
+
+# Nodes use __slots__ and carry no source positions; the parser records those
+# in a side table (Program.positions) that is only read when reporting errors.
 class ASTNode:
-    pass
+    __slots__ = ()
 
 class PrintNode(ASTNode):
+    __slots__ = ("value_node",)
+
     def __init__(self, value_node):
         self.value_node = value_node
 
@@ -13,6 +52,8 @@ class PrintNode(ASTNode):
         return f"PrintNode({self.value_node})"
 
 class StringNode(ASTNode):
+    __slots__ = ("value",)
+
     def __init__(self, value):
         self.value = value # The string literal itself, e.g., "Hello" (without quotes)
 
@@ -20,6 +61,8 @@ class StringNode(ASTNode):
         return f"StringNode('{self.value}')"
 
 class NumberNode(ASTNode):
+    __slots__ = ("value",)
+
     def __init__(self, value):
         self.value = int(value) # Store as integer
 
@@ -27,6 +70,8 @@ class NumberNode(ASTNode):
         return f"NumberNode({self.value})"
 
 class BooleanNode(ASTNode):
+    __slots__ = ("value",)
+
     def __init__(self, value):
         self.value = value  # True or False
 
@@ -34,13 +79,18 @@ class BooleanNode(ASTNode):
         return f"BooleanNode({self.value})"
 
 class VariableNode(ASTNode):
+    __slots__ = ("name", "slot")
+
     def __init__(self, name):
         self.name = name
+        self.slot = None # Variable slot, assigned by the parser (or resolver.resolve)
 
     def __repr__(self):
         return f"VariableNode('{self.name}')"
 
 class AssignNode(ASTNode):
+    __slots__ = ("variable_node", "value_node")
+
     def __init__(self, variable_node, value_node):
         self.variable_node = variable_node
         self.value_node = value_node
@@ -49,15 +99,68 @@ class AssignNode(ASTNode):
         return f"AssignNode({self.variable_node}, {self.value_node})"
 
 class BinaryOpNode(ASTNode):
+    __slots__ = ("left", "op", "right", "cache")
+
     def __init__(self, left, op, right):
         self.left = left
-        self.op = op # Token (e.g., Token('PLUS', '+'))
+        self.op = op # Operator code (e.g., OP_PLUS)
         self.right = right
+        self.cache = None # interpreter.InlineCache, created when the operation first runs
 
     def __repr__(self):
-        return f"BinaryOpNode({self.left}, {self.op.type}, {self.right})"
+        return f"BinaryOpNode({self.left}, {OPERATOR_NAMES[self.op]}, {self.right})"
+
+class ConcatNode(ASTNode):
+    """A chain of '+' whose result is a string, e.g. "סכום: " + א + " ש\"ח".
+
+    The parsers build it instead of nested BinaryOpNodes once an operand of
+    '+' is a string literal: from there on every '+' concatenates str() of
+    both sides, so the chain's value is the join of str() of each part,
+    computed at once instead of copying the growing string at every '+'.
+    """
+    __slots__ = ("parts",)
+
+    def __init__(self, parts):
+        self.parts = parts # List of expression nodes, at least two
+
+    def __repr__(self):
+        return f"ConcatNode({self.parts})"
+
+# Operand classes that make '+' a string concatenation
+CONCAT_OPERANDS = (StringNode, ConcatNode)
+
+class ArrayNode(ASTNode):
+    __slots__ = ("elements",)
+
+    def __init__(self, elements):
+        self.elements = elements # List of expression nodes
+
+    def __repr__(self):
+        return f"ArrayNode({self.elements})"
+
+class IndexNode(ASTNode):
+    __slots__ = ("target", "index")
+
+    def __init__(self, target, index):
+        self.target = target # Expression node of the array
+        self.index = index
+
+    def __repr__(self):
+        return f"IndexNode({self.target}, {self.index})"
+
+class CallNode(ASTNode):
+    __slots__ = ("name", "argument")
+
+    def __init__(self, name, argument):
+        self.name = name # One of FUNCTION_NAMES
+        self.argument = argument
+
+    def __repr__(self):
+        return f"CallNode('{self.name}', {self.argument})"
 
 class IfNode(ASTNode):
+    __slots__ = ("condition", "body", "else_body")
+
     def __init__(self, condition, body, else_body=None):
         self.condition = condition  # Expression node
         self.body = body          # List of statement nodes for the if block
@@ -69,169 +172,466 @@ class IfNode(ASTNode):
         else:
             return f"IfNode(condition={self.condition}, body={self.body})"
 
+class WhileNode(ASTNode):
+    __slots__ = ("condition", "body")
+
+    def __init__(self, condition, body):
+        self.condition = condition
+        self.body = body # List of statements
+
+    def __repr__(self):
+        return f"WhileNode({self.condition}, body={self.body})"
+
+class SymbolTable:
+    """Maps variable names to slots, in order of first appearance."""
+    __slots__ = ("names", "slots")
+
+    def __init__(self):
+        self.names = []  # slot -> name
+        self.slots = {}  # name -> slot
+
+    def slot(self, name):
+        """Return the slot of name, allocating a new one on first use."""
+        slot = self.slots.get(name)
+        if slot is None:
+            slot = self.slots[name] = len(self.names)
+            self.names.append(name)
+        return slot
+
+    def __len__(self):
+        return len(self.names)
+
+class Program(list):
+    """Top-level statements of a parsed source.
+
+    `positions` maps nodes (statements, variables, binary operations,
+    concatenations, arrays, indexings and calls) to their (line, column) in
+    the source. `symbols` is the SymbolTable that the slots of the program's
+    VariableNodes refer to.
+    """
+    __slots__ = ("positions", "symbols")
+
+    def __init__(self, statements=(), positions=None, symbols=None):
+        super().__init__(statements)
+        self.positions = positions if positions is not None else {}
+        self.symbols = symbols
+
+# Row returned once the token source is exhausted
+END_OF_TOKENS = (None, None, 0, 0)
+
 class Parser:
-    def __init__(self, tokens):
-        self.tokens = tokens
-        self.pos = 0
-        if self.tokens and self.pos < len(self.tokens):
-            self.current_token = self.tokens[self.pos]
+    def __init__(self, tokens, symbols=None):
+        # Tokens may be a list, any iterator (e.g. lexer.tokenize_stream) or a
+        # lexer.TokenTable. The parser only keeps the fields of the current
+        # token, read as (type, value, line, column) rows, so a TokenTable is
+        # consumed without creating Token objects.
+        from lexer import TokenTable # Not imported at module level: cached programs need no lexer
+        if isinstance(tokens, TokenTable):
+            rows = tokens.rows()
         else:
-            self.current_token = None
+            rows = ((token.type, token.value, token.line, token.column) for token in tokens)
+        self.start(rows, symbols)
+
+    @classmethod
+    def from_rows(cls, rows, symbols=None, pos=0):
+        """Parser over an iterator of (type, value, line, column) rows.
+
+        symbols is the SymbolTable to allocate slots in (a new one by default)
+        and pos the index of the first row in the whole token stream, which
+        is shown in error messages.
+        """
+        parser = cls.__new__(cls)
+        parser.start(rows, symbols, pos)
+        return parser
+
+    def start(self, rows, symbols=None, pos=0):
+        self.tokens = rows
+        self.pos = pos
+        self.positions = {} # Side table: node -> (line, column)
+        self.symbols = symbols if symbols is not None else SymbolTable() # Variable slots, resolved while parsing
+        self.current_type, self.current_value, self.current_line, self.current_column = next(self.tokens, END_OF_TOKENS)
 
     def advance(self):
         self.pos += 1
-        if self.pos < len(self.tokens):
-            self.current_token = self.tokens[self.pos]
-        else:
-            self.current_token = None
+        self.current_type, self.current_value, self.current_line, self.current_column = next(self.tokens, END_OF_TOKENS)
 
     def consume(self, token_type):
-        if self.current_token and self.current_token.type == token_type:
-            token = self.current_token
+        if self.current_type == token_type:
+            value = self.current_value
             self.advance()
-            return token
+            return value
         else:
             expected = token_type
-            found = self.current_token.type if self.current_token else "End of Tokens"
+            found = self.current_type if self.current_type is not None else "End of Tokens"
             
             # Better error message with line and column information
-            if self.current_token:
-                line_info = f" at line {self.current_token.line}, column {self.current_token.column}"
+            if self.current_type is not None:
+                line_info = f" at line {self.current_line}, column {self.current_column}"
             else:
                 line_info = " at end of file"
                 
             raise SyntaxError(f"Expected token {expected}, got {found}{line_info}")
 
     def parse_factor(self):
-        token = self.current_token
-        if token is None:
+        token_type = self.current_type
+        value = self.current_value
+        if token_type is None:
             raise SyntaxError(f"Unexpected end of input. Expected factor at pos {self.pos}.")
         
-        if token.type == "NUMBER":
+        if token_type == "NUMBER":
             self.advance()
-            return NumberNode(token.value)
-        elif token.type == "STRING": # Though strings usually don't participate in arithmetic directly
+            return NumberNode(value)
+        elif token_type == "STRING": # Though strings usually don't participate in arithmetic directly
             self.advance()
-            return StringNode(token.value[1:-1]) # Remove quotes
-        elif token.type == "IDENTIFIER":
+            return StringNode(value[1:-1]) # Remove quotes
+        elif token_type == "IDENTIFIER":
+            position = (self.current_line, self.current_column)
             self.advance()
-            return VariableNode(token.value)
-        elif token.type == "TRUE":
+            if self.current_type in POSTFIX_TOKENS:
+                return self.parse_postfix(value, position)
+            node = VariableNode(value)
+            node.slot = self.symbols.slot(value)
+            self.positions[node] = position
+            return node
+        elif token_type == "TRUE":
             self.advance()
             return BooleanNode(True)
-        elif token.type == "FALSE":
+        elif token_type == "FALSE":
             self.advance()
             return BooleanNode(False)
-        elif token.type == "LPAREN":
+        elif token_type == "LPAREN":
             self.advance()  # Consume the '('
             expr = self.parse_expression()  # Parse the expression inside
             
             # Now we should find a closing parenthesis
-            if self.current_token and self.current_token.type == "RPAREN":
+            if self.current_type == "RPAREN":
                 self.advance()  # Consume the ')'
-                return expr
+                return self.parse_index(expr)
             else:
-                raise SyntaxError(f"Expected ')', got {self.current_token.type if self.current_token else 'EOF'}")
+                raise self.missing_rparen()
+        elif token_type == "LBRACKET":
+            return self.parse_index(self.parse_array())
         else:
-            raise SyntaxError(f"Expected NUMBER, STRING, IDENTIFIER, TRUE, FALSE or LPAREN, got {token.type} ('{token.value}') at pos {self.pos}")
+            raise SyntaxError(f"Expected NUMBER, STRING, IDENTIFIER, TRUE, FALSE or LPAREN, got {token_type} ('{value}') at pos {self.pos}")
 
-    def parse_term(self): # Handles * and /
-        node = self.parse_factor()
-        while self.current_token and self.current_token.type in ("MULTIPLY", "DIVIDE"):
-            op_token = self.current_token
+    def missing_rparen(self):
+        return SyntaxError(f"Expected ')', got {self.current_type if self.current_type is not None else 'EOF'}")
+
+    def parse_postfix(self, name, position):
+        """Parse what follows an identifier and a '(' or '[': a call (name(argument)), or indexings of the variable."""
+        if self.current_type == "LPAREN" and name in FUNCTION_NAMES:
+            self.advance() # Consume the '('
+            argument = self.parse_comparison()
+            if self.current_type != "RPAREN":
+                raise self.missing_rparen()
             self.advance()
-            right_node = self.parse_factor()
-            node = BinaryOpNode(node, op_token, right_node)
+            node = CallNode(name, argument)
+        else:
+            # A '(' after any other name is left for the next statement, which rejects it
+            node = VariableNode(name)
+            node.slot = self.symbols.slot(name)
+        self.positions[node] = position
+        return self.parse_index(node)
+
+    def parse_array(self):
+        """Parse an array literal: [expression, ...]. Elements, indexes and call arguments may be comparisons."""
+        node = ArrayNode([])
+        self.positions[node] = (self.current_line, self.current_column)
+        self.advance() # Consume the '['
+        if self.current_type != "RBRACKET":
+            node.elements.append(self.parse_comparison())
+            while self.current_type == "COMMA":
+                self.advance()
+                node.elements.append(self.parse_comparison())
+        if self.current_type != "RBRACKET":
+            raise self.missing_rbracket()
+        self.advance()
         return node
 
-    def parse_expression(self): # Handles + and -
-        node = self.parse_term()
-        while self.current_token and self.current_token.type in ("PLUS", "MINUS"):
-            op_token = self.current_token
+    def parse_index(self, node):
+        """Parse any indexings that follow the operand node: node[index][index]..."""
+        while self.current_type == "LBRACKET":
+            position = (self.current_line, self.current_column)
+            self.advance() # Consume the '['
+            index = self.parse_comparison()
+            if self.current_type != "RBRACKET":
+                raise self.missing_rbracket()
             self.advance()
-            right_node = self.parse_term()
-            node = BinaryOpNode(node, op_token, right_node)
+            node = IndexNode(node, index)
+            self.positions[node] = position
+        return node
+
+    def missing_rbracket(self):
+        return SyntaxError(f"Expected ']', got {self.current_type if self.current_type is not None else 'EOF'}")
+
+    def parse_binary(self, left, min_precedence):
+        """Precedence climbing: extend the operand left with the operators that bind at least min_precedence."""
+        operators = BINARY_OPERATORS
+        positions = self.positions
+        operator = operators.get(self.current_type)
+        while operator is not None:
+            precedence, op = operator
+            if precedence < min_precedence:
+                break
+            position = (self.current_line, self.current_column)
+            self.pos += 1 # self.advance(), inlined
+            self.current_type, self.current_value, self.current_line, self.current_column = next(self.tokens, END_OF_TOKENS)
+            right = self.parse_factor()
+            operator = operators.get(self.current_type)
+            # Only recurse when the right operand continues with a tighter operator
+            if operator is not None and operator[0] > precedence:
+                right = self.parse_binary(right, precedence + 1)
+                operator = operators.get(self.current_type)
+            if op == OP_PLUS and (left.__class__ in CONCAT_OPERANDS or right.__class__ in CONCAT_OPERANDS):
+                left = self.concat(left, right, position)
+            else:
+                left = BinaryOpNode(left, op, right)
+                positions[left] = position
+            if precedence == COMPARISON_PRECEDENCE:
+                break # Comparisons do not chain
+        return left
+
+    def concat(self, left, right, position):
+        """left + right where an operand is a string: extend the ConcatNode left, or start one."""
+        if left.__class__ is ConcatNode:
+            left.parts.append(right)
+            return left
+        node = ConcatNode([left, right])
+        self.positions[node] = position
+        return node
+
+    def parse_expression(self): # Arithmetic only, e.g. inside parentheses
+        node = self.parse_factor()
+        if self.current_type in BINARY_OPERATORS:
+            return self.parse_binary(node, ARITHMETIC_PRECEDENCE)
         return node
     
     def parse_comparison(self):
-        expr = self.parse_expression()
-        
-        # Check if the next token is a comparison operator
-        if self.current_token and self.current_token.type in ("EQUALS", "NOT_EQUALS", "LT", "GT", "LE", "GE"):
-            op_token = self.current_token
-            self.advance()
-            right_expr = self.parse_expression()
-            return BinaryOpNode(expr, op_token, right_expr)
-        
-        return expr
+        node = self.parse_factor()
+        if self.current_type in BINARY_OPERATORS:
+            return self.parse_binary(node, COMPARISON_PRECEDENCE)
+        return node
 
     def parse_statement(self):
-        if self.current_token is None:
+        if self.current_type is None:
             return None # No more tokens
 
-        if self.current_token.type == "PRINT":
+        position = (self.current_line, self.current_column)
+        node = self.parse_statement_body()
+        self.positions[node] = position
+        return node
+
+    def parse_statement_body(self):
+        if self.current_type == "PRINT":
             self.consume("PRINT")
             value_node = self.parse_comparison() # Use parse_comparison instead of parse_expression
             return PrintNode(value_node)
 
-        elif self.current_token.type == "ASSIGN_KW": # קבע
+        elif self.current_type == "ASSIGN_KW": # קבע
             self.consume("ASSIGN_KW")
-            var_name_token = self.consume("IDENTIFIER")
-            variable_node = VariableNode(var_name_token.value)
+            var_name = self.consume("IDENTIFIER")
+            variable_node = VariableNode(var_name)
+            variable_node.slot = self.symbols.slot(var_name)
             self.consume("ASSIGN_OP")
             value_node = self.parse_comparison() # Use parse_comparison instead of parse_expression
             return AssignNode(variable_node, value_node)
             
-        elif self.current_token.type == "IF": # אם
-            self.consume("IF")
-            condition = self.parse_comparison()  # Parse the condition expression
-            
-            # Parse the body of the if statement (all statements until 'אחרת' or 'סוף')
-            body = []
-            while self.current_token and self.current_token.type not in ["ELSE", "END"]:
+        elif self.current_type == "IF": # אם
+            return self.parse_if()
+        elif self.current_type == "WHILE": # כל_עוד
+            return self.parse_while()
+        else:
+            raise self.unexpected_statement()
+
+    def unexpected_statement(self):
+        return SyntaxError(f"Unexpected token at start of statement: {self.current_type} ('{self.current_value}') at pos {self.pos}")
+
+    def parse_if(self):
+        self.consume("IF")
+        condition = self.parse_comparison()  # Parse the condition expression
+        
+        # Parse the body of the if statement (all statements until 'אחרת' or 'סוף')
+        body = []
+        while self.current_type is not None and self.current_type not in ("ELSE", "END"):
+            stmt = self.parse_statement()
+            if stmt:
+                body.append(stmt)
+            else:
+                break
+        
+        # Check for 'אחרת' (else)
+        else_body = None
+        if self.current_type == "ELSE":
+            self.consume("ELSE")
+            else_body = []
+            # Parse the body of the else statement (all statements until 'סוף')
+            while self.current_type is not None and self.current_type != "END":
                 stmt = self.parse_statement()
                 if stmt:
-                    body.append(stmt)
+                    else_body.append(stmt)
                 else:
                     break
-            
-            # Check for 'אחרת' (else)
-            else_body = None
-            if self.current_token and self.current_token.type == "ELSE":
-                self.consume("ELSE")
-                else_body = []
-                # Parse the body of the else statement (all statements until 'סוף')
-                while self.current_token and self.current_token.type != "END":
-                    stmt = self.parse_statement()
-                    if stmt:
-                        else_body.append(stmt)
-                    else:
-                        break
-            
-            # Expect 'סוף' (end) to close the if-else structure
-            if self.current_token and self.current_token.type == "END":
-                self.consume("END")
-                return IfNode(condition, body, else_body)
-            else:
-                raise SyntaxError(f"Expected 'סוף' to close if-else block, got {self.current_token.type if self.current_token else 'EOF'}")
+        
+        # Expect 'סוף' (end) to close the if-else structure
+        if self.current_type == "END":
+            self.consume("END")
+            return IfNode(condition, body, else_body)
         else:
-            raise SyntaxError(f"Unexpected token at start of statement: {self.current_token.type} ('{self.current_token.value}') at pos {self.pos}")
+            raise self.missing_end()
 
-    def parse(self):
-        ast_nodes = []
-        while self.current_token: # Loop as long as there are tokens
+    def missing_end(self):
+        return SyntaxError(f"Expected 'סוף' to close if-else block, got {self.current_type if self.current_type is not None else 'EOF'}")
+
+    def parse_while(self):
+        self.consume("WHILE")
+        condition = self.parse_comparison()
+
+        # The body runs up to 'סוף'; an 'אחרת' in it is rejected as the start of a statement
+        body = []
+        while self.current_type is not None and self.current_type != "END":
+            body.append(self.parse_statement())
+
+        if self.current_type != "END":
+            raise self.missing_loop_end()
+        self.consume("END")
+        return WhileNode(condition, body)
+
+    def missing_loop_end(self):
+        return SyntaxError("Expected 'סוף' to close while loop, got EOF")
+
+    def iter_statements(self, keep_positions=True):
+        """Yield top-level statements one at a time, as soon as each is parsed.
+
+        With keep_positions=False the position table is cleared before the next
+        statement is parsed, so streaming a huge file keeps memory bounded.
+        """
+        while self.current_type is not None: # Loop as long as there are tokens
             statement = self.parse_statement()
             if statement: # parse_statement might return None if no tokens
-                ast_nodes.append(statement)
-            else: # Should only happen if self.current_token became None inside loop unexpectedly
-                break 
-        return ast_nodes
+                yield statement
+                if not keep_positions:
+                    self.positions.clear()
+            else: # Should only happen if self.current_type became None inside loop unexpectedly
+                break
+
+    def parse(self):
+        return Program(self.iter_statements(), self.positions, self.symbols)
+
+# Marks an open parenthesis on StackParser's operator stack
+OPEN_PAREN = None
+
+class StackParser(Parser):
+    """Parser that keeps nesting on explicit stacks instead of the Python call stack.
+
+    Parenthesized expressions, אם blocks and כל_עוד loops may nest to any depth (the
+    recursive Parser stops at Python's recursion limit), in linear time.
+    It builds the same AST, positions and slots, and raises the same errors.
+    """
+
+    def parse_expression(self):
+        return self.parse_operators(compared=True)
+
+    def parse_comparison(self):
+        return self.parse_operators(compared=False)
+
+    def parse_operators(self, compared):
+        # Operator precedence parsing: operands and pending operators are kept
+        # on stacks, and an operator is applied once one of lower or equal
+        # precedence follows it (so operators are left-associative).
+        # compared=True stops at a comparison, as in Parser.parse_expression.
+        operands = []
+        operators = [] # (precedence, op, position), or OPEN_PAREN
+        open_parens = 0
+        while True:
+            # Operand: any number of '(' followed by a literal or variable
+            while self.current_type == "LPAREN":
+                self.advance()
+                operators.append(OPEN_PAREN)
+                open_parens += 1
+            # Not a '(', so parse_factor only recurses into array elements, indexes and call arguments
+            operands.append(self.parse_factor())
+
+            # Operator, ')' or the end of the expression
+            while True:
+                token_type = self.current_type
+                operator = BINARY_OPERATORS.get(token_type)
+                if operator is not None and (operator[0] > COMPARISON_PRECEDENCE or not (open_parens or compared)):
+                    precedence, op = operator
+                    self.reduce(operands, operators, precedence)
+                    operators.append((precedence, op, (self.current_line, self.current_column)))
+                    compared = compared or precedence == COMPARISON_PRECEDENCE
+                    self.advance()
+                    break
+                if not open_parens:
+                    self.reduce(operands, operators, COMPARISON_PRECEDENCE)
+                    return operands[0]
+                if token_type != "RPAREN":
+                    raise self.missing_rparen()
+                self.reduce(operands, operators, COMPARISON_PRECEDENCE)
+                operators.pop() # The matching OPEN_PAREN
+                open_parens -= 1
+                self.advance()
+                operands[-1] = self.parse_index(operands[-1])
+
+    def reduce(self, operands, operators, precedence):
+        """Apply the pending operators, down to the innermost '(', that bind at least as tightly as precedence."""
+        while operators and operators[-1] is not OPEN_PAREN and operators[-1][0] >= precedence:
+            _, op, position = operators.pop()
+            right = operands.pop()
+            left = operands[-1]
+            if op == OP_PLUS and (left.__class__ in CONCAT_OPERANDS or right.__class__ in CONCAT_OPERANDS):
+                operands[-1] = self.concat(left, right, position)
+            else:
+                node = BinaryOpNode(left, op, right)
+                self.positions[node] = position
+                operands[-1] = node
+
+    def parse_statement(self):
+        if self.current_type is None:
+            return None # No more tokens
+
+        # Open אם and כל_עוד blocks, outermost first: [position, condition, body, else_body, is_loop]
+        blocks = []
+        while True:
+            position = (self.current_line, self.current_column)
+            if blocks:
+                block = blocks[-1]
+                token_type = self.current_type
+                if token_type == "ELSE" and block[3] is None and not block[4]:
+                    self.consume("ELSE")
+                    block[3] = []
+                    continue
+                if token_type == "END":
+                    self.consume("END")
+                    blocks.pop()
+                    node = WhileNode(block[1], block[2]) if block[4] else IfNode(block[1], block[2], block[3])
+                    position = block[0]
+                elif token_type is None:
+                    raise self.missing_loop_end() if block[4] else self.missing_end()
+                else:
+                    node = None
+            else:
+                node = None
+
+            if node is None:
+                if self.current_type in ("IF", "WHILE"): # אם, כל_עוד
+                    is_loop = self.current_type == "WHILE"
+                    self.advance()
+                    blocks.append([position, self.parse_comparison(), [], None, is_loop])
+                    continue
+                node = self.parse_statement_body() # Not a block, so this does not recurse
+            self.positions[node] = position
+            if not blocks:
+                return node
+            block = blocks[-1]
+            (block[2] if block[3] is None else block[3]).append(node)
 
 # Global parse function to be called from outside
-def parse(tokens):
+def parse(tokens, iterative=False):
+    """Parse tokens into a Program. iterative=True uses StackParser, for deeply nested code."""
     if not tokens:
-        return []
-    parser = Parser(tokens)
+        return Program(symbols=SymbolTable())
+    parser = StackParser(tokens) if iterative else Parser(tokens)
     return parser.parse()
 
 if __name__ == '__main__':
@@ -0,0 +1,71 @@
+# src/pipeline.py
+# The steps from Aron source to a running program, shared by main.py,
+# server.py and batch.py: lexing, parsing, optimization, the on-disk program
+# cache and engine selection.
+
+from parser import parse
+from interpreter import interpret
+
+# Execution engines selectable with --engine=<name>
+ENGINES = ("tree", "closure", "vm", "python", "stack")
+
+# Engines whose programs are parsed with parser.StackParser, so that nesting
+# depth is not limited by the recursion limit in either phase
+ITERATIVE_ENGINES = ("stack",)
+
+def load_engine(name):
+    """Return the execute(ast_nodes, positions) function of the named engine."""
+    if name == "tree":
+        return interpret
+    elif name == "closure":
+        from closure_compiler import execute
+        return execute
+    elif name == "vm":
+        from vm import execute
+        return execute
+    elif name == "python":
+        from transpiler import execute
+        return execute
+    elif name == "stack":
+        from interpreter import interpret_iterative
+        return interpret_iterative
+    raise ValueError(f"Unknown engine '{name}'. Available engines: {', '.join(ENGINES)}")
+
+def compile_source(code, debug=False, opt_level=0, iterative=False):
+    """Lex, parse and optionally optimize code. Returns (program, optimizer report or None).
+
+    iterative=True parses with parser.StackParser (see ITERATIVE_ENGINES).
+    """
+    # The lexer (and the re module) are only loaded when a program is not cached
+    from lexer import tokenize_compact
+    tokens = tokenize_compact(code)
+
+    if debug:
+        print("\u200FDEBUG: Tokens generated:")
+        for token in tokens:
+            print(f"\u200F  {token}")
+
+    ast_nodes = parse(tokens, iterative)
+    if opt_level > 0:
+        from optimizer import optimize
+        ast_nodes, optimizer = optimize(ast_nodes, opt_level)
+        return ast_nodes, optimizer.report()
+    return ast_nodes, None
+
+def prepare_program(filepath, code, debug=False, opt_level=0, use_cache=True, iterative=False):
+    """Return (program, report) for code, from the __aroncache__ when possible.
+
+    Debug runs always compile from source, since they show the tokens.
+    Both parsers build the same AST, so they share cache entries.
+    """
+    if not use_cache or debug:
+        return compile_source(code, debug, opt_level, iterative)
+
+    from program_cache import ProgramCache
+    cache = ProgramCache(filepath)
+    cached = cache.load(code, opt_level)
+    if cached is not None:
+        return cached
+    ast_nodes, report = compile_source(code, debug, opt_level, iterative)
+    cache.store(code, opt_level, ast_nodes, report)
+    return ast_nodes, report
@@ -0,0 +1,238 @@
+# src/profiler.py
+# Line-level profiler for Aron programs (main.py --profile).
+#
+# Profiled programs run on a separate copy of the tree-walking statement loop
+# that counts and times every statement, so interpret() itself carries no
+# profiling code and costs nothing extra when profiling is off. Expressions
+# are still evaluated by interpreter.evaluate_node, so the semantics match.
+#
+# Times are inclusive: an אם statement's time includes the statements of the
+# branch it ran. Self times (and the folded stacks written for flame graph
+# tools) subtract the time of the nested statements.
+#
+# The report also lists the arithmetic operator sites, with how often each took
+# the fast path of its inline cache (see interpreter.InlineCache).
+
+import time
+
+from lexer import tokenize_compact
+from parser import parse, PrintNode, AssignNode, IfNode, WhileNode, BinaryOpNode
+from interpreter import evaluate_node, prepare_frame, AronRuntimeError, loop_budget, loop_limit_error
+from output import get_writer
+
+# Number of rows in each table of the text report
+REPORT_ROWS = 20
+
+# Operator symbols by operator code (parser.OP_*)
+OPERATOR_SYMBOLS = ("+", "-", "*", "/", "==", "!=", "<", ">", "<=", ">=")
+
+def describe(node):
+    """Short label of a statement, e.g. 'קבע מונה'."""
+    if isinstance(node, PrintNode):
+        return "הדפס"
+    elif isinstance(node, AssignNode):
+        return f"קבע {node.variable_node.name}"
+    elif isinstance(node, IfNode):
+        return "אם"
+    elif isinstance(node, WhileNode):
+        return "כל_עוד"
+    return type(node).__name__
+
+def child_blocks(node):
+    """The statement lists nested directly in node."""
+    if isinstance(node, IfNode):
+        return (node.body, node.else_body or ())
+    elif isinstance(node, WhileNode):
+        return (node.body,)
+    return ()
+
+class Profiler:
+    def __init__(self, source=""):
+        self.source_lines = source.split("\n")
+        self.phases = [] # (name, seconds)
+        self.stats = {} # statement node -> [hits, inclusive nanoseconds]
+        self.program = None
+
+    def time_phase(self, name, func, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def compile(self, code, opt_level=0):
+        """Lex, parse and optionally optimize code, timing each phase. Returns (program, report)."""
+        tokens = self.time_phase("lex", tokenize_compact, code)
+        program = self.time_phase("parse", parse, tokens)
+        report = None
+        if opt_level > 0:
+            from optimizer import optimize
+            program, optimizer = self.time_phase("optimize", optimize, program, opt_level)
+            report = optimizer.report()
+        return program, report
+
+    def run(self, program):
+        """Execute a parsed program, recording per-statement statistics."""
+        self.program = program
+        self.time_phase("execute", self.run_program, program)
+
+    def run_program(self, program):
+        positions = program.positions
+        frame, statements = prepare_frame(program)
+        writer = get_writer()
+        node = None
+        try:
+            for node in statements:
+                self.run_block((node,), frame.values, writer.write_value)
+        except AronRuntimeError as error:
+            error.locate(positions, node)
+            raise
+        finally:
+            writer.end_run()
+
+    def run_block(self, nodes, values, write_value):
+        stats = self.stats
+        clock = time.perf_counter_ns
+        for node in nodes:
+            start = clock()
+            try:
+                if isinstance(node, PrintNode):
+                    write_value(evaluate_node(node.value_node, values))
+                elif isinstance(node, AssignNode):
+                    values[node.variable_node.slot] = evaluate_node(node.value_node, values)
+                elif isinstance(node, IfNode):
+                    condition_result = evaluate_node(node.condition, values)
+                    try:
+                        truth = bool(condition_result) # An array as a condition raises
+                    except AronRuntimeError as error:
+                        error.node = node
+                        raise
+                    if truth:
+                        self.run_block(node.body, values, write_value)
+                    elif node.else_body:
+                        self.run_block(node.else_body, values, write_value)
+                elif isinstance(node, WhileNode):
+                    # Walked like the tree engine's other blocks, so every iteration of the body is profiled
+                    budget = loop_budget()
+                    while True:
+                        condition_result = evaluate_node(node.condition, values)
+                        try:
+                            if not condition_result:
+                                break
+                        except AronRuntimeError as error:
+                            error.node = node
+                            raise
+                        if budget == 0:
+                            raise loop_limit_error(node)
+                        budget -= 1
+                        self.run_block(node.body, values, write_value)
+                else:
+                    raise AronRuntimeError(f"Unknown AST node type at top level: {type(node)}", node)
+            finally:
+                entry = stats.get(node)
+                if entry is None:
+                    entry = stats[node] = [0, 0]
+                entry[0] += 1
+                entry[1] += clock() - start
+
+    def self_time(self, node):
+        """Inclusive time of node minus the time of the statements nested in it."""
+        total = self.stats[node][1]
+        for block in child_blocks(node):
+            for child in block:
+                if child in self.stats:
+                    total -= self.stats[child][1]
+        return total
+
+    def position(self, node):
+        positions = self.program.positions if self.program is not None else {}
+        return positions.get(node, (0, 0))
+
+    def statement_rows(self):
+        """(line, column, label, hits, total ns, self ns) per executed statement."""
+        rows = []
+        for node, (hits, total) in self.stats.items():
+            line, column = self.position(node)
+            rows.append((line, column, describe(node), hits, total, self.self_time(node)))
+        return rows
+
+    def line_rows(self):
+        """(line, hits, total ns, self ns) per source line that started a statement."""
+        lines = {}
+        for line, _, _, hits, total, self_ns in self.statement_rows():
+            row = lines.setdefault(line, [0, 0, 0])
+            row[0] += hits
+            row[1] += total
+            row[2] += self_ns
+        return [(line, hits, total, self_ns) for line, (hits, total, self_ns) in lines.items()]
+
+    def operator_rows(self):
+        """(line, column, operator, operand classes, hits, misses) per arithmetic operator site that ran.
+
+        Hits are the operations that took the fast path specialized for the
+        site's operand classes (interpreter.InlineCache); misses the rest.
+        """
+        rows = []
+        positions = self.program.positions if self.program is not None else {}
+        for node, (line, column) in positions.items():
+            cache = node.cache if isinstance(node, BinaryOpNode) else None
+            if cache is not None and cache.hits + cache.misses:
+                types = f"{cache.left_type.__name__}, {cache.right_type.__name__}" if cache.operation else "-"
+                rows.append((line, column, OPERATOR_SYMBOLS[node.op], types, cache.hits, cache.misses))
+        return rows
+
+    def source_line(self, line):
+        if 0 < line <= len(self.source_lines):
+            text = self.source_lines[line - 1].strip()
+            return text if len(text) <= 50 else text[:47] + "..."
+        return ""
+
+    def report(self, rows=REPORT_ROWS):
+        """Return the text report: phase times, then lines and statements by cumulative time."""
+        phases = ", ".join(f"{name} {seconds * 1000:.2f} ms" for name, seconds in self.phases)
+        lines = [f"--- Profile: {phases} ---", "", "Lines (by cumulative time):",
+                 f"{'line':>6} {'hits':>10} {'total ms':>12} {'self ms':>12}  source"]
+        for line, hits, total, self_ns in sorted(self.line_rows(), key=lambda row: row[2], reverse=True)[:rows]:
+            lines.append(f"{line:>6} {hits:>10} {total / 1e6:>12.3f} {self_ns / 1e6:>12.3f}  {self.source_line(line)}")
+        lines += ["", "Statements (by cumulative time):",
+                  f"{'position':>10} {'hits':>10} {'total ms':>12} {'self ms':>12} {'per hit us':>12}  statement"]
+        for line, column, label, hits, total, self_ns in sorted(self.statement_rows(), key=lambda row: row[4], reverse=True)[:rows]:
+            lines.append(f"{f'{line}:{column}':>10} {hits:>10} {total / 1e6:>12.3f} {self_ns / 1e6:>12.3f} "
+                         f"{total / hits / 1e3:>12.2f}  {label}")
+        operator_rows = self.operator_rows()
+        if operator_rows:
+            hits = sum(row[4] for row in operator_rows)
+            runs = hits + sum(row[5] for row in operator_rows)
+            lines += ["", f"Operator sites (by operations; {hits} of {runs} specialized, {hits / runs:.1%}):",
+                      f"{'position':>10} {'hits':>10} {'misses':>10} {'hit rate':>9}  operator  operand classes"]
+            for line, column, symbol, types, hits, misses in sorted(operator_rows, key=lambda row: row[4] + row[5], reverse=True)[:rows]:
+                lines.append(f"{f'{line}:{column}':>10} {hits:>10} {misses:>10} {hits / (hits + misses):>9.1%}  {symbol:<8}  {types}")
+        return "\n".join(lines)
+
+    def folded_stacks(self):
+        """Return the profile in the folded-stack format of flamegraph.pl, speedscope etc.
+
+        One line per statement: the statements enclosing it, separated by ';',
+        then its self time in microseconds.
+        """
+        lines = []
+
+        def walk(nodes, stack):
+            for node in nodes:
+                if node not in self.stats:
+                    continue
+                line, _ = self.position(node)
+                frame = f"{stack};{line}: {describe(node)}"
+                microseconds = self.self_time(node) // 1000
+                if microseconds > 0:
+                    lines.append(f"{frame} {microseconds}")
+                for block in child_blocks(node):
+                    walk(block, frame)
+
+        if self.program is not None:
+            walk(self.program, "program")
+        return "\n".join(lines) + "\n"
+
+    def write_folded(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.folded_stacks())
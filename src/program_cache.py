@@ -0,0 +1,272 @@
+# src/program_cache.py
+# On-disk cache of parsed (and optionally optimized) Aron programs, in the
+# spirit of Python's __pycache__.
+#
+# Each source file gets one .aronc file per optimization level in an
+# __aroncache__ directory next to it. A cache file starts with a small header
+# (magic bytes and a key) followed by the program. The key is a hash of the
+# source text, the optimization level and the interpreter version, so an
+# edited source, a different --opt-level or a changed interpreter is a cache
+# miss and the entry is rewritten.
+#
+# Programs are stored as nested tuples (one per node, with its source
+# position) serialized with marshal and compressed with zlib. This loads much
+# faster than pickling the node objects, which goes through copyreg for every
+# slotted instance. Every cache failure is silent: the program is then just
+# lexed and parsed.
+
+import hashlib
+import marshal
+import os
+import sys
+import zlib
+
+from parser import PrintNode, StringNode, NumberNode, VariableNode, AssignNode, BinaryOpNode, BooleanNode, IfNode
+from parser import ConcatNode, ArrayNode, IndexNode, CallNode, WhileNode
+from parser import Program, SymbolTable
+
+CACHE_DIR_NAME = "__aroncache__"
+CACHE_SUFFIX = ".aronc"
+
+# Bump when the cache file layout changes
+CACHE_FORMAT = 1
+MAGIC = b"ARNC"
+KEY_SIZE = 32 # sha256 digest
+HEADER_SIZE = len(MAGIC) + KEY_SIZE
+
+# Total size of the .aronc files kept in one cache directory. When a write
+# pushes it over, the least recently used entries are removed.
+MAX_CACHE_BYTES = 32 * 1024 * 1024
+
+# Modules whose code shapes the cached Program; changing any of them
+# invalidates the cache
+PROGRAM_MODULES = ("lexer.py", "parser.py", "optimizer.py", "program_cache.py")
+
+# Tags of the encoded nodes. Literals are stored as their bare value; the
+# value's type tells StringNode, BooleanNode and NumberNode apart.
+PRINT, ASSIGN, IF, VARIABLE, BINARY, ARRAY, INDEX, CALL, WHILE, CONCAT = range(10)
+
+_interpreter_version = None
+
+def interpreter_version():
+    """Return bytes identifying this interpreter build, for cache keys."""
+    global _interpreter_version
+    if _interpreter_version is None:
+        parts = [f"format={CACHE_FORMAT}", sys.implementation.cache_tag or sys.version]
+        directory = os.path.dirname(os.path.abspath(__file__))
+        for name in PROGRAM_MODULES:
+            try:
+                stat = os.stat(os.path.join(directory, name))
+                parts.append(f"{name}:{stat.st_size}:{stat.st_mtime_ns}")
+            except OSError:
+                parts.append(f"{name}:missing")
+        _interpreter_version = "\n".join(parts).encode("utf-8")
+    return _interpreter_version
+
+def cache_key(code, opt_level=0):
+    """Return the key of a source text compiled at opt_level."""
+    digest = hashlib.sha256(interpreter_version())
+    digest.update(f"\0opt={opt_level}\0".encode("utf-8"))
+    digest.update(code.encode("utf-8"))
+    return digest.digest()
+
+def cache_path(source_path, opt_level=0):
+    """Return the .aronc path for a source file, e.g. __aroncache__/hello.aron.opt0.aronc."""
+    directory, name = os.path.split(os.path.abspath(source_path))
+    return os.path.join(directory, CACHE_DIR_NAME, f"{name}.opt{opt_level}{CACHE_SUFFIX}")
+
+def encode_expression(node, positions):
+    node_class = node.__class__
+    if node_class is BinaryOpNode:
+        return (BINARY, positions.get(node), node.op,
+                encode_expression(node.left, positions), encode_expression(node.right, positions))
+    elif node_class is VariableNode:
+        return (VARIABLE, positions.get(node), node.name, node.slot)
+    elif node_class in (NumberNode, StringNode, BooleanNode):
+        return node.value
+    elif node_class is ConcatNode:
+        return (CONCAT, positions.get(node), [encode_expression(part, positions) for part in node.parts])
+    elif node_class is ArrayNode:
+        return (ARRAY, positions.get(node), [encode_expression(element, positions) for element in node.elements])
+    elif node_class is IndexNode:
+        return (INDEX, positions.get(node), encode_expression(node.target, positions),
+                encode_expression(node.index, positions))
+    elif node_class is CallNode:
+        return (CALL, positions.get(node), node.name, encode_expression(node.argument, positions))
+    raise ValueError(f"Cannot cache node type: {node_class}")
+
+def encode_statement(node, positions):
+    node_class = node.__class__
+    if node_class is PrintNode:
+        return (PRINT, positions.get(node), encode_expression(node.value_node, positions))
+    elif node_class is AssignNode:
+        return (ASSIGN, positions.get(node), encode_expression(node.variable_node, positions),
+                encode_expression(node.value_node, positions))
+    elif node_class is IfNode:
+        else_body = None
+        if node.else_body is not None:
+            else_body = [encode_statement(statement, positions) for statement in node.else_body]
+        return (IF, positions.get(node), encode_expression(node.condition, positions),
+                [encode_statement(statement, positions) for statement in node.body], else_body)
+    elif node_class is WhileNode:
+        return (WHILE, positions.get(node), encode_expression(node.condition, positions),
+                [encode_statement(statement, positions) for statement in node.body])
+    raise ValueError(f"Cannot cache node type: {node_class}")
+
+def decode_expression(value, positions):
+    value_class = value.__class__
+    if value_class is tuple:
+        tag = value[0]
+        if tag == BINARY:
+            node = BinaryOpNode(decode_expression(value[3], positions), value[2], decode_expression(value[4], positions))
+        elif tag == CONCAT:
+            node = ConcatNode([decode_expression(part, positions) for part in value[2]])
+        elif tag == ARRAY:
+            node = ArrayNode([decode_expression(element, positions) for element in value[2]])
+        elif tag == INDEX:
+            node = IndexNode(decode_expression(value[2], positions), decode_expression(value[3], positions))
+        elif tag == CALL:
+            node = CallNode(value[2], decode_expression(value[3], positions))
+        else:
+            node = VariableNode(value[2])
+            node.slot = value[3]
+        if value[1] is not None:
+            positions[node] = value[1]
+        return node
+    elif value_class is str:
+        return StringNode(value)
+    elif value_class is bool:
+        return BooleanNode(value)
+    # NumberNode() truncates to int, so set optimizer-folded floats directly
+    node = NumberNode.__new__(NumberNode)
+    node.value = value
+    return node
+
+def decode_statement(value, positions):
+    tag = value[0]
+    if tag == PRINT:
+        node = PrintNode(decode_expression(value[2], positions))
+    elif tag == ASSIGN:
+        node = AssignNode(decode_expression(value[2], positions), decode_expression(value[3], positions))
+    elif tag == WHILE:
+        node = WhileNode(decode_expression(value[2], positions),
+                         [decode_statement(statement, positions) for statement in value[3]])
+    else:
+        else_body = None
+        if value[4] is not None:
+            else_body = [decode_statement(statement, positions) for statement in value[4]]
+        node = IfNode(decode_expression(value[2], positions),
+                      [decode_statement(statement, positions) for statement in value[3]], else_body)
+    if value[1] is not None:
+        positions[node] = value[1]
+    return node
+
+def dump_program(program, report=None):
+    """Serialize a parsed Program (and its optimizer report) to bytes."""
+    positions = program.positions
+    statements = [encode_statement(node, positions) for node in program]
+    return zlib.compress(marshal.dumps((program.symbols.names, statements, report)), 1)
+
+def load_program(data):
+    """Rebuild (program, report) from dump_program() bytes."""
+    names, statements, report = marshal.loads(zlib.decompress(data))
+    symbols = SymbolTable()
+    for name in names:
+        symbols.slot(name)
+    positions = {}
+    program = Program([decode_statement(statement, positions) for statement in statements], positions, symbols)
+    return program, report
+
+class ProgramCache:
+    def __init__(self, source_path, max_bytes=MAX_CACHE_BYTES):
+        self.source_path = source_path
+        self.max_bytes = max_bytes
+
+    def load(self, code, opt_level=0):
+        """Return the cached (program, report) for code, or None on a miss.
+
+        report is the optimizer report saved with the program (or None).
+        """
+        path = cache_path(self.source_path, opt_level)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if data[:len(MAGIC)] != MAGIC or data[len(MAGIC):HEADER_SIZE] != cache_key(code, opt_level):
+            return None # Stale: source, opt level or interpreter changed
+        try:
+            entry = load_program(memoryview(data)[HEADER_SIZE:])
+        except Exception:
+            return None # Corrupt or unreadable entry; it is rewritten on the next store
+        try:
+            os.utime(path) # Mark as recently used for eviction
+        except OSError:
+            pass
+        return entry
+
+    def store(self, code, opt_level, program, report=None):
+        """Save program (and its optimizer report) for code. Returns True if it was written."""
+        path = cache_path(self.source_path, opt_level)
+        try:
+            payload = dump_program(program, report)
+        except (RecursionError, ValueError):
+            return False # Too deeply nested (or not cacheable); just don't cache it
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temporary, "wb") as f:
+                f.write(MAGIC)
+                f.write(cache_key(code, opt_level))
+                f.write(payload)
+            # Readers see either the old entry or the complete new one
+            os.replace(temporary, path)
+        except OSError:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+            return False
+        self.evict(keep=path)
+        return True
+
+    def evict(self, keep=None):
+        """Remove least recently used entries until the directory fits in max_bytes."""
+        directory = os.path.join(os.path.dirname(os.path.abspath(self.source_path)), CACHE_DIR_NAME)
+        entries = []
+        total = 0
+        try:
+            with os.scandir(directory) as scan:
+                for entry in scan:
+                    if entry.name.endswith(CACHE_SUFFIX):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                        total += stat.st_size
+        except OSError:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+if __name__ == '__main__':
+    import tempfile
+    from lexer import tokenize_compact
+    from parser import parse
+
+    sample_code = 'קבע א = 2\nהדפס א * 3\n'
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "sample.aron")
+        cache = ProgramCache(source)
+        print("before store:", cache.load(sample_code))
+        cache.store(sample_code, 0, parse(tokenize_compact(sample_code)))
+        program, report = cache.load(sample_code)
+        print("after store:", list(program))
+        print("after edit:", cache.load(sample_code + "הדפס א\n"))
@@ -0,0 +1,86 @@
+# src/resolver.py
+# Variable slot resolution.
+#
+# Before a program runs, every variable name is given an integer slot, stored
+# on its VariableNode. Engines then keep variables in a per-run list indexed
+# by slot (interpreter.Frame) instead of hashing names into a shared dict.
+#
+# The parser already assigns slots while parsing (Program.symbols); this pass
+# is for statements that did not come from Parser.parse, such as streamed
+# statements or hand-built ASTs. It visits names in the same order as the
+# parser, so both give a program the same slots.
+
+from parser import PrintNode, VariableNode, AssignNode, BinaryOpNode, IfNode, SymbolTable
+from parser import ConcatNode, ArrayNode, IndexNode, CallNode, WhileNode
+
+class Resolver:
+    # Nested expressions and blocks are walked with explicit stacks, so
+    # programs from parser.StackParser resolve at any nesting depth.
+    def __init__(self, symbols=None):
+        self.symbols = symbols if symbols is not None else SymbolTable()
+
+    def resolve_expression(self, node):
+        pending = [node]
+        while pending:
+            node = pending.pop()
+            if isinstance(node, VariableNode):
+                node.slot = self.symbols.slot(node.name)
+            elif isinstance(node, BinaryOpNode):
+                pending += (node.right, node.left) # Left is visited first
+            elif isinstance(node, ConcatNode):
+                pending += reversed(node.parts)
+            elif isinstance(node, ArrayNode):
+                pending += reversed(node.elements)
+            elif isinstance(node, IndexNode):
+                pending += (node.index, node.target)
+            elif isinstance(node, CallNode):
+                pending.append(node.argument)
+
+    def resolve_statement(self, node):
+        self.resolve_block((node,))
+
+    def resolve_block(self, nodes):
+        blocks = [iter(nodes)]
+        while blocks:
+            for node in blocks[-1]:
+                if isinstance(node, PrintNode):
+                    self.resolve_expression(node.value_node)
+                elif isinstance(node, AssignNode):
+                    self.resolve_expression(node.variable_node)
+                    self.resolve_expression(node.value_node)
+                elif isinstance(node, IfNode):
+                    self.resolve_expression(node.condition)
+                    if node.else_body:
+                        blocks.append(iter(node.else_body))
+                    blocks.append(iter(node.body))
+                    break
+                elif isinstance(node, WhileNode):
+                    self.resolve_expression(node.condition)
+                    blocks.append(iter(node.body))
+                    break
+            else:
+                blocks.pop()
+
+def resolve(ast_nodes, symbols=None):
+    """Assign slots to every variable in a list of statements. Returns the SymbolTable.
+
+    Slots are allocated in order of first appearance, so resolving the same
+    program again gives the same slots.
+    """
+    resolver = Resolver(symbols)
+    resolver.resolve_block(ast_nodes)
+    return resolver.symbols
+
+def program_symbols(ast_nodes):
+    """Return the SymbolTable for a list of statements, resolving them only if needed."""
+    symbols = getattr(ast_nodes, "symbols", None)
+    if symbols is None:
+        symbols = resolve(ast_nodes)
+    return symbols
+
+def resolve_statements(ast_nodes, symbols):
+    """Resolve statements one at a time as they are consumed (for lazy iterators)."""
+    resolver = Resolver(symbols)
+    for node in ast_nodes:
+        resolver.resolve_statement(node)
+        yield node
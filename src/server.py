@@ -0,0 +1,244 @@
+# src/server.py
+# Long-lived Aron server, so editors can run programs without paying for
+# Python startup and module imports on every run.
+#
+# The server speaks JSON-RPC 2.0, one JSON message per line, over stdio
+# (the default) or a Unix socket (--socket=<path>). Methods:
+#
+#   ping                      -> {"version": ...}
+#   run {path, source?, engine?, opt_level?, flush?, max_iterations?}
+#                             -> {"ok": true} or {"ok": false, "error": "<kind> Error: ..."}
+#       While the program runs, its output is streamed back as
+#       {"method": "output", "params": {"id": <request id>, "text": ...}}
+#       notifications. source is the text to run (e.g. an unsaved editor
+#       buffer); without it the file at path is read. max_iterations limits
+#       every כל_עוד loop (as --max-iterations does).
+#   invalidate {path?}        -> forget compiled programs (of one path, or all)
+#   shutdown                  -> stop the server
+#
+# Compiled programs are kept per (path, engine, opt_level) and reused while
+# the source text is unchanged; each run still gets a fresh frame.
+
+import json
+import os
+import socket
+import sys
+from collections import OrderedDict
+
+from jsonrpc import RequestError, PARSE_ERROR, INVALID_REQUEST, METHOD_NOT_FOUND, INVALID_PARAMS, INTERNAL_ERROR, take_stdout
+from lexer import LexerError
+from interpreter import interpret, set_loop_limit
+from output import OutputWriter, FLUSH_BLOCK, FLUSH_MODES, set_writer
+from pipeline import ENGINES, ITERATIVE_ENGINES, prepare_program
+
+SERVER_VERSION = 1
+
+# Number of compiled programs kept in memory
+MAX_CACHED_PROGRAMS = 64
+
+def compile_for_engine(program, engine):
+    """Compile a parsed program for engine. Returns a function that runs it once."""
+    positions = program.positions
+    if engine == "tree":
+        return lambda: interpret(program, positions)
+    elif engine == "closure":
+        import closure_compiler
+        compiled = closure_compiler.compile_program(program)
+        return lambda: closure_compiler.run_program(compiled, positions)
+    elif engine == "vm":
+        import compiler
+        import vm
+        code = compiler.compile_program(program)
+        return lambda: vm.run(code, positions)
+    elif engine == "python":
+        import transpiler
+        compiled = transpiler.compile_program(program)
+        return lambda: transpiler.run(compiled, positions)
+    elif engine == "stack":
+        from interpreter import interpret_iterative
+        return lambda: interpret_iterative(program, positions)
+    raise RequestError(INVALID_PARAMS, f"Unknown engine '{engine}'. Available engines: {', '.join(ENGINES)}")
+
+class OutputNotifier:
+    """Text stream that forwards program output as "output" notifications."""
+
+    def __init__(self, connection, request_id):
+        self.connection = connection
+        self.request_id = request_id
+        self.encoding = "utf-8"
+
+    def write(self, text):
+        self.connection.send({"jsonrpc": "2.0", "method": "output", "params": {"id": self.request_id, "text": text}})
+
+    def flush(self):
+        pass
+
+class Connection:
+    """One JSON-RPC peer: reads requests from reader, writes messages to writer (binary files)."""
+
+    def __init__(self, server, reader, writer):
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+
+    def send(self, message):
+        self.writer.write(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.writer.flush()
+
+    def serve(self):
+        """Handle requests until the peer disconnects or asks to shut down."""
+        for line in self.reader:
+            if not line.strip():
+                continue
+            request_id = None
+            try:
+                try:
+                    request = json.loads(line)
+                except ValueError as e:
+                    raise RequestError(PARSE_ERROR, f"Invalid JSON: {e}")
+                if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+                    raise RequestError(INVALID_REQUEST, "Expected a JSON-RPC request object")
+                request_id = request.get("id")
+                params = request.get("params") or {}
+                if not isinstance(params, dict):
+                    raise RequestError(INVALID_PARAMS, "params must be an object")
+                result = self.server.handle(request["method"], params, self, request_id)
+                if request_id is not None:
+                    self.send({"jsonrpc": "2.0", "id": request_id, "result": result})
+            except RequestError as e:
+                self.send({"jsonrpc": "2.0", "id": request_id, "error": {"code": e.code, "message": str(e)}})
+            except Exception as e:
+                # One failing request must not end the server for every other client
+                self.send({"jsonrpc": "2.0", "id": request_id, "error": {"code": INTERNAL_ERROR, "message": f"An unexpected error occurred: {e}"}})
+            if self.server.stopping:
+                break
+
+class AronServer:
+    def __init__(self, max_programs=MAX_CACHED_PROGRAMS):
+        self.programs = OrderedDict() # (path, engine, opt_level) -> (source, run function)
+        self.max_programs = max_programs
+        self.stopping = False
+
+    def handle(self, method, params, connection, request_id):
+        if method == "ping":
+            return {"version": SERVER_VERSION, "engines": list(ENGINES)}
+        elif method == "run":
+            return self.run(params, connection, request_id)
+        elif method == "invalidate":
+            path = params.get("path")
+            if path is not None and not isinstance(path, str):
+                raise RequestError(INVALID_PARAMS, "path must be a string")
+            for key in [key for key in self.programs if path is None or key[0] == os.path.abspath(path)]:
+                del self.programs[key]
+            return {"ok": True}
+        elif method == "shutdown":
+            self.stopping = True
+            return {"ok": True}
+        raise RequestError(METHOD_NOT_FOUND, f"Unknown method '{method}'")
+
+    def run(self, params, connection, request_id):
+        path = params.get("path")
+        if not isinstance(path, str):
+            raise RequestError(INVALID_PARAMS, "run expects a 'path'")
+        path = os.path.abspath(path)
+        engine = params.get("engine", "tree")
+        opt_level = params.get("opt_level", 0)
+        flush_mode = params.get("flush", FLUSH_BLOCK)
+        if engine not in ENGINES:
+            raise RequestError(INVALID_PARAMS, f"Unknown engine '{engine}'. Available engines: {', '.join(ENGINES)}")
+        if flush_mode not in FLUSH_MODES:
+            raise RequestError(INVALID_PARAMS, f"Unknown flush mode '{flush_mode}'. Available modes: {', '.join(FLUSH_MODES)}")
+        if not isinstance(opt_level, int) or isinstance(opt_level, bool) or opt_level < 0:
+            raise RequestError(INVALID_PARAMS, "opt_level must be a non-negative integer")
+        max_iterations = params.get("max_iterations")
+        if max_iterations is not None and (not isinstance(max_iterations, int) or isinstance(max_iterations, bool) or max_iterations < 0):
+            raise RequestError(INVALID_PARAMS, "max_iterations must be a non-negative integer")
+
+        source = params.get("source")
+        if source is not None and not isinstance(source, str):
+            raise RequestError(INVALID_PARAMS, "source must be a string")
+        # An editor buffer may be unsaved (or have no file at all): only the file's own text is cached on disk
+        use_cache = source is None
+        if source is None:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    source = f.read()
+            except OSError as e:
+                return {"ok": False, "error": f"Error: Cannot read '{path}': {e.strerror}"}
+
+        writer = OutputWriter(OutputNotifier(connection, request_id), flush_mode)
+        previous = set_writer(writer)
+        previous_limit = set_loop_limit(max_iterations)
+        try:
+            run_program = self.compiled_program(path, source, engine, opt_level, use_cache)
+            run_program()
+        except LexerError as e:
+            return {"ok": False, "error": f"Lexical Error: {e}"}
+        except SyntaxError as e:
+            return {"ok": False, "error": f"Syntax Error: {e}"}
+        except RuntimeError as e:
+            return {"ok": False, "error": f"Runtime Error: {e}"}
+        except RequestError:
+            raise
+        except Exception as e:
+            # E.g. a TypeError from comparing a string with a number; the server keeps running
+            return {"ok": False, "error": f"An unexpected error occurred: {e}"}
+        finally:
+            writer.flush()
+            set_writer(previous)
+            set_loop_limit(previous_limit)
+        return {"ok": True}
+
+    def compiled_program(self, path, source, engine, opt_level, use_cache=True):
+        """Return the run function for source, compiling it only if it changed since the last run.
+
+        With use_cache=False the __aroncache__ directory is neither read nor written.
+        """
+        key = (path, engine, opt_level)
+        entry = self.programs.get(key)
+        if entry is not None and entry[0] == source:
+            self.programs.move_to_end(key)
+            return entry[1]
+        program, _ = prepare_program(path, source, opt_level=opt_level, use_cache=use_cache,
+                                     iterative=engine in ITERATIVE_ENGINES)
+        run_program = compile_for_engine(program, engine)
+        self.programs[key] = (source, run_program)
+        self.programs.move_to_end(key)
+        while len(self.programs) > self.max_programs:
+            self.programs.popitem(last=False)
+        return run_program
+
+def serve_stdio(server):
+    # The protocol owns stdout; anything else printed goes to stderr
+    protocol_stdout = take_stdout()
+    Connection(server, sys.stdin.buffer, protocol_stdout.buffer).serve()
+
+def serve_socket(server, path):
+    if os.path.exists(path):
+        os.remove(path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen()
+    try:
+        # Programs share the output writer, so clients are served one at a time
+        while not server.stopping:
+            client, _ = listener.accept()
+            with client, client.makefile("rb") as reader, client.makefile("wb") as writer:
+                Connection(server, reader, writer).serve()
+    finally:
+        listener.close()
+        os.remove(path)
+
+if __name__ == '__main__':
+    socket_path = None
+    for arg in sys.argv[1:]:
+        if arg.startswith("--socket="):
+            socket_path = arg.split("=", 1)[1]
+        else:
+            print("Usage: python server.py [--socket=<path>]")
+            sys.exit(1)
+    aron_server = AronServer()
+    if socket_path:
+        serve_socket(aron_server, socket_path)
+    else:
+        serve_stdio(aron_server)
@@ -0,0 +1,242 @@
+# src/transpiler.py
+# Transpiling engine: translates the Aron AST into a Python `ast` module,
+# compiles it once with compile() and runs the code object with exec(), so
+# CPython's own evaluator does the work.
+#
+# Aron variables live in a per-run namespace dict passed to exec() as the
+# locals mapping; CPython resolves the names itself, so this engine does not
+# use resolver.py slots. Operators whose Aron semantics differ from Python's
+# call the shared functions in interpreter.py; comparisons compile to native
+# Python comparisons, which behave identically.
+#
+# Every generated expression that can fail gets a synthetic line number that
+# indexes `TranspiledProgram.nodes`, so a failure can be traced back to the
+# Aron node (and from there to its source position).
+
+import ast
+
+from parser import PrintNode, StringNode, NumberNode, VariableNode, AssignNode, BinaryOpNode, BooleanNode, IfNode
+from parser import ConcatNode, ArrayNode, IndexNode, CallNode, WhileNode
+from parser import OP_PLUS, OP_MINUS, OP_MULTIPLY, OP_DIVIDE, OP_EQUALS, OP_NOT_EQUALS, OP_LT, OP_GT, OP_LE, OP_GE
+from interpreter import AronRuntimeError, add_values, subtract_values, multiply_values, divide_values
+from interpreter import make_array, index_value, call_function, loop_budget, loop_limit_error
+from output import get_writer, write_value
+
+# Names visible to generated code. Aron identifiers start with a Hebrew
+# letter, so they can never collide with these.
+HELPERS = {
+    "_add": add_values,
+    "_subtract": subtract_values,
+    "_multiply": multiply_values,
+    "_divide": divide_values,
+    "_array": make_array,
+    "_index": index_value,
+    "_call": call_function,
+    "_bool": bool,
+    "_write": write_value,
+    "_loop_budget": loop_budget,
+    "_loop_limit_error": loop_limit_error,
+}
+
+ARITHMETIC_HELPERS = {
+    OP_PLUS: "_add",
+    OP_MINUS: "_subtract",
+    OP_MULTIPLY: "_multiply",
+    OP_DIVIDE: "_divide",
+}
+
+COMPARISON_OPERATORS = {
+    OP_EQUALS: ast.Eq,
+    OP_NOT_EQUALS: ast.NotEq,
+    OP_LT: ast.Lt,
+    OP_GT: ast.Gt,
+    OP_LE: ast.LtE,
+    OP_GE: ast.GtE,
+}
+
+class TranspiledProgram:
+    """A compiled Python code object and the Aron nodes behind its line numbers."""
+    __slots__ = ("code", "nodes", "module")
+
+    def __init__(self, code, nodes, module):
+        self.code = code
+        self.nodes = nodes
+        self.module = module
+
+    def node_for_traceback(self, traceback):
+        """Return the Aron node whose generated code was executing in traceback."""
+        line = None
+        while traceback is not None:
+            if traceback.tb_frame.f_code is self.code:
+                line = traceback.tb_lineno
+            traceback = traceback.tb_next
+        if line is None or not 0 < line < len(self.nodes):
+            return None
+        return self.nodes[line]
+
+class Transpiler:
+    def __init__(self):
+        self.nodes = [None] # Line 0 is not a valid line number
+        self.loops = 0
+
+    def locate(self, python_node, aron_node):
+        """Give python_node a fresh synthetic line number that maps to aron_node."""
+        line = len(self.nodes)
+        self.nodes.append(aron_node)
+        python_node.lineno = python_node.end_lineno = line
+        python_node.col_offset = python_node.end_col_offset = 0
+        return python_node
+
+    def expression(self, node):
+        if isinstance(node, (NumberNode, StringNode, BooleanNode)):
+            return ast.Constant(node.value)
+
+        elif isinstance(node, VariableNode):
+            return self.locate(ast.Name(node.name, ast.Load()), node)
+
+        elif isinstance(node, BinaryOpNode):
+            left = self.expression(node.left)
+            right = self.expression(node.right)
+
+            if node.op in COMPARISON_OPERATORS:
+                return self.locate(ast.Compare(left, [COMPARISON_OPERATORS[node.op]()], [right]), node)
+
+            helper = ast.Name(ARITHMETIC_HELPERS[node.op], ast.Load())
+            return self.locate(ast.Call(helper, [left, right], []), node)
+
+        elif isinstance(node, ConcatNode):
+            # An f-string: literal parts are copied as is and the others converted with !s, i.e. str()
+            parts = []
+            for part in node.parts:
+                if isinstance(part, StringNode):
+                    parts.append(ast.Constant(part.value))
+                else:
+                    parts.append(ast.FormattedValue(self.expression(part), ord("s"), None))
+            return ast.JoinedStr(parts)
+
+        elif isinstance(node, ArrayNode):
+            elements = ast.List([self.expression(element) for element in node.elements], ast.Load())
+            return self.locate(ast.Call(ast.Name("_array", ast.Load()), [elements], []), node)
+
+        elif isinstance(node, IndexNode):
+            arguments = [self.expression(node.target), self.expression(node.index)]
+            return self.locate(ast.Call(ast.Name("_index", ast.Load()), arguments, []), node)
+
+        elif isinstance(node, CallNode):
+            arguments = [ast.Constant(node.name), self.expression(node.argument)]
+            return self.locate(ast.Call(ast.Name("_call", ast.Load()), arguments, []), node)
+
+        else:
+            raise AronRuntimeError(f"Cannot evaluate node type: {type(node)}", node)
+
+    def statement(self, node):
+        if isinstance(node, PrintNode):
+            value = self.expression(node.value_node)
+            call = ast.Call(ast.Name("_write", ast.Load()), [value], [])
+            return self.locate(ast.Expr(call), node)
+
+        elif isinstance(node, AssignNode):
+            target = ast.Name(node.variable_node.name, ast.Store())
+            return self.locate(ast.Assign([target], self.expression(node.value_node)), node)
+
+        elif isinstance(node, IfNode):
+            # The truth test is a call located at the אם itself, where an array condition fails
+            condition = ast.Call(ast.Name("_bool", ast.Load()), [self.expression(node.condition)], [])
+            condition = self.locate(condition, node)
+            body = self.block(node.body)
+            else_body = self.block(node.else_body) if node.else_body else []
+            return self.locate(ast.If(condition, body, else_body), node)
+
+        else:
+            raise AronRuntimeError(f"Unknown AST node type at top level: {type(node)}", node)
+
+    def loop(self, node):
+        """Translate a כל_עוד loop into two statements:
+
+            _loopN = _loop_budget()
+            while _bool(condition):
+                if _loopN == 0: raise _loop_limit_error()
+                _loopN -= 1
+                body
+        """
+        self.loops += 1
+        budget = f"_loop{self.loops}"
+        start = ast.Assign([ast.Name(budget, ast.Store())], ast.Call(ast.Name("_loop_budget", ast.Load()), [], []))
+        condition = ast.Call(ast.Name("_bool", ast.Load()), [self.expression(node.condition)], [])
+        exhausted = ast.Compare(ast.Name(budget, ast.Load()), [ast.Eq()], [ast.Constant(0)])
+        limit_error = ast.Raise(ast.Call(ast.Name("_loop_limit_error", ast.Load()), [], []))
+        count = ast.AugAssign(ast.Name(budget, ast.Store()), ast.Sub(), ast.Constant(1))
+        body = [ast.If(exhausted, [self.locate(limit_error, node)], []), count] + self.statements(node.body)
+        return [self.locate(start, node), self.locate(ast.While(self.locate(condition, node), body, []), node)]
+
+    def statements(self, nodes):
+        python_nodes = []
+        for node in nodes:
+            if isinstance(node, WhileNode):
+                python_nodes += self.loop(node)
+            else:
+                python_nodes.append(self.statement(node))
+        return python_nodes
+
+    def block(self, nodes):
+        return self.statements(nodes) or [ast.Pass()]
+
+def transpile(ast_nodes):
+    """Translate Aron statements into a Python ast.Module and its node table."""
+    transpiler = Transpiler()
+    module = ast.Module(transpiler.statements(ast_nodes), [])
+    ast.fix_missing_locations(module)
+    return module, transpiler.nodes
+
+def compile_program(ast_nodes):
+    module, nodes = transpile(ast_nodes)
+    return TranspiledProgram(compile(module, "<aron>", "exec"), nodes, module)
+
+def to_python_source(ast_nodes):
+    """Return the generated program as Python source text, for inspection."""
+    module, _ = transpile(ast_nodes)
+    return ast.unparse(module)
+
+def run(program, positions=None, namespace=None):
+    """Execute a TranspiledProgram. positions is used only to locate runtime errors.
+
+    namespace holds the variables; a fresh dict is used for each run by default.
+    """
+    top_level = namespace is None
+    if top_level:
+        namespace = {}
+    try:
+        exec(program.code, HELPERS, namespace)
+    except AronRuntimeError as error:
+        if error.node is None:
+            error.node = program.node_for_traceback(error.__traceback__)
+        if positions is not None:
+            error.locate(positions)
+        raise
+    except NameError as error:
+        # Only Aron variables can be undefined in generated code
+        located = AronRuntimeError(f"Undefined variable: {error.name}", program.node_for_traceback(error.__traceback__))
+        if positions is not None:
+            located.locate(positions)
+        raise located from None
+    finally:
+        if top_level:
+            get_writer().end_run()
+
+def execute(ast_nodes, positions=None):
+    """Transpile and run ast_nodes.
+
+    A list is compiled as one Python module; a lazy iterator of statements (as
+    in --stream mode) is compiled and run one statement at a time.
+    """
+    if positions is None:
+        positions = getattr(ast_nodes, "positions", None)
+    if isinstance(ast_nodes, list):
+        run(compile_program(ast_nodes), positions)
+    else:
+        namespace = {}
+        try:
+            for node in ast_nodes:
+                run(compile_program([node]), positions, namespace)
+        finally:
+            get_writer().end_run()
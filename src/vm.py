@@ -0,0 +1,137 @@
+# src/vm.py
+# Stack-based virtual machine for bytecode produced by compiler.py.
+
+from compiler import (compile_program, LOAD_CONST, LOAD_VAR, STORE_VAR, PRINT, JUMP, JUMP_IF_FALSE,
+                      BINARY_ADD, BINARY_SUBTRACT, BINARY_MULTIPLY, BINARY_DIVIDE,
+                      COMPARE_EQ, COMPARE_NE, COMPARE_LT, COMPARE_GT, COMPARE_LE, COMPARE_GE,
+                      BUILD_ARRAY, INDEX, CALL, LOOP_START, LOOP_ITERATION, LOOP_END, BUILD_STRING)
+from interpreter import (prepare_frame, Frame, AronRuntimeError, UNDEFINED,
+                         add_values, subtract_values, multiply_values, divide_values,
+                         make_array, index_value, call_function, loop_budget, loop_limit_error)
+from output import get_writer
+
+def run(code, positions=None, frame=None):
+    """Execute a CodeObject. positions is used only to locate runtime errors.
+
+    Without a frame, a fresh one is created for the program's variables.
+    """
+    top_level = frame is None
+    if top_level:
+        frame = Frame(code.symbols)
+    writer = get_writer()
+    write_value = writer.write_value
+    instructions = code.instructions
+    constants = code.constants
+    values = frame.values
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    end = len(instructions)
+    pc = 0
+
+    try:
+        while pc < end:
+            opcode = instructions[pc]
+            arg = instructions[pc + 1]
+            pc += 2
+
+            if opcode == LOAD_VAR:
+                value = values[arg]
+                if value is UNDEFINED:
+                    raise AronRuntimeError(f"Undefined variable: {code.names[arg]}")
+                push(value)
+            elif opcode == LOAD_CONST:
+                push(constants[arg])
+            elif opcode == STORE_VAR:
+                values[arg] = pop()
+            elif opcode == BINARY_ADD:
+                right = pop()
+                stack[-1] = add_values(stack[-1], right)
+            elif opcode == BUILD_STRING:
+                start = len(stack) - arg
+                text = "".join(map(str, stack[start:]))
+                del stack[start:]
+                push(text)
+            elif opcode == BINARY_SUBTRACT:
+                right = pop()
+                stack[-1] = subtract_values(stack[-1], right)
+            elif opcode == BINARY_MULTIPLY:
+                right = pop()
+                stack[-1] = multiply_values(stack[-1], right)
+            elif opcode == BINARY_DIVIDE:
+                right = pop()
+                stack[-1] = divide_values(stack[-1], right)
+            elif opcode == COMPARE_EQ:
+                right = pop()
+                stack[-1] = stack[-1] == right
+            elif opcode == COMPARE_NE:
+                right = pop()
+                stack[-1] = stack[-1] != right
+            elif opcode == COMPARE_LT:
+                right = pop()
+                stack[-1] = stack[-1] < right
+            elif opcode == COMPARE_GT:
+                right = pop()
+                stack[-1] = stack[-1] > right
+            elif opcode == COMPARE_LE:
+                right = pop()
+                stack[-1] = stack[-1] <= right
+            elif opcode == COMPARE_GE:
+                right = pop()
+                stack[-1] = stack[-1] >= right
+            elif opcode == JUMP_IF_FALSE:
+                if not pop():
+                    pc = arg
+            elif opcode == JUMP:
+                pc = arg
+            elif opcode == PRINT:
+                write_value(pop())
+            elif opcode == LOOP_ITERATION:
+                budget = stack[-1]
+                if budget == 0:
+                    raise loop_limit_error()
+                stack[-1] = budget - 1
+            elif opcode == LOOP_START:
+                push(loop_budget())
+            elif opcode == LOOP_END:
+                pop()
+            elif opcode == BUILD_ARRAY:
+                start = len(stack) - arg
+                elements = stack[start:]
+                del stack[start:]
+                push(make_array(elements))
+            elif opcode == INDEX:
+                position = pop()
+                stack[-1] = index_value(stack[-1], position)
+            elif opcode == CALL:
+                stack[-1] = call_function(constants[arg], stack[-1])
+            else:
+                raise AronRuntimeError(f"Unknown opcode: {opcode}")
+    except AronRuntimeError as error:
+        # pc already points past the failing instruction
+        if error.node is None:
+            error.node = code.nodes[(pc - 2) // 2]
+        if positions is not None:
+            error.locate(positions)
+        raise
+    finally:
+        if top_level:
+            writer.end_run()
+
+def execute(ast_nodes, positions=None):
+    """Compile ast_nodes to bytecode and run it.
+
+    A list is compiled as one program; a lazy iterator of statements (as in
+    --stream mode) is compiled and run one statement at a time.
+    """
+    if positions is None:
+        positions = getattr(ast_nodes, "positions", None)
+    frame, statements = prepare_frame(ast_nodes)
+    try:
+        if isinstance(statements, list):
+            run(compile_program(statements, frame.symbols), positions, frame)
+        else:
+            for node in statements:
+                run(compile_program([node], frame.symbols), positions, frame)
+    finally:
+        get_writer().end_run()
@@ -0,0 +1,158 @@
+// aron-server.js
+// Client for the long-lived Aron servers: src/server.py, which keeps the
+// interpreter loaded so runs skip Python startup, and src/analysis_server.py,
+// which keeps open documents parsed for diagnostics, completion and
+// go-to-definition. Both speak JSON-RPC 2.0 with one JSON message per line
+// over the server's stdio.
+
+const { spawn } = require('child_process');
+const readline = require('readline');
+
+class AronServer {
+    /**
+     * @param {string} pythonPath - Python executable used to start the server
+     * @param {string} serverPath - Path of src/server.py
+     */
+    constructor(pythonPath, serverPath) {
+        this.pythonPath = pythonPath;
+        this.serverPath = serverPath;
+        this.process = null;
+        this.nextId = 1;
+        this.pending = new Map(); // request id -> { resolve, reject, onOutput }
+        this.notificationHandlers = new Map(); // method -> handler(params), for notifications from the server
+        this.onStart = null; // Called whenever a new server process starts, before any request is sent to it
+    }
+
+    /**
+     * Start the server process if it is not running yet.
+     */
+    start() {
+        if (this.process) {
+            return;
+        }
+        const child = spawn(this.pythonPath, [this.serverPath], { stdio: ['pipe', 'pipe', 'pipe'] });
+        this.process = child;
+
+        const lines = readline.createInterface({ input: child.stdout });
+        lines.on('line', (line) => this.handleMessage(line));
+
+        child.stderr.on('data', (data) => console.log(`Aron server: ${data}`));
+        child.on('error', (error) => this.stopped(error));
+        child.on('exit', () => this.stopped(new Error('The Aron server exited')));
+
+        if (this.onStart) {
+            this.onStart();
+        }
+    }
+
+    handleMessage(line) {
+        let message;
+        try {
+            message = JSON.parse(line);
+        } catch (error) {
+            console.log(`Aron server sent invalid JSON: ${line}`);
+            return;
+        }
+
+        if (message.method === 'output') {
+            const request = this.pending.get(message.params.id);
+            if (request && request.onOutput) {
+                request.onOutput(message.params.text);
+            }
+            return;
+        }
+        if (message.method) {
+            const handler = this.notificationHandlers.get(message.method);
+            if (handler) {
+                handler(message.params);
+            }
+            return;
+        }
+
+        const request = this.pending.get(message.id);
+        if (!request) {
+            return;
+        }
+        this.pending.delete(message.id);
+        if (message.error) {
+            request.reject(new Error(message.error.message));
+        } else {
+            request.resolve(message.result);
+        }
+    }
+
+    stopped(error) {
+        if (!this.process) {
+            return;
+        }
+        this.process = null;
+        // Fail whatever was in flight; the next request starts a new server
+        for (const request of this.pending.values()) {
+            request.reject(error);
+        }
+        this.pending.clear();
+    }
+
+    /**
+     * Send a request, starting the server on demand.
+     * @param {string} method
+     * @param {object} params
+     * @param {(text: string) => void} [onOutput] - Receives program output as it is streamed back
+     * @param {{onCancellationRequested: Function}} [token] - Cancels the request (e.g. a VS Code CancellationToken)
+     * @returns {Promise<object>} The request's result
+     */
+    request(method, params, onOutput, token) {
+        this.start();
+        const id = this.nextId++;
+        return new Promise((resolve, reject) => {
+            this.pending.set(id, { resolve, reject, onOutput });
+            const message = JSON.stringify({ jsonrpc: '2.0', id, method, params });
+            this.process.stdin.write(message + '\n', (error) => {
+                if (error) {
+                    this.pending.delete(id);
+                    reject(error);
+                }
+            });
+            if (token) {
+                token.onCancellationRequested(() => {
+                    if (this.pending.has(id)) {
+                        this.notify('cancel', { id });
+                    }
+                });
+            }
+        });
+    }
+
+    /**
+     * Send a notification (a message without a reply), starting the server on demand.
+     */
+    notify(method, params) {
+        this.start();
+        this.process.stdin.write(JSON.stringify({ jsonrpc: '2.0', method, params }) + '\n');
+    }
+
+    isRunning() {
+        return this.process !== null;
+    }
+
+    /**
+     * Run an Aron file. source is the text to run (e.g. an unsaved buffer).
+     * @returns {Promise<{ok: boolean, error?: string}>}
+     */
+    run(filePath, source, options, onOutput) {
+        return this.request('run', { path: filePath, source, ...options }, onOutput);
+    }
+
+    dispose() {
+        if (this.process) {
+            const child = this.process;
+            this.request('shutdown', {}).catch(() => {});
+            child.stdin.end();
+            this.process = null;
+        }
+    }
+}
+
+module.exports = {
+    AronServer
+};
@@ -3,6 +3,15 @@ const vscode = require('vscode');
 const path = require('path');
 const { exec } = require('child_process');
 const { formatAronCode, addRtlMarks } = require('./rtl-utils');
+const { AronServer } = require('./aron-server');
+
+// Warm interpreter process shared by all runs, started on first use
+let aronServer = null;
+let outputChannel = null;
+
+// Analysis server that checks open Aron documents while they are edited
+let analysisServer = null;
+let diagnosticCollection = null;
 
 /**
  * @param {vscode.ExtensionContext} context
@@ -23,6 +32,11 @@ function activate(context) {
         setEditorToRTL();
     }
 
+    // Check Aron documents for errors while typing
+    if (vscode.workspace.getConfiguration('aron').get('diagnostics')) {
+        startAnalysis(context);
+    }
+
     // Register the command to run Aron files
     let runCommand = vscode.commands.registerCommand('aron.run', function() {
         const editor = vscode.window.activeTextEditor;
@@ -40,16 +54,24 @@ function activate(context) {
         // Save the file before running it
         document.save().then(() => {
             const filePath = document.uri.fsPath;
-            const terminal = vscode.window.createTerminal('Aron');
-            terminal.show();
+            const config = vscode.workspace.getConfiguration('aron');
 
-            // Find the main.py interpreter path
-            // This assumes that the main.py is in the src directory which is a sibling to the vscode-aron-extension directory
+            // Find the interpreter sources
+            // This assumes that the src directory is a sibling to the vscode-aron-extension directory
             const extensionPath = context.extensionPath;
-            const mainPyPath = path.join(path.dirname(extensionPath), 'src', 'main.py');
+            const srcPath = path.join(path.dirname(extensionPath), 'src');
+
+            if (config.get('useServer')) {
+                runWithServer(srcPath, filePath, document.getText(), config);
+                return;
+            }
+
+            const terminal = vscode.window.createTerminal('Aron');
+            terminal.show();
             
             // Run the Aron file
-            terminal.sendText(`python "${mainPyPath}" "${filePath}"`);
+            const mainPyPath = path.join(srcPath, 'main.py');
+            terminal.sendText(`${config.get('pythonPath')} "${mainPyPath}" "${filePath}" --engine=${config.get('engine')}`);
         });    });
 
     context.subscriptions.push(runCommand);
@@ -116,6 +138,7 @@ function activate(context) {
                 { label: 'קבע', detail: 'Declare variable', documentation: 'Declares a new variable or assigns a value to an existing one.' },
                 { label: 'אם', detail: 'If statement', documentation: 'Begins a conditional block that executes if the condition is true.' },
                 { label: 'אחרת', detail: 'Else statement', documentation: 'Specifies a block to execute when the if condition is false.' },
+                { label: 'כל_עוד', detail: 'While loop', documentation: 'Begins a loop that repeats its statements while the condition is true.' },
                 { label: 'סוף', detail: 'End block', documentation: 'Marks the end of a control structure block like if-else.' },
                 { label: 'אמת', detail: 'Boolean true', documentation: 'Boolean true value.' },
                 { label: 'שקר', detail: 'Boolean false', documentation: 'Boolean false value.' }
@@ -127,13 +150,54 @@ function activate(context) {
                 item.documentation = new vscode.MarkdownString(keyword.documentation);
                 completionItems.push(item);
             });
-            
-            return completionItems;
+
+            // Built-in array functions
+            const functions = [
+                { label: 'סכום', detail: 'Sum of an array', documentation: 'Returns the sum of the elements of an array.' },
+                { label: 'מינימום', detail: 'Minimum of an array', documentation: 'Returns the smallest element of a non-empty array.' },
+                { label: 'מקסימום', detail: 'Maximum of an array', documentation: 'Returns the largest element of a non-empty array.' },
+                { label: 'אורך', detail: 'Length', documentation: 'Returns the number of elements of an array, or of characters of a string.' },
+                { label: 'טווח', detail: 'Range array', documentation: 'Returns the array 0, 1, ..., n - 1.' }
+            ];
+
+            functions.forEach(func => {
+                const item = new vscode.CompletionItem(func.label, vscode.CompletionItemKind.Function);
+                item.detail = func.detail;
+                item.documentation = new vscode.MarkdownString(func.documentation);
+                completionItems.push(item);
+            });
+
+            // Variables assigned with קבע, from the analysis server
+            if (!analysisServer) {
+                return completionItems;
+            }
+            return analysisServer.request('completion', positionParams(document, position), null, token)
+                .then((result) => completionItems.concat(result.items.map((variable) => {
+                    const item = new vscode.CompletionItem(variable.label, vscode.CompletionItemKind.Variable);
+                    item.detail = 'Variable';
+                    return item;
+                })))
+                .catch(() => completionItems);
         }
     });
     
     context.subscriptions.push(completionProvider);
 
+    // Register go-to-definition for variables: jumps to the קבע statements that assign them
+    const definitionProvider = vscode.languages.registerDefinitionProvider('aron', {
+        provideDefinition(document, position, token) {
+            if (!analysisServer) {
+                return null;
+            }
+            return analysisServer.request('definition', positionParams(document, position), null, token)
+                .then((result) => result.locations.map((location) =>
+                    new vscode.Location(document.uri, new vscode.Position(location.line, location.character))))
+                .catch(() => null);
+        }
+    });
+
+    context.subscriptions.push(definitionProvider);
+
     // Register hover provider for Aron language
     const hoverProvider = vscode.languages.registerHoverProvider('aron', {
         provideHover(document, position, token) {
@@ -150,6 +214,7 @@ function activate(context) {
                 'קבע': 'Variable declaration\n\nSyntax: `קבע <name> = <expression>`\n\nCreates a new variable or assigns a value to an existing one.',
                 'אם': 'If statement\n\nSyntax: `אם <condition>\n    <statements>\nסוף`\n\nExecutes statements if the condition is true.',
                 'אחרת': 'Else statement\n\nSyntax: `אם <condition>\n    <statements>\nאחרת\n    <statements>\nסוף`\n\nExecutes statements if the condition is false.',
+                'כל_עוד': 'While loop\n\nSyntax: `כל_עוד <condition>\n    <statements>\nסוף`\n\nRepeats statements while the condition is true.',
                 'סוף': 'End block\n\nMarks the end of a control structure block like if-else.',
                 'אמת': 'Boolean true\n\nBoolean literal representing the true value.',
                 'שקר': 'Boolean false\n\nBoolean literal representing the false value.'
@@ -166,7 +231,116 @@ function activate(context) {
     context.subscriptions.push(hoverProvider);
 }
 
-function deactivate() {}
+function deactivate() {
+    if (aronServer) {
+        aronServer.dispose();
+        aronServer = null;
+    }
+    if (analysisServer) {
+        analysisServer.dispose();
+        analysisServer = null;
+    }
+}
+
+// Start the analysis server and keep it in sync with the open Aron documents
+function startAnalysis(context) {
+    const config = vscode.workspace.getConfiguration('aron');
+    const srcPath = path.join(path.dirname(context.extensionPath), 'src');
+    analysisServer = new AronServer(config.get('pythonPath'), path.join(srcPath, 'analysis_server.py'));
+    diagnosticCollection = vscode.languages.createDiagnosticCollection('aron');
+    context.subscriptions.push(diagnosticCollection);
+
+    // A new server process (the first, or a restart after a crash) knows no documents yet
+    analysisServer.onStart = () => vscode.workspace.textDocuments.forEach(openInAnalysis);
+    analysisServer.notificationHandlers.set('diagnostics', showDiagnostics);
+
+    context.subscriptions.push(vscode.workspace.onDidOpenTextDocument(openInAnalysis));
+
+    context.subscriptions.push(vscode.workspace.onDidChangeTextDocument((event) => {
+        const document = event.document;
+        if (document.languageId !== 'aron' || event.contentChanges.length === 0) {
+            return;
+        }
+        if (!analysisServer.isRunning()) {
+            analysisServer.start(); // Opens the document with the edits already applied
+            return;
+        }
+        // Only the edited ranges are sent; the server re-parses just the statements they touch
+        analysisServer.notify('change', {
+            path: document.uri.fsPath,
+            version: document.version,
+            changes: event.contentChanges.map((change) => ({
+                range: {
+                    start: { line: change.range.start.line, character: change.range.start.character },
+                    end: { line: change.range.end.line, character: change.range.end.character }
+                },
+                text: change.text
+            }))
+        });
+    }));
+
+    context.subscriptions.push(vscode.workspace.onDidCloseTextDocument((document) => {
+        if (document.languageId !== 'aron') {
+            return;
+        }
+        diagnosticCollection.delete(document.uri);
+        if (analysisServer.isRunning()) {
+            analysisServer.notify('close', { path: document.uri.fsPath });
+        }
+    }));
+
+    analysisServer.start();
+}
+
+function openInAnalysis(document) {
+    if (analysisServer && document.languageId === 'aron') {
+        analysisServer.notify('open', { path: document.uri.fsPath, text: document.getText(), version: document.version });
+    }
+}
+
+function positionParams(document, position) {
+    return { path: document.uri.fsPath, version: document.version, line: position.line, character: position.character };
+}
+
+// Show the diagnostics published by the analysis server, unless the document changed since
+function showDiagnostics(params) {
+    const document = vscode.workspace.textDocuments.find((doc) => doc.uri.fsPath === params.path);
+    if (!document || document.version !== params.version) {
+        return; // Newer edits will publish their own diagnostics
+    }
+    diagnosticCollection.set(document.uri, params.diagnostics.map((diagnostic) => {
+        const position = new vscode.Position(diagnostic.line, diagnostic.character);
+        const range = document.getWordRangeAtPosition(position) || new vscode.Range(position, position.translate(0, 1));
+        const item = new vscode.Diagnostic(range, diagnostic.message, vscode.DiagnosticSeverity.Error);
+        item.source = 'aron';
+        return item;
+    }));
+}
+
+// Run a file on the Aron server and show its output in the "Aron" output channel
+function runWithServer(srcPath, filePath, source, config) {
+    if (!aronServer) {
+        aronServer = new AronServer(config.get('pythonPath'), path.join(srcPath, 'server.py'));
+    }
+    if (!outputChannel) {
+        outputChannel = vscode.window.createOutputChannel('Aron');
+    }
+    outputChannel.clear();
+    outputChannel.show(true);
+    outputChannel.appendLine(`\u200F--- Executing Aron file: ${filePath} ---`);
+
+    const started = Date.now();
+    aronServer.run(filePath, source, { engine: config.get('engine') }, (text) => outputChannel.append(text))
+        .then((result) => {
+            if (!result.ok) {
+                outputChannel.appendLine(result.error);
+            }
+            outputChannel.appendLine(`--- Finished execution (${Date.now() - started} ms) ---`);
+        })
+        .catch((error) => {
+            vscode.window.showErrorMessage(`Aron server error: ${error.message}`);
+        });
+}
 
 // Function to set the editor to RTL mode
 function setEditorToRTL() {